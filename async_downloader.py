@@ -0,0 +1,294 @@
+"""
+异步图片下载引擎 - 在专用线程的asyncio事件循环上并发下载，浏览器线程提交任务后立即开始下载
+Async Image Download Engine - downloads concurrently on an asyncio event loop running in a dedicated thread,
+starting as soon as the browser threads submit tasks
+"""
+
+import os
+import time
+import asyncio
+import hashlib
+import functools
+import threading
+import concurrent.futures
+from random_user_agent import random_ua
+from downloader import conditional_headers, response_validators, expected_total_size, hash_file, PART_SUFFIX
+from downloader import range_validator, read_part_validator, write_part_validator, discard_part
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# 默认异步下载设置 / Default async download settings
+DEFAULT_CONCURRENCY = 32    # 全局并发下载数 / Global concurrent downloads
+DEFAULT_PER_HOST = 8        # 每个主机的并发连接数 / Concurrent connections per host
+DEFAULT_TIMEOUT = 5         # 请求超时时间(秒) / Request timeout in seconds
+DEFAULT_IO_WORKERS = 4      # 执行文件写入和状态记录的线程数 / Threads running file writes and status recording
+PENDING_FACTOR = 4          # 未完成任务数上限为并发数的倍数，超过时submit阻塞 / Pending tasks allowed as a multiple of the concurrency; submit blocks beyond it
+CHUNK_SIZE = 64 * 1024      # 流式写入块大小(每块一次线程切换) / Streaming write chunk size (one thread hop per chunk)
+
+
+def is_available():
+    """检查aiohttp是否可用 / Check whether aiohttp is installed"""
+    return aiohttp is not None
+
+
+def _write_chunk(f, hasher, chunk):
+    f.write(chunk)
+    hasher.update(chunk)
+
+
+class AsyncDownloadEngine:
+    """
+    与DownloadPipeline接口一致(submit/join/close/stats)的异步下载引擎：事件循环运行在专用线程中，
+    submit()通过run_coroutine_threadsafe立即调度下载，与浏览器爬取重叠；文件写入、本地查找和状态记录
+    在线程池中执行，不阻塞事件循环
+    Async engine with the same interface as DownloadPipeline (submit/join/close/stats): the event loop runs
+    in a dedicated thread and submit() schedules the download right away with run_coroutine_threadsafe, so
+    it overlaps with browser crawling; file writes, local lookups and status recording run on a thread pool
+    and never block the event loop
+    """
+
+    def __init__(self, save_path_for, on_saved, validators_for=None, local_fetch=None, rate_limiter=None,
+                 on_failed=None, convert=None, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST,
+                 timeout=DEFAULT_TIMEOUT, io_workers=DEFAULT_IO_WORKERS):
+        """
+        Args:
+            save_path_for (callable): 根据DownloadTask返回保存路径 / Returns the save path for a DownloadTask
+            on_saved (callable): 写盘后调用(task, path, validators, sha256)，返回是否记录成功 / Called with (task, path, validators, sha256) after writing, returns success
+            validators_for (callable): 返回任务的条件请求校验信息 / Returns the conditional-request validators of a task
+            local_fetch (callable): 请求前调用(task, path)，返回True表示已从本地得到图片 / Called with (task, path) before requesting; True means the image was obtained locally
+            rate_limiter (AdaptiveRateLimiter): 可选的按主机限速器 / Optional per-host rate limiter
+            on_failed (callable): 下载失败时调用(task, status, error)，例如加入重试队列 / Called with (task, status, error) on failure, e.g. to queue a retry
+            convert (callable): 提供时正文读入内存，调用convert(data, save_path)返回concurrent.futures.Future，由其编码写盘
+                                When given, the body is read into memory and convert(data, save_path) returns a
+                                concurrent.futures.Future that encodes and writes it
+            concurrency (int): 信号量限制的全局并发数 / Semaphore-bounded global concurrency
+            per_host (int): 每个主机的连接上限 / Connection limit per host
+            timeout (float): 单个请求超时时间 / Per-request timeout
+            io_workers (int): 文件和状态I/O线程数 / Threads for file and status I/O
+        """
+        if aiohttp is None:
+            raise ImportError("异步引擎需要aiohttp，请运行 pip install aiohttp / The async engine requires aiohttp, run: pip install aiohttp")
+        self.save_path_for = save_path_for
+        self.on_saved = on_saved
+        self.validators_for = validators_for
+        self.local_fetch = local_fetch
+        self.rate_limiter = rate_limiter
+        self.on_failed = on_failed
+        self.convert = convert
+        self.concurrency = max(1, concurrency)
+        self.per_host = max(1, per_host)
+        self.timeout = timeout
+        self.io_workers = max(1, io_workers)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.concurrency * PENDING_FACTOR)
+        self._pending = set()
+        self._loop = None
+        self._thread = None
+        self._io = None
+        self._session = None
+        self._semaphore = None
+        self.stats = {"submitted": 0, "downloaded": 0, "failed": 0}
+
+    def _start(self):
+        """启动事件循环线程并在其中创建会话；调用方持有self._lock / Start the loop thread and create the session in it; the caller holds self._lock"""
+        self._io = concurrent.futures.ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="async-io")
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="async-download-loop", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._open(), self._loop).result()
+
+    async def _open(self):
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host, ssl=False)
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+        headers = {
+            'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8',
+            'Accept-Encoding': 'gzip, deflate, br',
+            'Connection': 'keep-alive'
+        }
+        self._session = aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers)
+
+    def submit(self, task):
+        """
+        调度下载任务；未完成的任务过多时阻塞，与线程管道的有界队列一致
+        Schedule a download task; blocks while too many are pending, like the thread pipeline's bounded queue
+        """
+        self._slots.acquire()
+        with self._lock:
+            if self._loop is None:
+                self._start()
+            self.stats["submitted"] += 1
+            future = asyncio.run_coroutine_threadsafe(self._run_one(task), self._loop)
+            self._pending.add(future)
+        future.add_done_callback(self._finished)
+
+    def _finished(self, future):
+        with self._lock:
+            self._pending.discard(future)
+        self._slots.release()
+
+    def join(self):
+        """等待所有已提交的任务完成 / Wait until every submitted task is done"""
+        while True:
+            with self._lock:
+                pending = list(self._pending)
+            if not pending:
+                return
+            concurrent.futures.wait(pending)
+
+    def close(self):
+        """下载剩余任务后关闭会话、事件循环和I/O线程 / Finish the remaining tasks, then close the session, the loop and the I/O threads"""
+        self.join()
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._session.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join()
+        loop.close()
+        self._io.shutdown(wait=True)
+
+    async def _blocking(self, fn, *args, **kwargs):
+        """在I/O线程池中执行阻塞调用 / Run a blocking call on the I/O thread pool"""
+        return await asyncio.get_running_loop().run_in_executor(self._io, functools.partial(fn, *args, **kwargs))
+
+    async def _run_one(self, task):
+        try:
+            result = await self._download_one(self._session, self._semaphore, task)
+        except Exception as e:
+            print(f"  ✗ 异步下载出错 / Async download error: {task.img_src} - {str(e)}")
+            if self.on_failed:
+                await self._blocking(self.on_failed, task, error=e)
+            result = False
+        with self._lock:
+            self.stats["downloaded" if result else "failed"] += 1
+        return result
+
+    def _prepare_part(self, part_path):
+        """
+        返回可续传的(偏移, If-Range校验值)；版本未知的部分文件删除后从头下载
+        Return the resumable (offset, If-Range validator); a partial file of unknown version is deleted and the download starts over
+        """
+        if self.convert or not os.path.exists(part_path):
+            return 0, None
+        offset = os.path.getsize(part_path)
+        resume_validator = read_part_validator(part_path)
+        if offset and not resume_validator:
+            discard_part(part_path)
+            return 0, None
+        return offset, resume_validator
+
+    def _open_part(self, part_path, offset, validators, status):
+        """打开.part文件，返回(文件, hasher)；200时从头写入并记录版本 / Open the .part file and return (file, hasher); a 200 writes from the start and records the version"""
+        if status == 200:
+            write_part_validator(part_path, range_validator(validators))
+        # 续传时先读入已有部分计算哈希 / When resuming, hash the existing part first
+        hasher = hash_file(part_path) if offset else hashlib.sha256()
+        return open(part_path, 'ab' if offset else 'wb'), hasher
+
+    def _finish_part(self, task, save_path, part_path, expected, validators, hasher):
+        """
+        大小与完整长度一致才重命名，避免把截断的文件记为已下载；不完整的.part保留给重试续传
+        Only rename when the size matches the full length, so truncated files are never recorded; an incomplete .part is kept for the retry to resume
+        """
+        size = os.path.getsize(part_path)
+        if expected is not None and size != expected:
+            print(f"  ✗ {task.category}/id{task.project_id} 第 {task.idx+1} 张图片不完整 ({size}/{expected})，将续传 / Image incomplete, will resume")
+            if self.on_failed:
+                self.on_failed(task, error=IOError(f"incomplete {size}/{expected}"))
+            return False
+        os.replace(part_path, save_path)
+        discard_part(part_path)
+        validators["content_length"] = size
+        return self.on_saved(task, save_path, validators, hasher.hexdigest())
+
+    async def _download_one(self, session, semaphore, task):
+        save_path = self.save_path_for(task)
+        if self.local_fetch and await self._blocking(self.local_fetch, task, save_path):
+            return True
+        request_headers = {'User-Agent': random_ua()["User-Agent"], 'Accept-Encoding': 'identity'}
+        if task.referer:
+            request_headers['Referer'] = task.referer
+        part_path = save_path + PART_SUFFIX
+        offset, resume_validator = await self._blocking(self._prepare_part, part_path)
+        if offset:
+            # 与线程下载器相同：Range续传，内容已变化时If-Range让服务器返回完整的200
+            # Same as the thread downloader: resume with Range, and If-Range makes the server send a full 200 when the content changed
+            request_headers['Range'] = f"bytes={offset}-"
+            request_headers['If-Range'] = resume_validator
+        elif self.validators_for:
+            request_headers.update(conditional_headers(await self._blocking(self.validators_for, task)))
+        while True:
+            async with semaphore:
+                if self.rate_limiter:
+                    await asyncio.sleep(self.rate_limiter.reserve(task.img_src))
+                start = time.monotonic()
+                try:
+                    response = await session.get(task.img_src, headers=request_headers)
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    if self.rate_limiter:
+                        self.rate_limiter.record(task.img_src, error=True)
+                    raise
+                if self.rate_limiter:
+                    self.rate_limiter.record(task.img_src, response.status, time.monotonic() - start,
+                                             retry_after=response.headers.get('Retry-After'))
+                async with response:
+                    if response.status == 304:
+                        print(f"  ✓ {task.category}/id{task.project_id} 第 {task.idx+1} 张图片未修改 / Image {task.idx+1} not modified")
+                        return True
+                    if response.status == 416 and offset:
+                        # 与线程下载器相同：部分文件无效，删除后立即不带Range从头下载
+                        # Same as the thread downloader: the partial file is invalid, so delete it and start over right away without Range
+                        print(f"  • {task.category}/id{task.project_id} 第 {task.idx+1} 张图片续传范围无效，从头下载 / Resume range rejected, restarting image {task.idx+1}")
+                        await self._blocking(discard_part, part_path)
+                        offset = 0
+                        del request_headers['Range'], request_headers['If-Range']
+                        continue
+                    if response.status not in (200, 206) or (response.status == 206 and not offset):
+                        print(f"  ✗ {task.category}/id{task.project_id} 第 {task.idx+1} 张图片下载失败，HTTP状态码: {response.status}")
+                        if self.on_failed:
+                            await self._blocking(self.on_failed, task, status=response.status)
+                        return False
+                    validators = response_validators(response.headers)
+                    if self.convert:
+                        # 读入内存，随后在CPU池中编码写盘，不写中间文件 / Read into memory, then encode and write on the CPU pool without an intermediate file
+                        data = await response.read()
+                    else:
+                        if response.status == 200:
+                            offset = 0
+                        expected = expected_total_size(response.status, response.headers, offset)
+                        # 流式写入 .part 文件，不在内存中保留整张图片；写入在I/O线程中进行
+                        # Stream to a .part file without buffering the whole image; writes happen on the I/O threads
+                        f, hasher = await self._blocking(self._open_part, part_path, offset, validators, response.status)
+                        try:
+                            async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                                await self._blocking(_write_chunk, f, hasher, chunk)
+                        finally:
+                            await self._blocking(f.close)
+            break
+        if self.convert:
+            return await self._convert_one(task, save_path, data, validators)
+        return await self._blocking(self._finish_part, task, save_path, part_path, expected, validators, hasher)
+
+    async def _convert_one(self, task, save_path, data, validators):
+        """校验内存中的正文后交给convert编码写盘 / Validate the in-memory body, then hand it to convert to encode and write"""
+        if validators["content_length"] is not None and len(data) != validators["content_length"]:
+            print(f"  ✗ {task.category}/id{task.project_id} 第 {task.idx+1} 张图片不完整 ({len(data)}/{validators['content_length']}) / Image incomplete")
+            if self.on_failed:
+                await self._blocking(self.on_failed, task, error=IOError(f"incomplete {len(data)}/{validators['content_length']}"))
+            return False
+        validators["content_length"] = len(data)
+        try:
+            # 提交转换会加锁并可能创建进程池，放到I/O线程中，不阻塞其他下载 / Submitting takes locks and may create the process pool, so it runs on the I/O threads without blocking other downloads
+            future = await self._blocking(self.convert, data, save_path)
+            _, sha256 = await asyncio.wrap_future(future)
+        except Exception as e:
+            # 无法解码的图片重新下载也不会变好，不交给on_failed重试 / An undecodable image will not improve on re-download, so on_failed is not asked to retry
+            print(f"  ✗ {task.category}/id{task.project_id} 第 {task.idx+1} 张图片转换失败: {str(e)} / Image {task.idx+1} conversion failed")
+            return False
+        # 磁盘上是转换后的文件，按其内容的哈希记录 / The file on disk is the converted one, so record the hash of its bytes
+        return await self._blocking(self.on_saved, task, save_path, validators, sha256)
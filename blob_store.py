@@ -0,0 +1,77 @@
+"""
+内容寻址存储 - 相同内容的图片只保留一份，分类/项目路径通过硬链接指向它
+Content-Addressed Store - identical images are kept once, category/project paths hardlink to it
+"""
+
+import os
+
+
+class BlobStore:
+    """
+    以sha256为名保存唯一的图片数据(blobs/ab/abcdef...)，分类目录中的文件是指向它的硬链接
+    Keeps one copy of each image under its sha256 (blobs/ab/abcdef...); files in the
+    category directories are hardlinks to it
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._link_warned = False
+        self.stats = {"stored": 0, "deduplicated": 0}
+
+    def blob_path(self, digest):
+        """哈希对应的blob路径 / Blob path for a hash"""
+        return os.path.join(self.root, digest[:2], digest)
+
+    def has(self, digest):
+        """是否已存在该内容 / Whether the content is already stored"""
+        return os.path.exists(self.blob_path(digest))
+
+    def materialize(self, digest, path):
+        """
+        将已存储的内容硬链接到path，不存在返回False
+        Hardlink stored content to path, returns False when the content is absent
+        """
+        blob = self.blob_path(digest)
+        if not os.path.exists(blob):
+            return False
+        tmp_path = f"{path}.link"
+        try:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            os.link(blob, tmp_path)
+            os.replace(tmp_path, path)
+            return True
+        except OSError as e:
+            self._warn_link(e)
+            return False
+
+    def ingest(self, digest, path):
+        """
+        将刚写入的文件纳入存储：内容已存在时用硬链接替换path(释放重复数据)，否则path成为新的blob
+        Bring a freshly written file into the store: when the content already exists path is
+        replaced by a hardlink (freeing the duplicate), otherwise path becomes the new blob
+
+        Returns:
+            bool: 是否为重复内容 / Whether the content was a duplicate
+        """
+        if self.materialize(digest, path):
+            self.stats["deduplicated"] += 1
+            return True
+        blob = self.blob_path(digest)
+        try:
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            os.link(path, blob)
+            self.stats["stored"] += 1
+        except FileExistsError:
+            # 另一个下载线程刚存入相同内容 / Another worker just stored the same content
+            if self.materialize(digest, path):
+                self.stats["deduplicated"] += 1
+                return True
+        except OSError as e:
+            self._warn_link(e)
+        return False
+
+    def _warn_link(self, e):
+        if not self._link_warned:
+            self._link_warned = True
+            print(f"⚠ 无法创建硬链接，重复图片将保留独立副本: {str(e)} / Cannot create hardlinks, duplicates keep separate copies")
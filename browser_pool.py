@@ -0,0 +1,126 @@
+"""
+浏览器池 - 多个无头Chrome并行处理分类和项目
+Browser Pool - several headless Chrome workers crawling categories and projects in parallel
+"""
+
+import queue
+import threading
+
+DEFAULT_POOL_SIZE = 2        # 默认浏览器数量 / Default number of browsers
+DEFAULT_ITEM_ATTEMPTS = 2    # 单个任务最多尝试次数(换浏览器重试) / Max attempts per item (retried on another browser)
+
+
+class BrowserPool:
+    """
+    每个工作线程持有一个独立的浏览器，从共享队列中取任务；
+    某个浏览器出错时只影响当前任务，该浏览器会被重建，任务交给其他浏览器重试
+    Each worker thread owns its own browser and takes items from a shared queue.
+    A failing browser only affects its current item: the browser is recreated
+    and the item is retried by another worker.
+    """
+
+    def __init__(self, worker_factory, size=DEFAULT_POOL_SIZE, max_item_attempts=DEFAULT_ITEM_ATTEMPTS):
+        """
+        Args:
+            worker_factory (callable): 创建工作对象(需有cleanup方法)，失败返回None / Creates a worker with a cleanup() method, returns None on failure
+            size (int): 浏览器数量 / Number of browsers
+            max_item_attempts (int): 单个任务最多尝试次数 / Maximum attempts per item
+        """
+        self.worker_factory = worker_factory
+        self.size = max(1, size)
+        self.max_item_attempts = max(1, max_item_attempts)
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._alive = 0
+        self.failed_items = []
+
+    def submit(self, item, attempt=1):
+        """添加任务，处理函数可以在运行中继续添加 / Add an item; handlers may add more while running"""
+        self._queue.put((item, attempt))
+
+    def run(self, items, handler):
+        """
+        并行处理所有任务直到队列清空
+        Process every item in parallel until the queue is drained
+
+        Args:
+            items (iterable): 初始任务 / Initial items
+            handler (callable): handler(worker, item, submit) 处理单个任务 / Processes one item
+
+        Returns:
+            list: 多次尝试后仍失败的任务 / Items that still failed after all attempts
+        """
+        for item in items:
+            self.submit(item)
+        self._alive = self.size
+        threads = []
+        for n in range(self.size):
+            t = threading.Thread(target=self._worker_loop, args=(n, handler), name=f"browser-worker-{n}", daemon=True)
+            t.start()
+            threads.append(t)
+        self._queue.join()
+        for _ in threads:
+            self._queue.put(None)
+        for t in threads:
+            t.join()
+        return self.failed_items
+
+    def _create_worker(self, n):
+        try:
+            worker = self.worker_factory()
+        except Exception as e:
+            print(f"浏览器 {n} 初始化出错: {str(e)} / Browser {n} initialization error")
+            worker = None
+        if worker is None:
+            print(f"✗ 浏览器 {n} 不可用 / Browser {n} unavailable")
+        return worker
+
+    def _worker_exit(self, n):
+        """工作线程退出；若已无可用浏览器，丢弃剩余任务以免run()永久等待
+        Worker exits; if no browser is left, drop the remaining items so run() does not wait forever"""
+        with self._lock:
+            self._alive -= 1
+            if self._alive > 0:
+                return
+            print("✗ 所有浏览器均不可用，放弃剩余任务 / No browser left, abandoning remaining items")
+            while True:
+                try:
+                    entry = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is not None:
+                    self.failed_items.append(entry[0])
+                self._queue.task_done()
+
+    def _worker_loop(self, n, handler):
+        worker = self._create_worker(n)
+        if worker is None:
+            self._worker_exit(n)
+            return
+        try:
+            while True:
+                entry = self._queue.get()
+                if entry is None:
+                    self._queue.task_done()
+                    return
+                item, attempt = entry
+                try:
+                    handler(worker, item, self.submit)
+                except Exception as e:
+                    print(f"浏览器 {n} 处理 {item} 出错 (尝试 {attempt}/{self.max_item_attempts}): {str(e)} / Browser {n} failed on item")
+                    if attempt < self.max_item_attempts:
+                        self.submit(item, attempt + 1)
+                    else:
+                        with self._lock:
+                            self.failed_items.append(item)
+                    # 重建出错的浏览器，隔离故障 / Recreate the failing browser to isolate the fault
+                    worker.cleanup()
+                    worker = self._create_worker(n)
+                    if worker is None:
+                        self._queue.task_done()
+                        self._worker_exit(n)
+                        return
+                self._queue.task_done()
+        finally:
+            if worker is not None:
+                worker.cleanup()
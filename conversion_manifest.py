@@ -0,0 +1,134 @@
+"""
+转换清单 - 记录每个源文件的(大小, 修改时间, 内容哈希) -> 输出文件，转换工具重复运行时只处理新增或修改的文件
+Conversion Manifest - records (size, mtime, content hash) -> output for every source file so repeated
+conversion runs only touch new or modified files
+"""
+
+import os
+import sqlite3
+import threading
+
+STATUS_PENDING = "pending"     # 爬虫新下载、尚未转换 / Freshly downloaded by the spider, not converted yet
+STATUS_DONE = "done"           # 已转换 / Converted
+COMMIT_INTERVAL = 500          # 每写入N条提交一次 / Commit after every N writes
+
+
+class ConversionManifest:
+    """
+    持久化的 源文件 -> (大小, 修改时间, sha256, 输出文件, 状态) 清单；路径按清单所在目录保存为相对路径，
+    自带锁，爬虫的下载线程和转换工具可以共用同一个文件
+    Persistent source -> (size, mtime, sha256, output, status) manifest; paths are stored relative to the
+    manifest's directory and it has its own lock, so the spider's download workers and the converter can
+    share one file
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS files (
+            path      TEXT PRIMARY KEY,
+            size      INTEGER,
+            mtime_ns  INTEGER,
+            sha256    TEXT,
+            output    TEXT,
+            status    TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_files_sha256 ON files (sha256);
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.root = os.path.dirname(os.path.abspath(path))
+        self._lock = threading.Lock()
+        self._writes = 0
+        os.makedirs(self.root, exist_ok=True)
+        # 爬虫和转换工具可能同时写入，等待对方的写锁 / The spider and the converter may write at once, so wait for each other's locks
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self.conn.commit()
+
+    def _key(self, path):
+        return os.path.relpath(os.path.abspath(path), self.root)
+
+    def _resolve(self, key):
+        return os.path.join(self.root, key)
+
+    def get(self, path):
+        """返回文件的记录，不存在返回None / Return the file's record, None when absent"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT size, mtime_ns, sha256, output, status FROM files WHERE path = ?", (self._key(path),)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"size": row[0], "mtime_ns": row[1], "sha256": row[2],
+                "output": self._resolve(row[3]) if row[3] else None, "status": row[4]}
+
+    @staticmethod
+    def is_unchanged(record, stat, target_path=None):
+        """
+        记录已转换、大小和修改时间未变且输出仍存在时无需再处理；提供target_path时输出还必须是该文件(换了输出格式要重新转换)
+        Nothing to do when the record is converted, size and mtime match and the output still exists; with
+        target_path the output must also be that file (a different output format needs a new conversion)
+        """
+        return (record is not None and record["status"] == STATUS_DONE
+                and record["size"] == stat.st_size and record["mtime_ns"] == stat.st_mtime_ns
+                and record["output"] is not None and os.path.exists(record["output"])
+                and (target_path is None or os.path.abspath(record["output"]) == os.path.abspath(target_path)))
+
+    def _write(self, sql, params):
+        with self._lock:
+            self.conn.execute(sql, params)
+            self._writes += 1
+            if self._writes % COMMIT_INTERVAL == 0:
+                self.conn.commit()
+
+    def record(self, path, stat, sha256, output):
+        """记录一次完成的转换(或已是目标格式的文件) / Record a finished conversion (or a file already in the target format)"""
+        self._write(
+            "INSERT OR REPLACE INTO files (path, size, mtime_ns, sha256, output, status) VALUES (?, ?, ?, ?, ?, ?)",
+            (self._key(path), stat.st_size, stat.st_mtime_ns, sha256, self._key(output), STATUS_DONE)
+        )
+
+    def mark_pending(self, path, sha256=None):
+        """
+        标记新下载的文件待转换；提供sha256时，相同内容已转换过的文件可直接复用输出
+        Mark a freshly downloaded file as pending; with a sha256, content that was already converted reuses its output
+        """
+        self._write(
+            "INSERT OR REPLACE INTO files (path, size, mtime_ns, sha256, output, status) VALUES (?, NULL, NULL, ?, NULL, ?)",
+            (self._key(path), sha256, STATUS_PENDING)
+        )
+        # 爬虫的标记需要立即对转换工具可见 / The spider's marks must be visible to the converter right away
+        with self._lock:
+            self.conn.commit()
+
+    def output_for_hash(self, sha256, suffix=None):
+        """
+        相同内容已转换得到且仍存在的输出文件(可限定扩展名)，没有返回None
+        An existing output converted from the same content (optionally with the given suffix), None without one
+        """
+        if not sha256:
+            return None
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT output FROM files WHERE sha256 = ? AND status = ? AND output IS NOT NULL",
+                (sha256, STATUS_DONE)
+            ).fetchall()
+        for (key,) in rows:
+            output = self._resolve(key)
+            if suffix and not output.lower().endswith(suffix):
+                continue
+            if os.path.exists(output):
+                return output
+        return None
+
+    def pending_count(self):
+        """待转换的文件数 / Number of files pending conversion"""
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM files WHERE status = ?", (STATUS_PENDING,)).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self.conn.commit()
+            self.conn.close()
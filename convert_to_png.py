@@ -2,59 +2,195 @@
 # -*- coding: utf-8 -*-
 
 """
-图片格式转换工具 - 将picture目录中的所有图片转换为PNG格式
+图片格式转换工具 - 将picture目录中的所有图片转换为PNG格式(也可选择WebP、JPEG或AVIF及编码参数)
 Image Format Conversion Tool - Convert all images in the picture directory to PNG format
+(or WebP, JPEG or AVIF with configurable encoder parameters)
 """
 
 import os
+import io
 import sys
+import time
+import hashlib
 from pathlib import Path
 import shutil
 from PIL import Image
 import concurrent.futures
+from conversion_manifest import ConversionManifest, STATUS_PENDING
+from url_cache import copy_or_link
 
-def convert_image_to_png(source_path, verbose=True):
+# 执行器设置 / Executor settings
+EXECUTORS = ("thread", "process")
+DEFAULT_EXECUTOR = "thread"
+PROCESS_CHUNK_SIZE = 32     # 进程模式下每个任务包含的最大文件数 / Maximum files per task in process mode
+SUBMIT_WINDOW_FACTOR = 2    # 每个工作者最多排队的批次数 / Batches queued per worker at most
+
+MANIFEST_NAME = "convert_manifest.db"  # 转换清单文件名(位于图片目录中) / Conversion manifest file name (inside the picture directory)
+HASH_CHUNK_SIZE = 1024 * 1024
+DEFAULT_BENCHMARK_SAMPLE = 50  # 对比编码器时使用的图片数 / Images used when comparing encoders
+
+# 图片文件扩展名 / Image file extensions
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.tiff', '.tif', '.avif'}
+
+# 输出格式：扩展名和PIL格式名 / Output formats: file suffix and PIL format name
+OUTPUT_FORMATS = {
+    "png": {"suffix": ".png", "pil": "PNG"},
+    "webp": {"suffix": ".webp", "pil": "WEBP"},
+    "jpeg": {"suffix": ".jpg", "pil": "JPEG"},
+    "avif": {"suffix": ".avif", "pil": "AVIF"},  # 需要支持AVIF的Pillow / Requires a Pillow build with AVIF support
+}
+DEFAULT_FORMAT = "png"
+DEFAULT_PNG_COMPRESS_LEVEL = 6   # Pillow默认值，0最快、9最小 / Pillow's default, 0 is fastest and 9 smallest
+DEFAULT_QUALITY = 90             # JPEG/有损WebP/AVIF质量 / JPEG, lossy WebP and AVIF quality
+ALREADY_TARGET = "已经是目标格式 / Already in target format"
+
+def normalize_mode(img):
     """
-    将单个图片转换为PNG格式
-    Convert a single image to PNG format
+    如果图片有透明通道，保留它；否则转换为RGB
+    If the image has transparency, preserve it; otherwise convert to RGB
+    """
+    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+        # 保留透明通道 / Preserve transparency channel
+        return img.convert('RGBA')
+    # 转换为RGB / Convert to RGB
+    return img.convert('RGB')
+
+def is_format_available(fmt):
+    """当前Pillow能否写出该格式 / Whether the installed Pillow can write the format"""
+    Image.init()
+    return fmt in OUTPUT_FORMATS and OUTPUT_FORMATS[fmt]["pil"] in Image.SAVE
+
+class OutputEncoder:
+    """
+    输出格式和编码参数：PNG的compress_level/optimize，WebP无损或按质量有损，JPEG/AVIF按质量；
+    只包含简单属性，可以传给工作进程
+    Output format and encoder parameters: PNG compress_level/optimize, lossless or quality-bounded WebP,
+    quality-bounded JPEG/AVIF; holds plain attributes only, so it can be passed to worker processes
     """
+
+    def __init__(self, fmt=DEFAULT_FORMAT, compress_level=DEFAULT_PNG_COMPRESS_LEVEL, optimize=False,
+                 quality=DEFAULT_QUALITY, lossless=True):
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"未知的输出格式 / Unknown output format: {fmt}")
+        if not is_format_available(fmt):
+            raise ValueError(f"当前Pillow不支持写出 {fmt} / The installed Pillow cannot write {fmt}")
+        self.fmt = fmt
+        self.compress_level = min(9, max(0, compress_level))
+        self.optimize = optimize
+        self.quality = min(100, max(1, quality))
+        self.lossless = lossless
+
+    @property
+    def suffix(self):
+        return OUTPUT_FORMATS[self.fmt]["suffix"]
+
+    def target_path(self, source_path):
+        """源文件对应的输出路径 / Output path for a source file"""
+        return str(Path(source_path).with_suffix(self.suffix))
+
+    def save_options(self):
+        """传给Image.save的编码参数 / Encoder parameters passed to Image.save"""
+        if self.fmt == "png":
+            return {"compress_level": self.compress_level, "optimize": self.optimize}
+        if self.fmt == "webp":
+            if self.lossless:
+                # 无损模式下quality表示压缩力度 / In lossless mode quality is the compression effort
+                return {"lossless": True, "quality": self.quality}
+            return {"quality": self.quality}
+        if self.fmt == "jpeg":
+            return {"quality": self.quality, "optimize": self.optimize}
+        return {"quality": self.quality}
+
+    def describe(self):
+        options = ", ".join(f"{key}={value}" for key, value in self.save_options().items())
+        return f"{self.fmt} ({options})"
+
+    def encode(self, img, target):
+        """
+        按模式规则处理后编码写入target(路径或文件对象)，返回编码耗时(秒)
+        Normalize the mode, then encode into target (a path or file object); returns the encode time in seconds
+        """
+        img = normalize_mode(img)
+        if self.fmt == "jpeg" and img.mode == 'RGBA':
+            # JPEG不支持透明通道，合成到白色背景 / JPEG has no alpha channel, composite onto white
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            background.paste(img, mask=img.getchannel('A'))
+            img = background
+        start = time.perf_counter()
+        img.save(target, OUTPUT_FORMATS[self.fmt]["pil"], **self.save_options())
+        return time.perf_counter() - start
+
+def convert_bytes(data, target_path, encoder=None):
+    """
+    将内存中的图片字节直接编码为目标格式，先写临时文件再原子替换；供爬虫在下载后直接转换，不写中间文件
+    Encode in-memory image bytes straight to the target format, writing a temporary file and replacing
+    atomically; used by the spider to convert right after downloading without an intermediate file
+
+    Returns:
+        tuple: (写入的字节数 / bytes written, 输出内容的sha256 / sha256 of the output bytes)
+    """
+    encoder = encoder or OutputEncoder()
+    buffer = io.BytesIO()
+    encoder.encode(Image.open(io.BytesIO(data)), buffer)
+    output = buffer.getvalue()
+    write_atomic(target_path, output)
+    return len(output), hashlib.sha256(output).hexdigest()
+
+def write_atomic(target_path, output):
+    """
+    先写临时文件再原子替换，失败时不留下空的或不完整的目标文件
+    Write a temporary file and replace atomically, so a failure never leaves an empty or partial target
+    """
+    part_path = target_path + ".part"
+    try:
+        with open(part_path, 'wb') as f:
+            f.write(output)
+        os.replace(part_path, target_path)
+    except Exception:
+        # 不留下未完成的临时文件 / Do not leave an incomplete temporary file behind
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+
+def convert_image(source_path, verbose=True, encoder=None):
+    """
+    将单个图片转换为编码器指定的格式
+    Convert a single image to the encoder's format
+
+    Returns:
+        tuple: (是否成功 / success, 消息 / message, (输出字节数 / output bytes, 编码耗时 / encode seconds) 或 / or None)
+    """
+    encoder = encoder or OutputEncoder()
     try:
         # 检查源文件是否存在 / Check if source file exists
         if not os.path.exists(source_path):
             if verbose:
                 print(f"文件不存在: {source_path} / File doesn't exist")
-            return False, "文件不存在 / File doesn't exist"
+            return False, "文件不存在 / File doesn't exist", None
             
-        # 创建目标路径 (替换扩展名为.png) / Create target path (replace extension with .png)
-        target_path = str(Path(source_path).with_suffix('.png'))
+        # 创建目标路径 (替换扩展名) / Create target path (replace the extension)
+        target_path = encoder.target_path(source_path)
         
         # 如果目标文件已存在且与源文件相同，则跳过 / Skip if target file already exists and is the same as source
         if source_path == target_path:
             if verbose:
-                print(f"文件已经是PNG格式: {source_path} / File is already in PNG format")
-            return True, "已经是PNG格式 / Already PNG"
+                print(f"文件已经是{encoder.fmt}格式: {source_path} / File is already in {encoder.fmt} format")
+            return True, ALREADY_TARGET, None
             
-        # 打开图片 / Open the image
-        img = Image.open(source_path)
-        
-        # 如果图片有透明通道，保留它；否则转换为RGB / If image has transparency, preserve it; otherwise convert to RGB
-        if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
-            # 保留透明通道 / Preserve transparency channel
-            img = img.convert('RGBA')
-        else:
-            # 转换为RGB / Convert to RGB
-            img = img.convert('RGB')
-            
-        # 保存为PNG / Save as PNG
-        img.save(target_path, 'PNG')
+        # 在内存中解码和编码，成功后才写入目标文件；损坏的图片不会留下空的目标文件被当作已转换
+        # Decode and encode in memory and only write the target on success, so a corrupt image never
+        # leaves an empty target that later runs would treat as converted
+        buffer = io.BytesIO()
+        seconds = encoder.encode(Image.open(source_path), buffer)
+        write_atomic(target_path, buffer.getvalue())
         
         # 验证转换是否成功 / Verify if conversion was successful
         if os.path.exists(target_path) and os.path.getsize(target_path) > 0:
             if verbose:
                 print(f"✓ 转换成功: {source_path} -> {target_path} / Conversion successful")
                 
-            # 如果源文件不是PNG文件，可以选择删除它 / If source file is not a PNG file, optionally delete it
-            if Path(source_path).suffix.lower() != '.png':
+            # 如果源文件不是目标格式，可以选择删除它 / If source file is not in the target format, optionally delete it
+            if Path(source_path).suffix.lower() != encoder.suffix:
                 try:
                     os.remove(source_path)
                     if verbose:
@@ -63,86 +199,300 @@ def convert_image_to_png(source_path, verbose=True):
                     if verbose:
                         print(f"  无法删除原文件: {str(e)} / Cannot delete original file")
                 
-            return True, "转换成功 / Conversion successful"
+            return True, "转换成功 / Conversion successful", (os.path.getsize(target_path), seconds)
         else:
             if verbose:
                 print(f"✗ 转换失败: {source_path} / Conversion failed")
-            return False, "转换失败 / Conversion failed"
+            return False, "转换失败 / Conversion failed", None
             
     except Exception as e:
         if verbose:
             print(f"✗ 处理图片时出错: {source_path} - {str(e)} / Error processing image")
-        return False, f"错误: {str(e)} / Error: {str(e)}"
+        return False, f"错误: {str(e)} / Error: {str(e)}", None
 
-def process_directory(directory_path, recursive=True, verbose=True):
+def convert_image_to_png(source_path, verbose=True):
     """
-    处理目录中的所有图片
-    Process all images in a directory
+    将单个图片转换为PNG格式
+    Convert a single image to PNG format
+    """
+    success, message, _ = convert_image(source_path, verbose)
+    return success, message
+
+def source_fingerprint(path, suffix):
+    """
+    转换前记录源文件的stat和sha256(已是目标格式的文件不会被改写，不计算哈希)
+    Record the source's stat and sha256 before converting (files already in the target format are left as is,
+    so they are not hashed)
+    """
+    try:
+        stat = os.stat(path)
+        if Path(path).suffix.lower() == suffix:
+            return stat, None
+        hasher = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                hasher.update(block)
+        return stat, hasher.hexdigest()
+    except OSError:
+        return None
+
+def convert_chunk(paths, verbose=True, fingerprint=False, encoder=None):
+    """
+    在工作进程中依次转换一批图片，减少进程间通信次数；fingerprint为True时同时返回源文件指纹供清单记录
+    Convert a batch of images in a worker process, cutting inter-process round trips; with fingerprint=True
+    the source fingerprint is returned as well for the manifest
+    """
+    encoder = encoder or OutputEncoder()
+    results = []
+    for path in paths:
+        info = source_fingerprint(path, encoder.suffix) if fingerprint else None
+        success, message, encoded = convert_image(path, verbose, encoder)
+        results.append((path, success, message, info, encoded))
+    return results
+
+def default_workers(executor):
+    """
+    默认工作数：进程模式按CPU核数，线程模式保持原来的上限
+    Default worker count: one per core in process mode, the original cap in thread mode
+    """
+    cpus = os.cpu_count() or 1
+    return cpus if executor == "process" else min(10, cpus * 2)
+
+def iter_image_files(directory_path, recursive=True):
+    """
+    用os.scandir逐个产生图片路径，边遍历边转换，不在内存中保存完整列表；用栈代替递归，同一时间只打开一个目录
+    Yield image paths with os.scandir so conversion starts while discovery is still running and the full
+    list is never held in memory; uses a stack instead of recursion so only one directory is open at a time
+    """
+    stack = [directory_path]
+    while stack:
+        current = stack.pop()
+        subdirs = []
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS:
+                            yield entry.path
+                    except OSError:
+                        continue
+        except OSError as e:
+            print(f"无法读取目录: {current} - {str(e)} / Cannot read directory")
+            continue
+        # 如果不递归，则只处理第一层 / If not recursive, only process the first level
+        if recursive:
+            stack.extend(reversed(subdirs))
+
+def iter_chunks(paths, max_size):
+    """
+    将路径分批，批大小从1开始倍增到max_size：小目录也能分给所有工作进程，大目录摊薄通信开销
+    Group paths into batches whose size doubles from 1 up to max_size, so small trees still reach every
+    worker and large trees amortize the communication overhead
+    """
+    size = 1
+    chunk = []
+    for path in paths:
+        chunk.append(path)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+            size = min(max_size, size * 2)
+    if chunk:
+        yield chunk
+
+def reuse_converted_output(manifest, path, sha256, encoder, verbose=True):
+    """
+    相同内容(由爬虫记录的sha256)已转换过时，直接链接/复制已有输出并删除源文件，无需解码和编码
+    When the same content (sha256 recorded by the spider) was already converted, link or copy the existing
+    output and delete the source without decoding or encoding
+
+    Returns:
+        bool: 是否已复用 / Whether an output was reused
+    """
+    output = manifest.output_for_hash(sha256, encoder.suffix)
+    if output is None:
+        return False
+    target_path = encoder.target_path(path)
+    try:
+        stat = os.stat(path)
+        if os.path.abspath(output) != os.path.abspath(target_path):
+            copy_or_link(output, target_path)
+        if os.path.abspath(path) != os.path.abspath(target_path):
+            os.remove(path)
+    except OSError as e:
+        if verbose:
+            print(f"  无法复用已转换的输出: {str(e)} / Cannot reuse converted output")
+        return False
+    manifest.record(path, stat, sha256, target_path)
+    manifest.record(target_path, os.stat(target_path), None, target_path)
+    if verbose:
+        print(f"✓ 内容相同，复用已转换的输出: {path} -> {target_path} / Same content, reused converted output")
+    return True
+
+def process_directory(directory_path, recursive=True, verbose=True, executor=DEFAULT_EXECUTOR, workers=None,
+                      manifest_path=None, encoder=None):
+    """
+    处理目录中的所有图片：边发现边提交，未完成的批次数量有上限，内存占用不随文件数增长
+    Process all images in a directory: files are submitted as they are discovered and the number of
+    in-flight batches is bounded, so memory stays flat regardless of the file count
+
+    Args:
+        executor (str): thread使用线程池；process使用进程池，绕过GIL让解码和PNG编码在多核上并行
+                        thread uses a thread pool; process uses a process pool so decoding and PNG
+                        encoding run in parallel across cores instead of contending for the GIL
+        workers (int): 工作线程/进程数，默认见default_workers / Worker threads or processes, see default_workers
+        manifest_path (str): 转换清单路径，大小和修改时间未变的文件直接跳过；None时不使用清单
+                             Conversion manifest path; files with unchanged size and mtime are skipped; None disables it
+        encoder (OutputEncoder): 输出格式和编码参数，默认PNG / Output format and encoder parameters, PNG by default
     """
     # 确保目录存在 / Ensure directory exists
     if not os.path.exists(directory_path) or not os.path.isdir(directory_path):
         print(f"错误: 目录不存在: {directory_path} / Error: Directory doesn't exist")
         return
-        
-    # 图片文件扩展名 / Image file extensions
-    image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.tiff', '.tif'}
-    
-    # 收集要处理的文件 / Collect files to process
-    image_files = []
-    
-    # 遍历目录 / Traverse directory
-    for root, dirs, files in os.walk(directory_path):
-        for file in files:
-            file_path = os.path.join(root, file)
-            extension = os.path.splitext(file)[1].lower()
-            
-            # 检查是否是图片文件 / Check if it's an image file
-            if extension in image_extensions:
-                image_files.append(file_path)
-                
-        # 如果不递归，则在第一层后停止 / If not recursive, stop after the first level
-        if not recursive:
-            break
     
     # 统计信息 / Statistics
-    total_images = len(image_files)
+    total_images = 0
     successful = 0
     failed = 0
     skipped = 0
+    unchanged = 0
+    reused = 0
+    output_bytes = 0
+    encode_seconds = 0.0
+    encoder = encoder or OutputEncoder()
+    manifest = ConversionManifest(manifest_path) if manifest_path else None
     
+    if executor not in EXECUTORS:
+        print(f"未知的执行器 {executor}，使用 {DEFAULT_EXECUTOR} / Unknown executor {executor}, using {DEFAULT_EXECUTOR}")
+        executor = DEFAULT_EXECUTOR
+    workers = max(1, workers or default_workers(executor))
+    if executor == "process":
+        # 分批提交，每批在一个进程中完成，结果随完成顺序返回 / Submit in batches; each batch runs in one process and results stream back as they finish
+        pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+        max_chunk = PROCESS_CHUNK_SIZE
+    else:
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        max_chunk = 1
+    # 未完成批次的上限，保证工作者不空闲又不积压 / Bound on in-flight batches: keeps workers busy without piling up
+    window = workers * SUBMIT_WINDOW_FACTOR
     if verbose:
-        print(f"\n找到 {total_images} 个图片文件 / Found {total_images} image files")
+        print(f"\n执行器: {executor}，工作数: {workers}，提交窗口: {window} 批 / Executor: {executor}, workers: {workers}, submission window: {window} batches")
+        print(f"输出格式: {encoder.describe()} / Output format")
     
-    # 使用线程池加速处理 / Use thread pool to speed up processing
-    with concurrent.futures.ThreadPoolExecutor(max_workers=min(10, os.cpu_count() * 2)) as executor:
-        # 创建转换任务 / Create conversion tasks
-        future_to_path = {
-            executor.submit(convert_image_to_png, path, verbose): path 
-            for path in image_files
-        }
-        
-        # 处理结果 / Process results
-        for i, future in enumerate(concurrent.futures.as_completed(future_to_path), 1):
-            path = future_to_path[future]
-            success, message = future.result()
-            
-            if success:
-                if "已经是PNG格式" in message:
-                    skipped += 1
+    def collect(done):
+        nonlocal total_images, successful, failed, skipped, output_bytes, encode_seconds
+        for future in done:
+            for path, success, message, info, encoded in future.result():
+                total_images += 1
+                if encoded is not None:
+                    output_bytes += encoded[0]
+                    encode_seconds += encoded[1]
+                if success and manifest is not None and info is not None:
+                    stat, sha256 = info
+                    target_path = encoder.target_path(path)
+                    try:
+                        manifest.record(path, stat, sha256, target_path)
+                        if target_path != path:
+                            manifest.record(target_path, os.stat(target_path), None, target_path)
+                    except OSError:
+                        pass
+                if success:
+                    if message == ALREADY_TARGET:
+                        skipped += 1
+                    else:
+                        successful += 1
                 else:
-                    successful += 1
-            else:
-                failed += 1
-                
-            if verbose:
-                print(f"进度: {i}/{total_images} ({i/total_images*100:.1f}%) / Progress")
+                    failed += 1
+                    
+                if verbose:
+                    print(f"进度: 已处理 {total_images} 个文件 / Progress: {total_images} files processed")
+    
+    def candidates():
+        # 清单中未变化的文件不提交；爬虫标记了哈希的文件先尝试复用相同内容的输出
+        # Unchanged files are never submitted; files the spider marked with a hash first try to reuse an output of the same content
+        nonlocal unchanged, reused
+        for path in iter_image_files(directory_path, recursive):
+            if manifest is None:
+                yield path
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            record = manifest.get(path)
+            if manifest.is_unchanged(record, stat, encoder.target_path(path)):
+                unchanged += 1
+                continue
+            # 只有爬虫刚标记的待转换记录，其哈希才对应当前内容；其他记录的文件已改变，需要重新转换
+            # Only a pending record from the spider carries the hash of the current bytes; any other record means the file changed and must be converted again
+            if (record is not None and record["status"] == STATUS_PENDING and record["sha256"]
+                    and reuse_converted_output(manifest, path, record["sha256"], encoder, verbose)):
+                reused += 1
+                continue
+            yield path
+    
+    with pool:
+        pending = set()
+        for chunk in iter_chunks(candidates(), max_chunk):
+            # 窗口已满时先等待任意批次完成 / When the window is full, wait for any batch to finish first
+            if len(pending) >= window:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                collect(done)
+            pending.add(pool.submit(convert_chunk, chunk, verbose, manifest is not None, encoder))
+        collect(concurrent.futures.as_completed(pending))
+    if manifest is not None:
+        manifest.close()
     
     # 显示最终统计 / Show final statistics
     print("\n转换完成! / Conversion completed!")
     print(f"总图片数: {total_images} / Total images")
     print(f"成功转换: {successful} / Successfully converted")
-    print(f"已是PNG格式: {skipped} / Already PNG")
+    print(f"已是目标格式: {skipped} / Already in target format")
     print(f"转换失败: {failed} / Failed")
+    if successful:
+        print(f"输出 {encoder.describe()}: {output_bytes/1024/1024:.1f} MB，平均 {output_bytes/successful/1024:.1f} KB/张，"
+              f"编码 {encode_seconds:.1f} 秒，平均 {encode_seconds/successful*1000:.1f} 毫秒/张 / "
+              f"Output bytes and encode time (total, per image)")
+    if manifest is not None:
+        print(f"未变化已跳过: {unchanged} / Unchanged, skipped")
+        print(f"复用相同内容的输出: {reused} / Reused output of identical content")
+
+def benchmark_encoders(directory_path, encoders, sample=DEFAULT_BENCHMARK_SAMPLE, recursive=True):
+    """
+    用目录中的前sample张图片在内存中对比各编码器的输出大小和编码耗时，不写任何文件
+    Compare the output size and encode time of each encoder in memory on the first sample images of a
+    directory, without writing any files
+    """
+    source_bytes = 0
+    images = 0
+    results = {encoder.describe(): [0, 0.0] for encoder in encoders}
+    for path in iter_image_files(directory_path, recursive):
+        if images >= sample:
+            break
+        try:
+            img = Image.open(path)
+            # 先解码，编码耗时不包含解码 / Decode first so the encode time excludes decoding
+            img.load()
+        except Exception as e:
+            print(f"✗ 无法读取: {path} - {str(e)} / Cannot read")
+            continue
+        images += 1
+        source_bytes += os.path.getsize(path)
+        for encoder in encoders:
+            buffer = io.BytesIO()
+            seconds = encoder.encode(img, buffer)
+            results[encoder.describe()][0] += buffer.tell()
+            results[encoder.describe()][1] += seconds
+    if not images:
+        print("没有可对比的图片 / No images to compare")
+        return results
+    print(f"\n编码器对比 ({images} 张图片，源文件共 {source_bytes/1024/1024:.1f} MB) / Encoder comparison ({images} images)")
+    for name, (size, seconds) in results.items():
+        print(f"  {name}: {size/1024/1024:.1f} MB ({size/source_bytes*100:.0f}%)，"
+              f"平均 {seconds/images*1000:.1f} 毫秒/张 / per image")
+    return results
 
 def main():
     """
@@ -150,24 +500,95 @@ def main():
     Main function
     """
     # 确定要处理的目录 / Determine directory to process
-    picture_dir = "picture"
+    picture_dir = None
+    executor = DEFAULT_EXECUTOR
+    workers = None
+    manifest_path = None
+    use_manifest = True
+    encoder_options = {}
+    compare_formats = None
     
     # 检查命令行参数 / Check command line arguments
-    if len(sys.argv) > 1:
-        picture_dir = sys.argv[1]
+    args = sys.argv[1:]
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == "--executor" and i+1 < len(args):
+            executor = args[i+1]
+            i += 1
+        elif arg == "--workers" and i+1 < len(args):
+            workers = int(args[i+1])
+            i += 1
+        elif arg == "--manifest" and i+1 < len(args):
+            manifest_path = args[i+1]
+            i += 1
+        elif arg == "--no-manifest":
+            use_manifest = False
+        elif arg == "--format" and i+1 < len(args):
+            encoder_options["fmt"] = args[i+1].lower()
+            i += 1
+        elif arg == "--compress-level" and i+1 < len(args):
+            encoder_options["compress_level"] = int(args[i+1])
+            i += 1
+        elif arg == "--optimize":
+            encoder_options["optimize"] = True
+        elif arg == "--quality" and i+1 < len(args):
+            encoder_options["quality"] = int(args[i+1])
+            i += 1
+        elif arg == "--lossy":
+            encoder_options["lossless"] = False
+        elif arg == "--compare" and i+1 < len(args):
+            compare_formats = [fmt.strip().lower() for fmt in args[i+1].split(",") if fmt.strip()]
+            i += 1
+        elif arg in ("-h", "--help"):
+            print("用法 / Usage: python convert_to_png.py [目录/directory] [选项/options]")
+            print("  --executor E    thread(默认) 或 process，process在多核上并行编码 / thread (default) or process, process encodes in parallel across cores")
+            print("  --workers N     工作线程/进程数 / Number of worker threads or processes")
+            print(f"  --manifest P    转换清单路径，默认为目录下的{MANIFEST_NAME} / Conversion manifest path, defaults to {MANIFEST_NAME} in the directory")
+            print("  --no-manifest   不使用转换清单，处理所有文件 / Do not use the conversion manifest, process every file")
+            print(f"  --format F      输出格式: {', '.join(OUTPUT_FORMATS)}，默认png / Output format, png by default")
+            print("  --compress-level N  PNG压缩级别0-9，0最快 / PNG compression level 0-9, 0 is fastest")
+            print("  --optimize      PNG/JPEG额外优化(更慢、更小) / Extra PNG/JPEG optimization (slower, smaller)")
+            print("  --quality N     JPEG/有损WebP/AVIF质量1-100 / JPEG, lossy WebP and AVIF quality 1-100")
+            print("  --lossy         WebP使用有损压缩(默认无损) / Lossy WebP (lossless by default)")
+            print("  --compare F1,F2 在内存中对比各格式的大小和编码耗时，不写文件 / Compare size and encode time per format in memory without writing files")
+            return
+        else:
+            picture_dir = arg
+        i += 1
+    
+    try:
+        encoder = OutputEncoder(**encoder_options)
+        if compare_formats:
+            options = {key: value for key, value in encoder_options.items() if key != "fmt"}
+            encoders = [OutputEncoder(fmt, **options) for fmt in compare_formats]
+    except ValueError as e:
+        print(str(e))
+        return
+    
+    if compare_formats:
+        benchmark_encoders(picture_dir or "picture", encoders)
+        return
     
-    print(f"图片格式转换工具 - 将所有图片转换为PNG格式 / Image Format Conversion Tool")
+    print(f"图片格式转换工具 - 将所有图片转换为{encoder.fmt.upper()}格式 / Image Format Conversion Tool")
+    confirm_needed = picture_dir is None
+    picture_dir = picture_dir or "picture"
     print(f"目标目录: {os.path.abspath(picture_dir)} / Target directory")
     
     # 确认操作 / Confirm operation
-    if len(sys.argv) <= 1:  # 没有明确指定目录时请求确认 / Request confirmation when directory is not explicitly specified
+    if confirm_needed:  # 没有明确指定目录时请求确认 / Request confirmation when directory is not explicitly specified
         confirm = input("是否继续? (y/n) / Continue? (y/n): ")
         if confirm.lower() not in ('y', 'yes'):
             print("操作已取消 / Operation canceled")
             return
     
     # 处理目录 / Process directory
-    process_directory(picture_dir, recursive=True)
+    if use_manifest:
+        manifest_path = manifest_path or os.path.join(picture_dir, MANIFEST_NAME)
+    else:
+        manifest_path = None
+    process_directory(picture_dir, recursive=True, executor=executor, workers=workers, manifest_path=manifest_path,
+                      encoder=encoder)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
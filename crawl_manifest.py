@@ -0,0 +1,89 @@
+"""
+爬取清单 - 记录每个项目的图片数量、图片URL列表哈希、列表页条目哈希和最后出现时间，供增量爬取比较
+Crawl Manifest - records each project's image count, image URL list hash, listing entry hash and
+last-seen time so incremental crawls can diff against it
+"""
+
+import os
+import json
+import time
+import hashlib
+
+
+def url_list_hash(urls):
+    """图片URL列表的哈希(保序，没有URL的幻灯片计为空行) / Hash of an image URL list (order-sensitive, slides without a URL count as empty lines)"""
+    return hashlib.sha256("\n".join(url or "" for url in urls).encode('utf-8')).hexdigest()
+
+
+def listing_hash(entry):
+    """
+    列表页条目(标题、缩略图、链接)的哈希，无条目返回None
+    Hash of a listing entry (title, thumbnail, link), None without an entry
+    """
+    if not entry:
+        return None
+    fields = [entry.get("href") or "", entry.get("title") or "", entry.get("thumbnail") or ""]
+    return hashlib.sha256("\n".join(fields).encode('utf-8')).hexdigest()
+
+
+class CrawlManifest:
+    """
+    {"projects": {分类: {项目ID: {image_count, url_list_hash, listing_hash, last_seen}}}} 形式的JSON清单；
+    调用方负责加锁
+    JSON manifest of the form {"projects": {category: {project_id: {image_count, url_list_hash, listing_hash,
+    last_seen}}}}; callers hold the lock
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._modified = False
+        self.data = self._load()
+
+    def _load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if isinstance(data, dict) and isinstance(data.get("projects"), dict):
+                    return data
+                print("爬取清单格式无效，将重新建立 / Crawl manifest has invalid format, starting a new one")
+            except Exception as e:
+                print(f"加载爬取清单失败: {str(e)} / Failed to load crawl manifest")
+        return {"projects": {}}
+
+    def get(self, category, project_id):
+        """返回项目记录，不存在返回None / Return the project record, None when absent"""
+        return self.data["projects"].get(category, {}).get(str(project_id))
+
+    def record_visit(self, category, project_id, image_count, urls_hash, entry_hash):
+        """记录一次完整的项目访问 / Record a completed project visit"""
+        self.data["projects"].setdefault(category, {})[str(project_id)] = {
+            "image_count": image_count,
+            "url_list_hash": urls_hash,
+            "listing_hash": entry_hash,
+            "last_seen": time.time()
+        }
+        self._modified = True
+
+    def mark_seen(self, category, project_id):
+        """项目在列表页中再次出现但未访问时更新时间 / Update last_seen when a project is listed again but not visited"""
+        record = self.get(category, project_id)
+        if record is not None:
+            record["last_seen"] = time.time()
+            self._modified = True
+
+    def save(self):
+        """原子写入清单 / Write the manifest atomically"""
+        if not self._modified:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+            self._modified = False
+        except Exception as e:
+            print(f"保存爬取清单失败: {str(e)} / Failed to save crawl manifest")
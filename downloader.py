@@ -0,0 +1,404 @@
+"""
+图片下载器 - 基于连接池的requests.Session，复用TCP/TLS连接
+Image Downloader - pooled requests.Session that reuses TCP/TLS connections
+"""
+
+import os
+import re
+import hashlib
+import time
+import queue
+import threading
+from collections import namedtuple
+import requests
+from requests.adapters import HTTPAdapter
+from random_user_agent import random_ua
+
+# 默认下载设置 / Default download settings
+DEFAULT_POOL_SIZE = 10      # 每个主机的最大连接数 / Maximum connections per host
+DEFAULT_TIMEOUT = 5         # 请求超时时间(秒) / Request timeout in seconds
+CHUNK_SIZE = 8192           # 流式写入块大小 / Streaming write chunk size
+DEFAULT_WORKERS = 4         # 下载线程数 / Number of download worker threads
+DEFAULT_QUEUE_DEPTH = 64    # 待下载队列最大长度 / Maximum pending download queue depth
+DEFAULT_RESUME_ATTEMPTS = 3 # 中断后用Range续传的次数 / Range-resume attempts after an interrupted transfer
+PART_SUFFIX = ".part"       # 未完成下载的临时文件后缀 / Suffix of incomplete download files
+VALIDATOR_SUFFIX = ".validator"  # 保存部分文件对应版本(If-Range)的旁路文件后缀 / Sidecar suffix holding the version (If-Range) of a partial file
+
+# 由Selenium线程收集、下载线程消费的任务 / Task collected by the Selenium thread and consumed by download workers
+DownloadTask = namedtuple('DownloadTask', ['category', 'project_id', 'idx', 'img_src', 'referer'])
+
+# 下载结果；304未修改时ok为True且不写文件；sha256为写入内容的哈希
+# Download result; ok is True without writing the file on a 304; sha256 is the hash of the written bytes
+DownloadResult = namedtuple('DownloadResult', ['ok', 'status_code', 'validators', 'sha256'], defaults=(None,))
+
+
+def hash_file(path, hasher=None):
+    """计算文件的sha256(可传入已有的hasher继续更新) / sha256 of a file (optionally continuing an existing hasher)"""
+    hasher = hasher or hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            hasher.update(chunk)
+    return hasher
+
+
+def conditional_headers(validators):
+    """根据已保存的校验信息构造条件请求头 / Build conditional request headers from stored validators"""
+    headers = {}
+    if validators:
+        if validators.get("etag"):
+            headers['If-None-Match'] = validators["etag"]
+        if validators.get("last_modified"):
+            headers['If-Modified-Since'] = validators["last_modified"]
+    return headers
+
+
+def expected_total_size(status_code, headers, offset):
+    """
+    根据Content-Range/Content-Length计算完整文件大小，未知返回None
+    Compute the complete file size from Content-Range/Content-Length, None when unknown
+    """
+    if headers.get('Content-Encoding', 'identity') != 'identity':
+        # 压缩传输时长度对应的是编码后的字节 / With a content encoding the length counts encoded bytes
+        return None
+    if status_code == 206:
+        m = re.match(r"bytes\s+\d+-\d+/(\d+)", headers.get('Content-Range', ''))
+        if m:
+            return int(m.group(1))
+    content_length = headers.get('Content-Length')
+    if content_length and content_length.isdigit():
+        return int(content_length) + (offset if status_code == 206 else 0)
+    return None
+
+
+def range_validator(validators):
+    """
+    可用于If-Range的校验值：强ETag优先，否则Last-Modified；弱ETag不能用于If-Range
+    Validator usable for If-Range: a strong ETag first, otherwise Last-Modified; weak ETags are not allowed in If-Range
+    """
+    if not validators:
+        return None
+    etag = validators.get("etag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return validators.get("last_modified")
+
+
+def read_part_validator(part_path):
+    """读取部分文件对应的If-Range校验值，没有返回None / Read the If-Range validator of a partial file, None without one"""
+    try:
+        with open(part_path + VALIDATOR_SUFFIX, 'r', encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def write_part_validator(part_path, validator):
+    """
+    开始写入部分文件时保存其版本，之后的运行续传时才能发送If-Range；没有校验值时删除旧的旁路文件
+    Save the version of a partial file when writing starts so later runs can send If-Range when resuming;
+    without a validator the old sidecar is removed
+    """
+    if validator:
+        with open(part_path + VALIDATOR_SUFFIX, 'w', encoding='utf-8') as f:
+            f.write(validator)
+    elif os.path.exists(part_path + VALIDATOR_SUFFIX):
+        os.remove(part_path + VALIDATOR_SUFFIX)
+
+
+def discard_part(part_path):
+    """删除部分文件及其旁路文件 / Delete a partial file and its sidecar"""
+    for path in (part_path, part_path + VALIDATOR_SUFFIX):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def response_validators(headers):
+    """从响应头中提取ETag/Last-Modified/Content-Length / Extract ETag/Last-Modified/Content-Length from response headers"""
+    content_length = headers.get('Content-Length')
+    return {
+        "etag": headers.get('ETag'),
+        "last_modified": headers.get('Last-Modified'),
+        "content_length": int(content_length) if content_length and content_length.isdigit() else None
+    }
+
+
+class ImageDownloader:
+    """
+    共享的图片下载器，在项目和分类之间复用同一个连接池
+    Shared image downloader that reuses one connection pool across projects and categories
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT, verify=False,
+                 resume_attempts=DEFAULT_RESUME_ATTEMPTS, rate_limiter=None, retry_policy=None):
+        self.timeout = timeout
+        # 可选的按主机自适应限速器 / Optional per-host adaptive rate limiter
+        self.rate_limiter = rate_limiter
+        # 可选的重试策略，决定出错后是否以及何时重试 / Optional retry policy deciding whether and when to retry after errors
+        self.retry_policy = retry_policy
+        self.verify = verify
+        self.resume_attempts = max(0, resume_attempts)
+        self.session = requests.Session()
+        # pool_connections为缓存的主机数，pool_maxsize为每个主机的连接数
+        # pool_connections is the number of cached hosts, pool_maxsize the connections per host
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8',
+            'Accept-Encoding': 'gzip, deflate, br',
+            'Connection': 'keep-alive'
+        })
+
+    def fetch(self, url, referer=None, headers=None):
+        """发起流式GET请求 / Issue a streaming GET request"""
+        request_headers = {'User-Agent': random_ua()["User-Agent"]}
+        if referer:
+            request_headers['Referer'] = referer
+        if headers:
+            request_headers.update(headers)
+        if self.rate_limiter is None:
+            return self.session.get(url, headers=request_headers, stream=True,
+                                    timeout=self.timeout, verify=self.verify)
+
+        self.rate_limiter.acquire(url)
+        start = time.monotonic()
+        try:
+            response = self.session.get(url, headers=request_headers, stream=True,
+                                        timeout=self.timeout, verify=self.verify)
+        except requests.RequestException:
+            self.rate_limiter.record(url, error=True)
+            raise
+        # 流式请求，耗时为收到响应头的时间 / Streaming request, so the latency is time to headers
+        self.rate_limiter.record(url, response.status_code, time.monotonic() - start,
+                                 retry_after=response.headers.get('Retry-After'))
+        return response
+
+    def _retry_wait(self, attempt, error=None, status=None):
+        """
+        第attempt次尝试失败后是否重试，需要时先退避；没有重试策略时传输错误总是重试、HTTP错误不重试
+        Whether to retry after the given failed attempt, backing off first when needed; without a
+        retry policy transport errors are always retried and HTTP errors never are
+        """
+        if self.retry_policy is None:
+            return error is not None
+        if not self.retry_policy.should_retry(attempt, error=error, status=status,
+                                              max_attempts=self.resume_attempts + 1):
+            return False
+        time.sleep(self.retry_policy.delay(attempt))
+        return True
+
+    def download(self, url, save_path, referer=None, validators=None):
+        """
+        下载图片：先写入 .part 文件，中断后用Range续传，校验大小后原子重命名；
+        提供validators时发送条件请求，304时不下载正文
+        Download an image: write to a .part file, resume with Range after an interruption,
+        validate the size and rename atomically. With validators a conditional request is sent
+        and a 304 skips the body.
+
+        Returns:
+            DownloadResult: (是否成功 / success, HTTP状态码 / HTTP status code,
+                             响应校验信息 / response validators, 内容sha256 / content sha256)
+        """
+        part_path = save_path + PART_SUFFIX
+        result = DownloadResult(False, None, None)
+        if self.retry_policy:
+            self.retry_policy.note_request()
+        for attempt in range(self.resume_attempts + 1):
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            resume_validator = read_part_validator(part_path) if offset else None
+            if offset and not resume_validator:
+                # 不知道部分文件来自哪个版本，续传可能拼接不同内容，从头下载
+                # The partial file's version is unknown and resuming could splice different content, so start over
+                discard_part(part_path)
+                offset = 0
+            # 图片本身已压缩，要求原样传输以便Range和Content-Length按字节对应
+            # Images are already compressed; ask for identity encoding so Range and Content-Length match raw bytes
+            headers = {'Accept-Encoding': 'identity'}
+            if offset:
+                headers['Range'] = f"bytes={offset}-"
+                # 内容已变化时服务器返回完整的200而不是206 / When the content changed the server answers with a full 200 instead of a 206
+                headers['If-Range'] = resume_validator
+            else:
+                headers.update(conditional_headers(validators))
+
+            try:
+                response = self.fetch(url, referer=referer, headers=headers)
+            except requests.RequestException as e:
+                print(f"  ⚠ 请求失败 ({attempt+1}/{self.resume_attempts+1}): {str(e)} / Request failed")
+                if self._retry_wait(attempt + 1, error=e):
+                    continue
+                break
+            if response.status_code not in (200, 206, 304, 416):
+                status = response.status_code
+                response.close()
+                print(f"  ⚠ HTTP状态码 {status} ({attempt+1}/{self.resume_attempts+1}) / HTTP status {status}")
+                if self._retry_wait(attempt + 1, status=status):
+                    continue
+                return DownloadResult(False, status, None)
+
+            error = None
+            try:
+                if response.status_code == 304:
+                    return DownloadResult(True, 304, validators)
+                if response.status_code == 416:
+                    # 已有的部分文件无效，删除后从头下载 / The partial file is invalid, start over
+                    discard_part(part_path)
+                    continue
+
+                result = DownloadResult(False, response.status_code, response_validators(response.headers))
+                if response.status_code == 200:
+                    # 服务器不支持Range或条件不满足，从头写入并记录新版本 / Server ignored the range, rewrite from the start and record the new version
+                    offset = 0
+                    write_part_validator(part_path, range_validator(result.validators))
+                expected = expected_total_size(response.status_code, response.headers, offset)
+                # 边写边计算哈希；续传时先读入已有部分 / Hash while writing; when resuming, hash the existing part first
+                hasher = hash_file(part_path) if offset else hashlib.sha256()
+                with open(part_path, 'ab' if offset else 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        if chunk:
+                            f.write(chunk)
+                            hasher.update(chunk)
+            except requests.RequestException as e:
+                print(f"  ⚠ 传输中断 ({attempt+1}/{self.resume_attempts+1}): {str(e)} / Transfer interrupted")
+                error = e
+            finally:
+                # 关闭响应以便连接归还到连接池 / Close response so the connection returns to the pool
+                response.close()
+            if error is not None:
+                # 退避后用Range续传 / Resume with Range after backing off
+                if self._retry_wait(attempt + 1, error=error):
+                    continue
+                break
+
+            size = os.path.getsize(part_path)
+            if expected is not None and size != expected:
+                print(f"  ⚠ 文件大小不完整 ({size}/{expected})，将续传 / Incomplete file, will resume")
+                continue
+            os.replace(part_path, save_path)
+            discard_part(part_path)
+            validators = dict(result.validators)
+            if validators.get("content_length") is None or result.status_code == 206:
+                validators["content_length"] = size
+            return DownloadResult(True, 200, validators, hasher.hexdigest())
+        return DownloadResult(False, result.status_code, None)
+
+    def fetch_bytes(self, url, referer=None, validators=None):
+        """
+        将图片下载到内存而不写盘，供下载后直接转换格式；不做Range续传，失败时按重试策略从头重试
+        Download an image into memory without writing it, for converting right after the download;
+        there is no Range resume, failures are retried from the start according to the retry policy
+
+        Returns:
+            tuple: (DownloadResult, 内容字节，304或失败时为None / content bytes, None on a 304 or failure)
+        """
+        status = None
+        if self.retry_policy:
+            self.retry_policy.note_request()
+        for attempt in range(self.resume_attempts + 1):
+            headers = {'Accept-Encoding': 'identity'}
+            headers.update(conditional_headers(validators))
+            try:
+                response = self.fetch(url, referer=referer, headers=headers)
+            except requests.RequestException as e:
+                print(f"  ⚠ 请求失败 ({attempt+1}/{self.resume_attempts+1}): {str(e)} / Request failed")
+                if self._retry_wait(attempt + 1, error=e):
+                    continue
+                break
+            status = response.status_code
+            if status not in (200, 304):
+                response.close()
+                print(f"  ⚠ HTTP状态码 {status} ({attempt+1}/{self.resume_attempts+1}) / HTTP status {status}")
+                if self._retry_wait(attempt + 1, status=status):
+                    continue
+                return DownloadResult(False, status, None), None
+
+            error = None
+            try:
+                if status == 304:
+                    return DownloadResult(True, 304, validators), None
+                result_validators = response_validators(response.headers)
+                data = response.content
+            except requests.RequestException as e:
+                print(f"  ⚠ 传输中断 ({attempt+1}/{self.resume_attempts+1}): {str(e)} / Transfer interrupted")
+                error = e
+            finally:
+                response.close()
+            if error is not None:
+                if self._retry_wait(attempt + 1, error=error):
+                    continue
+                break
+
+            expected = result_validators["content_length"]
+            if expected is not None and len(data) != expected:
+                print(f"  ⚠ 内容不完整 ({len(data)}/{expected})，将重新下载 / Incomplete body, downloading again")
+                continue
+            result_validators["content_length"] = len(data)
+            return DownloadResult(True, 200, result_validators, hashlib.sha256(data).hexdigest()), data
+        return DownloadResult(False, status, None), None
+
+    def close(self):
+        """关闭会话和连接池 / Close the session and its connection pool"""
+        self.session.close()
+
+
+class DownloadPipeline:
+    """
+    生产者/消费者下载管道：浏览器线程只负责提交任务，线程池负责下载和写盘
+    Producer/consumer download pipeline: the browser thread only submits tasks,
+    a bounded thread pool downloads and writes them
+    """
+
+    def __init__(self, handler, workers=DEFAULT_WORKERS, queue_depth=DEFAULT_QUEUE_DEPTH):
+        """
+        Args:
+            handler (callable): 处理单个DownloadTask，返回是否成功 / Handles one DownloadTask, returns success
+            workers (int): 下载线程数 / Number of worker threads
+            queue_depth (int): 队列满时submit会阻塞 / submit blocks while the queue is full
+        """
+        self.handler = handler
+        self._queue = queue.Queue(maxsize=max(1, queue_depth))
+        self._threads = []
+        self._stats_lock = threading.Lock()
+        self.stats = {"submitted": 0, "downloaded": 0, "failed": 0}
+        for n in range(max(1, workers)):
+            t = threading.Thread(target=self._worker, name=f"download-worker-{n}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, task):
+        """提交下载任务，队列满时阻塞 / Submit a download task, blocks while the queue is full"""
+        self._queue.put(task)
+        with self._stats_lock:
+            self.stats["submitted"] += 1
+
+    def join(self):
+        """等待所有已提交的任务完成 / Wait until every submitted task is done"""
+        self._queue.join()
+
+    def close(self):
+        """处理完剩余任务后停止所有线程 / Stop all workers after the remaining tasks are processed"""
+        if not self._threads:
+            return
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join()
+        self._threads = []
+
+    def _worker(self):
+        while True:
+            task = self._queue.get()
+            try:
+                if task is None:
+                    return
+                ok = False
+                try:
+                    ok = self.handler(task)
+                except Exception as e:
+                    print(f"  ✗ 下载任务出错 / Download task error: {task.img_src} - {str(e)}")
+                with self._stats_lock:
+                    self.stats["downloaded" if ok else "failed"] += 1
+            finally:
+                self._queue.task_done()
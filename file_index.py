@@ -0,0 +1,60 @@
+"""
+图片文件索引 - 每个分类目录只扫描一次，避免逐张图片探测文件系统
+Image File Index - scan each category directory once instead of probing the filesystem per image
+"""
+
+import os
+
+IMAGE_EXTENSIONS = ('.jpg', '.png', '.jpeg', '.webp', '.gif', '.avif')
+
+
+class ImageFileIndex:
+    """
+    分类 -> {id{N}_{idx}: (扩展名, 大小)} 的内存索引，首次访问分类时用一次os.scandir构建，
+    之后随文件写入更新；调用方负责加锁
+    In-memory index of category -> {id{N}_{idx}: (ext, size)}, built with one os.scandir pass
+    the first time a category is accessed and kept up to date as files are written; callers hold the lock
+    """
+
+    def __init__(self, root, extensions=IMAGE_EXTENSIONS):
+        self.root = root
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self._categories = {}
+
+    def _scan(self, category):
+        index = {}
+        directory = os.path.join(self.root, category)
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    stem, ext = os.path.splitext(entry.name)
+                    if ext.lower() not in self.extensions or not entry.is_file():
+                        continue
+                    size = entry.stat().st_size
+                    # 同一图片存在多种扩展名时保留最大的文件 / Keep the largest file when one image has several extensions
+                    if stem not in index or size > index[stem][1]:
+                        index[stem] = (ext, size)
+        except FileNotFoundError:
+            pass
+        print(f"已索引 {category} 目录中的 {len(index)} 张图片 / Indexed {len(index)} images in {category}")
+        return index
+
+    def _category(self, category):
+        if category not in self._categories:
+            self._categories[category] = self._scan(category)
+        return self._categories[category]
+
+    def lookup(self, category, key):
+        """返回 (扩展名, 大小)，不存在返回None / Return (ext, size), or None when absent"""
+        return self._category(category).get(key)
+
+    def update(self, category, path, size=None):
+        """记录新写入的文件 / Record a newly written file"""
+        stem, ext = os.path.splitext(os.path.basename(path))
+        if size is None:
+            size = os.path.getsize(path)
+        self._category(category)[stem] = (ext, size)
+
+    def remove(self, category, key):
+        """移除文件记录 / Forget a file"""
+        self._category(category).pop(key, None)
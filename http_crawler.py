@@ -0,0 +1,314 @@
+"""
+纯HTTP爬取 - 直接解析服务端渲染的ASPX页面，无需启动浏览器
+HTTP-only Crawling - parse the server-rendered ASPX pages directly without launching a browser
+"""
+
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+from retry_policy import HttpStatusError
+
+HTML_ACCEPT = 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'
+DEFAULT_MAX_PAGES = 20      # 分类列表最多跟随的分页数 / Maximum listing pages followed per category
+# 表示"下一页/更多"的链接文字 / Link texts meaning "next page" or "more"
+NEXT_PAGE_TEXTS = ('下一頁', '下一页', '更多', '加載更多', '加载更多', 'next', 'more', 'load more', '»')
+PAGINATION_SCOPE_LEVELS = 3  # 从列表容器向上查找分页的祖先层数 / Ancestor levels above the listing container searched for pagination
+# 没有结束标签的元素 / Elements without an end tag
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr'}
+
+
+class _ContainerParser(HTMLParser):
+    """
+    单次扫描HTML，只收集指定id容器内的链接和图片
+    Single-pass HTML scan that only collects links and images inside the container with the given id
+    """
+
+    def __init__(self, container_id, base_url):
+        super().__init__(convert_charrefs=True)
+        self.container_id = container_id
+        self.base_url = base_url
+        self.found = False
+        self.links = []
+        self.slides = []        # 每个幻灯片的图片URL列表 / Image URLs per slide
+        self.loose_images = []  # 不在幻灯片内的图片 / Images outside any slide
+        self.entries = []       # 每个链接的 {href, title, thumbnail} / {href, title, thumbnail} of each link
+        self._container_tag = None
+        self._depth = 0
+        self._anchor = None     # 当前所在的链接条目 / Entry of the link currently open
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if self._container_tag is None:
+            if attrs.get('id') == self.container_id:
+                self.found = True
+                self._container_tag = tag
+                self._depth = 1
+            return
+
+        # 只统计与容器同名的标签来确定容器结束位置 / Only same-name tags are counted to find the container end
+        if tag == self._container_tag:
+            self._depth += 1
+
+        classes = (attrs.get('class') or '').split()
+        if 'swiper-slide' in classes and 'swiper-slide-duplicate' not in classes:
+            self.slides.append([])
+        elif tag == 'a' and attrs.get('href'):
+            href = urljoin(self.base_url, attrs['href'])
+            self.links.append(href)
+            self._anchor = {"href": href, "title": attrs.get('title') or "", "thumbnail": "", "_text": []}
+            self.entries.append(self._anchor)
+        elif tag == 'img':
+            src = attrs.get('data-src') or attrs.get('src') or ''
+            if src and not src.startswith('data:'):
+                target = self.slides[-1] if self.slides else self.loose_images
+                target.append(urljoin(self.base_url, src))
+                if self._anchor is not None and not self._anchor["thumbnail"]:
+                    self._anchor["thumbnail"] = urljoin(self.base_url, src)
+
+    def handle_data(self, data):
+        if self._anchor is not None:
+            self._anchor["_text"].append(data)
+
+    def handle_endtag(self, tag):
+        if tag == 'a' and self._anchor is not None:
+            text = " ".join("".join(self._anchor.pop("_text")).split())
+            self._anchor["title"] = self._anchor["title"] or text
+            self._anchor = None
+        if self._container_tag is not None and tag == self._container_tag:
+            self._depth -= 1
+            if self._depth == 0:
+                self._container_tag = None
+
+    def image_urls(self):
+        """每个幻灯片取第一张图片(没有图片时为None，下标与图片序号一致)，没有幻灯片时返回全部图片(去重保序)
+        First image of each slide (None without one, so positions match image indexes), or every image when
+        there are no slides (deduplicated, in order)"""
+        if self.slides:
+            return [slide[0] if slide else None for slide in self.slides]
+        seen = set()
+        return [u for u in self.loose_images if not (u in seen or seen.add(u))]
+
+
+class _NextPageParser(HTMLParser):
+    """
+    查找列表容器附近分页中"下一页"的链接：rel=next、文字为下一页/更多或class中含next/more；
+    只在容器的兄弟元素和最多PAGINATION_SCOPE_LEVELS层祖先内查找，页头页脚的导航链接不算
+    Find the "next page" link of the pagination next to the listing container: rel=next, a next/more text,
+    or a next/more class; only the container's siblings and up to PAGINATION_SCOPE_LEVELS ancestors are
+    searched, so header and footer navigation links never match
+    """
+
+    def __init__(self, base_url, container_id):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.container_id = container_id
+        self.candidates = []        # (祖先元素序号, URL，回发控件为None) / (ancestor element serials, URL, None for a postback control)
+        self.container_path = None  # 容器及其祖先的(标签, 序号) / (tag, serial) of the container and its ancestors
+        self._stack = []            # 当前打开的(标签, 序号) / Currently open (tag, serial)
+        self._serial = 0
+        self._href = None
+        self._postback = False
+        self._text = []
+
+    def _path(self):
+        return tuple(serial for _, serial in self._stack)
+
+    def _add(self, href):
+        path = self._path()
+        # 容器内的链接是项目条目 / Links inside the container are project entries
+        if self.container_path is None or self.container_path[-1][1] not in path:
+            self.candidates.append((path, urljoin(self.base_url, href) if href is not None else None))
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag not in VOID_TAGS:
+            self._serial += 1
+            self._stack.append((tag, self._serial))
+            if attrs.get('id') == self.container_id and self.container_path is None:
+                self.container_path = tuple(self._stack)
+        if tag != 'a':
+            return
+        href = attrs.get('href') or ''
+        if href.startswith('javascript:') and '__doPostBack' in href:
+            # ASPX回发分页没有可请求的URL，记为None，由调用方改用浏览器 / ASPX postback pagination has no URL to request; recorded as None so the caller can switch to the browser
+            href = None
+        elif not href or href.startswith(('javascript:', '#')):
+            self._href = None
+            return
+        classes = (attrs.get('class') or '').lower()
+        if 'disabled' in classes:
+            self._href = None
+            return
+        if (attrs.get('rel') or '').lower() == 'next' or re.search(r"(^|[-_\s])(next|more)([-_\s]|$)", classes):
+            self._href = None
+            self._add(href)
+            return
+        self._href = href
+        self._postback = href is None
+        self._text = []
+
+    def handle_data(self, data):
+        if self._href is not None or self._postback:
+            self._text.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == 'a' and (self._href is not None or self._postback):
+            if " ".join("".join(self._text).split()).lower() in NEXT_PAGE_TEXTS:
+                self._add(self._href)
+            self._href = None
+            self._postback = False
+        # 容忍未闭合的标签：弹出到最近的同名标签 / Tolerate unclosed tags: pop back to the nearest tag of this name
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i][0] == tag:
+                del self._stack[i:]
+                break
+
+    def next_control(self):
+        """
+        由近到远在容器的各层祖先内取第一个候选控件，返回(是否找到, URL)；回发控件的URL为None
+        First candidate within the container's ancestors, nearest level first, as (found, URL); a postback control has no URL
+        """
+        if self.container_path is None:
+            return False, None
+        for tag, ancestor in list(reversed(self.container_path[:-1]))[:PAGINATION_SCOPE_LEVELS]:
+            if tag in ('body', 'html'):
+                break
+            for path, url in self.candidates:
+                if ancestor in path:
+                    return True, url
+        return False, None
+
+
+def find_next_control(html, base_url, container_id='mWorkDiv'):
+    """
+    查找列表容器附近分页中的下一页控件，返回(是否找到, URL)；ASPX __doPostBack控件找到但URL为None
+    Find the next-page control of the pagination near the listing container as (found, URL); an ASPX
+    __doPostBack control is found but has no URL
+    """
+    parser = _NextPageParser(base_url, container_id)
+    parser.feed(html)
+    parser.close()
+    return parser.next_control()
+
+
+def projects_from_entries(entries):
+    """
+    按链接中的id=N合并条目，同一项目有多个链接时补全缺失的标题和缩略图
+    Group entries by the id=N in their links, filling in missing titles and thumbnails when a project has several links
+
+    Returns:
+        dict: 项目ID -> {href, title, thumbnail} / project ID -> {href, title, thumbnail}
+    """
+    projects = {}
+    for entry in entries:
+        m = re.search(r"id=(\d+)", entry.get("href") or "")
+        if not m:
+            continue
+        project = projects.setdefault(int(m.group(1)), {"href": entry["href"], "title": "", "thumbnail": ""})
+        project["title"] = project["title"] or entry.get("title") or ""
+        project["thumbnail"] = project["thumbnail"] or entry.get("thumbnail") or ""
+    return projects
+
+
+class HttpCrawler:
+    """
+    使用连接池HTTP客户端获取并解析分类页和详情页
+    Fetch and parse category and detail pages with the pooled HTTP client
+    """
+
+    def __init__(self, downloader, retry_policy=None):
+        """
+        Args:
+            downloader (ImageDownloader): 共享的连接池下载器 / Shared pooled downloader
+            retry_policy (RetryPolicy): 可选的页面请求重试策略 / Optional retry policy for page requests
+        """
+        self.downloader = downloader
+        self.retry_policy = retry_policy
+        self.postback_pagination = False  # 上次discover_projects遇到了无法跟随的回发分页 / The last discover_projects hit postback pagination it cannot follow
+
+    def _get_html(self, url, referer=None):
+        response = self.downloader.fetch(url, referer=referer, headers={'Accept': HTML_ACCEPT})
+        try:
+            if response.status_code != 200:
+                raise HttpStatusError(response.status_code)
+            return response.text
+        finally:
+            response.close()
+
+    def fetch_html(self, url, referer=None):
+        """获取页面HTML，按重试策略重试，最终失败返回None / Fetch page HTML with retries from the policy, returns None on final failure"""
+        try:
+            if self.retry_policy:
+                return self.retry_policy.call(self._get_html, url, referer, description=f"页面请求 / Page request {url}")
+            return self._get_html(url, referer)
+        except HttpStatusError as e:
+            print(f"  ✗ 页面请求失败，HTTP状态码: {e.status} / Page request failed: {url}")
+            return None
+        except Exception as e:
+            print(f"  ✗ 页面请求出错: {str(e)} / Page request error: {url}")
+            return None
+
+    @staticmethod
+    def _parse_html(html, url, container_id):
+        parser = _ContainerParser(container_id, url)
+        parser.feed(html)
+        parser.close()
+        return parser if parser.found else None
+
+    def _parse(self, url, container_id, referer=None):
+        html = self.fetch_html(url, referer=referer)
+        if html is None:
+            return None
+        return self._parse_html(html, url, container_id)
+
+    def discover_projects(self, category_url, max_pages=DEFAULT_MAX_PAGES):
+        """
+        从分类页面的mWorkDiv链接中解析项目条目，并跟随分页链接直到没有新项目；静态页面中没有时返回空字典
+        Parse project entries from the mWorkDiv links of a category page, following pagination links
+        until no new projects appear; empty when absent from the static HTML
+
+        Returns:
+            dict: 项目ID -> {href, title, thumbnail} / project ID -> {href, title, thumbnail}
+        """
+        projects = {}
+        self.postback_pagination = False
+        url, referer, visited = category_url, None, set()
+        for _ in range(max(1, max_pages)):
+            visited.add(url)
+            html = self.fetch_html(url, referer=referer)
+            parser = self._parse_html(html, url, 'mWorkDiv') if html is not None else None
+            if parser is None:
+                break
+            added = 0
+            for project_id, entry in projects_from_entries(parser.entries).items():
+                if project_id not in projects:
+                    projects[project_id] = entry
+                    added += 1
+            found, next_url = find_next_control(html, url)
+            if added and found and next_url is None:
+                # 静态请求无法回发，之后的分页会被遗漏 / Static requests cannot post back, so later pages would be missed
+                print(f"  ⚠ 分页使用ASPX回发，静态解析无法读取后续分页 / Listing paginates through ASPX postback, the static parse cannot follow later pages: {url}")
+                self.postback_pagination = True
+                break
+            if not added or not next_url or next_url in visited:
+                break
+            print(f"  • 跟随分页 / Following listing page: {next_url}")
+            url, referer = next_url, url
+        return projects
+
+    def discover_project_ids(self, category_url):
+        """
+        从分类页面的mWorkDiv链接中解析项目ID，静态页面中没有时返回空列表
+        Parse project IDs from the mWorkDiv links of a category page; empty when absent from the static HTML
+        """
+        return sorted(self.discover_projects(category_url))
+
+    def collect_image_urls(self, detail_url, referer=None):
+        """
+        从详情页的mSwiperDiv中解析所有图片URL，静态页面中没有时返回空列表
+        Parse every image URL from the mSwiperDiv of a detail page; empty when absent from the static HTML
+        """
+        parser = self._parse(detail_url, 'mSwiperDiv', referer=referer)
+        if parser is None:
+            return []
+        return parser.image_urls()
@@ -0,0 +1,144 @@
+"""
+自适应限速器 - 按主机的令牌桶，用AIMD根据响应状态和延迟调整速率
+Adaptive Rate Limiter - per-host token buckets whose rate is tuned with AIMD from response status and latency
+"""
+
+import time
+import threading
+from urllib.parse import urlsplit
+
+# 默认限速设置 / Default rate limit settings
+DEFAULT_INITIAL_RATE = 1.0      # 初始速率(请求/秒) / Initial rate in requests per second
+DEFAULT_MIN_RATE = 0.2          # 最低速率 / Minimum rate
+DEFAULT_MAX_RATE = 20.0         # 最高速率 / Maximum rate
+DEFAULT_INCREASE = 0.2          # 每次正常响应增加的速率(加性增) / Rate added per healthy response (additive increase)
+DEFAULT_DECREASE = 0.5          # 拥塞时速率乘以该系数(乘性减) / Rate multiplier on congestion (multiplicative decrease)
+DEFAULT_BURST = 1.0             # 令牌桶容量 / Token bucket capacity
+LATENCY_FACTOR = 2.0            # 延迟超过基线的倍数视为拥塞 / Latency above this multiple of the baseline counts as congestion
+LATENCY_ALPHA = 0.3             # 延迟指数平均系数 / Latency EWMA smoothing factor
+KIND_REQUEST = "request"        # 图片和HTML请求，延迟为到达响应头的时间 / Image and HTML requests, latency is time to headers
+KIND_PAGE = "page"              # 浏览器整页加载，延迟包含渲染和就绪等待 / Browser page loads, latency includes rendering and the readiness wait
+
+
+class _HostState:
+    """单个主机的令牌桶和延迟统计 / Token bucket and latency statistics of one host"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.tokens = burst
+        self.updated = time.monotonic()
+        # 每类请求分别统计，整页加载的秒级耗时不与毫秒级的请求延迟比较
+        # Kept per request kind so multi-second page loads are never compared with millisecond request latencies
+        self.latency = {}            # 类别 -> 延迟指数平均 / kind -> latency EWMA
+        self.baseline = {}           # 类别 -> 观察到的最低平均延迟 / kind -> lowest observed average latency
+        self.last_decrease = 0.0
+        self.blocked_until = 0.0     # Retry-After 指定的暂停时间 / Pause requested by Retry-After
+
+
+class AdaptiveRateLimiter:
+    """
+    每个主机一个令牌桶：响应快且成功时加性提高速率，遇到429/5xx/超时或延迟升高时乘性降低；
+    线程安全，同步调用acquire()，异步调用方用reserve()得到需要等待的秒数
+    One token bucket per host: the rate rises additively while responses are fast and successful and
+    drops multiplicatively on 429/5xx/timeouts or rising latency. Thread-safe; synchronous callers use
+    acquire(), async callers await the delay returned by reserve()
+    """
+
+    def __init__(self, initial_rate=DEFAULT_INITIAL_RATE, min_rate=DEFAULT_MIN_RATE, max_rate=DEFAULT_MAX_RATE,
+                 increase=DEFAULT_INCREASE, decrease=DEFAULT_DECREASE, burst=DEFAULT_BURST):
+        self.min_rate = max(0.01, min_rate)
+        self.max_rate = max(self.min_rate, max_rate)
+        self.initial_rate = min(self.max_rate, max(self.min_rate, initial_rate))
+        self.increase = increase
+        self.decrease = decrease
+        self.burst = max(1.0, burst)
+        self._hosts = {}
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "waited": 0.0, "increases": 0, "decreases": 0}
+
+    @staticmethod
+    def host_of(url):
+        """URL对应的主机 / Host of a URL"""
+        return urlsplit(url).netloc
+
+    def _state(self, host):
+        if host not in self._hosts:
+            self._hosts[host] = _HostState(self.initial_rate, self.burst)
+        return self._hosts[host]
+
+    def reserve(self, url):
+        """
+        预订一个令牌，返回需要等待的秒数(令牌可以透支，调用方按预订顺序排队)
+        Reserve a token and return the seconds to wait (tokens may go negative so callers queue in order)
+        """
+        with self._lock:
+            state = self._state(self.host_of(url))
+            now = time.monotonic()
+            state.tokens = min(self.burst, state.tokens + (now - state.updated) * state.rate)
+            state.updated = now
+            state.tokens -= 1
+            delay = -state.tokens / state.rate if state.tokens < 0 else 0.0
+            delay = max(delay, state.blocked_until - now)
+            self.stats["requests"] += 1
+            self.stats["waited"] += delay
+            return delay
+
+    def acquire(self, url):
+        """等待直到可以向该主机发出请求 / Block until a request to the host may be sent"""
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def record(self, url, status=None, latency=None, error=False, retry_after=None, kind=KIND_REQUEST):
+        """
+        根据一次请求的结果调整该主机的速率
+        Adjust the host's rate from the outcome of one request
+
+        Args:
+            status (int): HTTP状态码，浏览器页面为None / HTTP status code, None for browser page loads
+            latency (float): 请求耗时(秒) / Request duration in seconds
+            error (bool): 超时或连接错误 / Timeout or connection error
+            retry_after (str): 服务器返回的Retry-After / Retry-After sent by the server
+            kind (str): KIND_REQUEST或KIND_PAGE，延迟只与同类请求的基线比较 / KIND_REQUEST or KIND_PAGE; latency is only compared with the baseline of its own kind
+        """
+        with self._lock:
+            state = self._state(self.host_of(url))
+            now = time.monotonic()
+            congested = error or status == 429 or (status is not None and status >= 500)
+            if latency is not None and not congested:
+                previous = state.latency.get(kind)
+                average = latency if previous is None else (
+                    LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * previous)
+                state.latency[kind] = average
+                baseline = state.baseline.get(kind)
+                if baseline is None or average < baseline:
+                    state.baseline[kind] = average
+                elif average > baseline * LATENCY_FACTOR:
+                    congested = True
+            if retry_after and retry_after.strip().isdigit():
+                state.blocked_until = max(state.blocked_until, now + int(retry_after))
+
+            if congested:
+                # 每个延迟周期最多降低一次，避免一次拥塞中的多个响应连续减半
+                # Decrease at most once per latency period so one congestion event does not halve repeatedly
+                if now - state.last_decrease >= max(state.latency.get(kind) or 0.0, 1.0 / state.rate):
+                    state.rate = max(self.min_rate, state.rate * self.decrease)
+                    state.last_decrease = now
+                    # 降速后重新测量基线 / Re-measure the baseline after slowing down
+                    state.baseline = dict(state.latency)
+                    self.stats["decreases"] += 1
+            elif status is None or status < 400:
+                if state.rate < self.max_rate:
+                    state.rate = min(self.max_rate, state.rate + self.increase)
+                    self.stats["increases"] += 1
+
+    def current_rate(self, url):
+        """该主机当前的速率(请求/秒) / Current rate of the host in requests per second"""
+        with self._lock:
+            return self._state(self.host_of(url)).rate
+
+    def rates(self):
+        """所有主机的当前速率 / Current rate of every host"""
+        with self._lock:
+            return {host: state.rate for host, state in self._hosts.items()}
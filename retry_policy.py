@@ -0,0 +1,178 @@
+"""
+重试策略 - 指数退避加随机抖动、按错误类型决定是否重试、共享重试预算，以及运行结束时统一处理的重试队列
+Retry Policy - exponential backoff with jitter, per-error-class retry decisions, a shared retry budget,
+and a retry queue drained at the end of the run
+"""
+
+import time
+import random
+import threading
+
+# 默认重试设置 / Default retry settings
+DEFAULT_MAX_ATTEMPTS = 3        # 含首次请求的最多尝试次数 / Maximum attempts including the first one
+DEFAULT_BASE_DELAY = 1.0        # 第一次重试前的退避上限(秒) / Backoff cap before the first retry in seconds
+DEFAULT_MAX_DELAY = 30.0        # 退避上限(秒) / Maximum backoff in seconds
+DEFAULT_BUDGET_RATIO = 0.2      # 重试次数最多为请求数的比例 / Retries allowed as a fraction of requests
+DEFAULT_MIN_RETRIES = 10        # 不受比例限制的基础重试次数 / Retries always allowed regardless of the ratio
+
+# 各错误类型是否值得重试 / Whether each error class is worth retrying
+ERROR_DECISIONS = {
+    "timeout": True,      # 超时 / Timeouts
+    "connection": True,   # 连接错误 / Connection errors
+    "throttled": True,    # 429/408
+    "server": True,       # 5xx
+    "not_found": False,   # 404/410，重试也不会出现 / Will not appear on retry
+    "client": False,      # 其他4xx / Other 4xx
+    "other": True,        # 浏览器等其他异常 / Browser and other errors
+}
+
+
+class HttpStatusError(Exception):
+    """HTTP状态码错误，用于按状态码分类 / HTTP status error, classified by its status code"""
+
+    def __init__(self, status, message=None):
+        super().__init__(message or f"HTTP {status}")
+        self.status = status
+
+
+def classify(error=None, status=None):
+    """
+    将异常或HTTP状态码归类为ERROR_DECISIONS中的错误类型
+    Classify an exception or HTTP status code into one of the ERROR_DECISIONS classes
+    """
+    if isinstance(error, HttpStatusError):
+        status = error.status
+    if status is not None:
+        if status in (404, 410):
+            return "not_found"
+        if status in (408, 429):
+            return "throttled"
+        if status >= 500:
+            return "server"
+        if status >= 400:
+            return "client"
+    if error is not None:
+        # 按类名判断，无需导入requests/selenium/aiohttp / Judge by class name to avoid importing requests/selenium/aiohttp
+        names = [cls.__name__ for cls in type(error).__mro__]
+        if any("Timeout" in name for name in names):
+            return "timeout"
+        if any("Connection" in name or "ConnectError" in name for name in names):
+            return "connection"
+    return "other"
+
+
+class RetryPolicy:
+    """
+    共享的重试策略：全抖动指数退避(delay = uniform(0, min(max_delay, base * 2^n)))，
+    按错误类型决定是否重试，并用重试预算防止故障时重试放大请求量；线程安全
+    Shared retry policy: full-jitter exponential backoff (delay = uniform(0, min(max_delay, base * 2^n))),
+    per-error-class retry decisions, and a retry budget so failures cannot multiply the request volume; thread-safe
+    """
+
+    def __init__(self, name, max_attempts=DEFAULT_MAX_ATTEMPTS, base_delay=DEFAULT_BASE_DELAY,
+                 max_delay=DEFAULT_MAX_DELAY, budget_ratio=DEFAULT_BUDGET_RATIO, min_retries=DEFAULT_MIN_RETRIES):
+        self.name = name
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget_ratio = budget_ratio
+        self.min_retries = min_retries
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "retries": 0, "gave_up": 0, "budget_exhausted": 0}
+
+    def delay(self, attempt):
+        """第attempt次尝试失败后的退避时间 / Backoff after the given failed attempt"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    def note_request(self):
+        """记录一次新请求，增加重试预算 / Record a new request, which grows the retry budget"""
+        with self._lock:
+            self.stats["requests"] += 1
+
+    def should_retry(self, attempt, error=None, status=None, max_attempts=None):
+        """
+        第attempt次尝试失败后是否重试；同意时消耗一次重试预算
+        Whether to retry after the given failed attempt; consumes one retry from the budget when it agrees
+        """
+        if not ERROR_DECISIONS.get(classify(error, status), True):
+            return False
+        with self._lock:
+            if attempt >= (max_attempts or self.max_attempts):
+                self.stats["gave_up"] += 1
+                return False
+            if self.stats["retries"] >= self.min_retries + self.budget_ratio * self.stats["requests"]:
+                self.stats["budget_exhausted"] += 1
+                return False
+            self.stats["retries"] += 1
+            return True
+
+    def call(self, fn, *args, description=None, max_attempts=None, **kwargs):
+        """
+        调用fn，出错时按策略退避重试，最终失败时抛出最后一个异常
+        Call fn, retrying with backoff according to the policy, and raise the last error when it finally fails
+        """
+        self.note_request()
+        attempt = 1
+        while True:
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if not self.should_retry(attempt, error=e, max_attempts=max_attempts):
+                    raise
+                wait = self.delay(attempt)
+                print(f"  ⚠ {description or self.name} 失败 ({classify(e)}), {wait:.1f} 秒后重试 "
+                      f"({attempt}/{max_attempts or self.max_attempts}): {str(e)} / Failed, retrying after backoff")
+                time.sleep(wait)
+                attempt += 1
+
+
+class RetryQueue:
+    """
+    收集本轮失败的任务，在运行结束时统一重试，而不是直接丢弃；按键统计每个任务的尝试次数
+    Collects items that failed during the run so they are retried at the end instead of being lost;
+    counts attempts per key
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._attempts = {}
+        self.abandoned = []
+        self.stats = {"queued": 0, "abandoned": 0}
+
+    def add(self, key, item, max_attempts, reason=None):
+        """
+        加入失败任务，超过max_attempts后放弃
+        Queue a failed item; it is abandoned once it has failed max_attempts times
+
+        Returns:
+            bool: 是否已加入队列 / Whether the item was queued
+        """
+        with self._lock:
+            attempts = self._attempts.get(key, 0) + 1
+            self._attempts[key] = attempts
+            if attempts >= max_attempts:
+                self._pending.pop(key, None)
+                self.abandoned.append((item, reason))
+                self.stats["abandoned"] += 1
+                return False
+            if key not in self._pending:
+                self.stats["queued"] += 1
+            self._pending[key] = item
+            return True
+
+    def attempts(self, key):
+        """该任务已失败的次数 / Number of times the item has failed"""
+        with self._lock:
+            return self._attempts.get(key, 0)
+
+    def drain(self):
+        """取出并清空当前所有待重试任务 / Take and clear every pending item"""
+        with self._lock:
+            items = list(self._pending.values())
+            self._pending = {}
+            return items
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pending)
@@ -14,24 +14,39 @@ import re
 import platform
 import zipfile
 import subprocess
+import threading
+import functools
+import hashlib
+import concurrent.futures
+import multiprocessing
 from pathlib import Path
+from urllib.parse import urlsplit
 import urllib.request
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import requests
-import json
-from random_user_agent import random_ua
-from webdriver import init_browser, cleanup_browser
+from webdriver import init_browser, cleanup_browser, wait_until_ready, swiper_ready, listing_ready, collect_swiper_image_urls
+from webdriver import collect_all_listing_entries, drain_performance_log, captured_image_responses, get_response_body
+from webdriver import url_committed, BLOCK_PROFILES
+from downloader import ImageDownloader, DownloadPipeline, DownloadTask, PART_SUFFIX
+import async_downloader
+from browser_pool import BrowserPool
+from status_store import create_status_store
+from file_index import ImageFileIndex, IMAGE_EXTENSIONS
+from blob_store import BlobStore
+from url_cache import UrlCache, copy_or_link
+from conversion_manifest import ConversionManifest
+from convert_to_png import convert_bytes, OutputEncoder, OUTPUT_FORMATS, is_format_available
+from rate_limiter import AdaptiveRateLimiter, KIND_PAGE
+from retry_policy import RetryPolicy, RetryQueue, ERROR_DECISIONS, classify
+from http_crawler import HttpCrawler, projects_from_entries
+from crawl_manifest import CrawlManifest, url_list_hash, listing_hash
 
 # 全局配置 / Global Configuration
 PICTURE_DIR = 'picture'  # 主图片目录 / Main image directory
 DEFAULT_SAVE_DIRS = ["salesoffice", "residential", "clubhouse", "hospitality", "commercial"]
 
-# 默认子页面URL最大ID / Maximum ID for subpages (will be updated dynamically if possible)
+# 默认子页面URL最大ID，仅在无法从分类页面读取项目列表时使用 / Maximum ID for subpages, only used when the category listing cannot be read
 DEFAULT_MAX_IDS = {
     "salesoffice": 12,  # 销售中心 / Sales Office
     "residential": 34,  # 住宅 / Residential
@@ -55,22 +70,79 @@ SKIP_DOWNLOAD = False  # 设置为True跳过下载，强制使用本地ChromeDri
 # 爬取设置 / Crawler Settings
 MAX_PAGE_RETRIES = 5       # 页面加载最大重试次数 / Maximum page load retries
 MAX_IMG_RETRIES = 3        # 图片下载最大重试次数 / Maximum image download retries
+PAGE_READY_ATTEMPTS = 2    # 页面未就绪时最多加载次数 / Maximum loads when a page does not become ready
+RETRY_BASE_DELAY = 1.0     # 指数退避基础时间(秒) / Exponential backoff base in seconds
+RETRY_MAX_DELAY = 30.0     # 指数退避上限(秒) / Exponential backoff cap in seconds
 REQUEST_TIMEOUT = 5       # 请求超时时间(秒) / Request timeout in seconds
-MIN_WAIT_TIME = 1.0        # 最小等待时间(秒) / Minimum wait time between requests
-MAX_WAIT_TIME = 3.0        # 最大等待时间(秒) / Maximum wait time between requests
+PAGE_READY_TIMEOUT = 20    # 页面就绪最长等待时间(秒) / Maximum page readiness wait in seconds
+MIN_WAIT_TIME = 1.0        # 初始化重试前的最小等待时间(秒) / Minimum wait before retrying initialization
+MAX_WAIT_TIME = 3.0        # 初始化重试前的最大等待时间(秒) / Maximum wait before retrying initialization
+RATE_INITIAL = 1.0         # 每个主机的初始请求速率(请求/秒) / Initial request rate per host (requests per second)
+RATE_MIN = 0.2             # 拥塞时的最低速率 / Lowest rate under congestion
+RATE_MAX = 20.0            # 健康时的最高速率 / Highest rate while healthy
 STATUS_SAVE_INTERVAL = 5   # 状态保存间隔(处理N个图片后保存一次) / Status save interval (save after processing N images)
+HTTP_POOL_SIZE = 10        # 每个图片主机的连接池大小 / Connection pool size per image host
+DOWNLOAD_WORKERS = 4       # 图片下载线程数 / Number of image download worker threads
+DOWNLOAD_QUEUE_DEPTH = 64  # 待下载图片队列长度 / Pending image download queue depth
+DOWNLOAD_ENGINE = "thread" # 下载引擎: thread(线程池) 或 async(asyncio) / Download engine: thread or async
+ASYNC_CONCURRENCY = 32     # 异步引擎全局并发数 / Async engine global concurrency
+ASYNC_PER_HOST = 8         # 异步引擎每个主机的并发数 / Async engine concurrency per host
+BROWSER_POOL_SIZE = 1      # 并行浏览器数量，大于1时启用浏览器池 / Parallel browsers; a pool is used when greater than 1
+DEDUP_IMAGES = False       # 相同内容的图片只保留一份(硬链接) / Keep one copy of identical images (hardlinks)
+BLOB_DIR = os.path.join(PICTURE_DIR, ".blobs")  # 去重存储目录 / Deduplication store directory
+URL_CACHE_ENABLED = False  # 相同URL已下载过时在本地复制/链接 / Copy or link locally when a URL was already fetched
+URL_CACHE_FILE = os.path.join(PICTURE_DIR, "url_cache.db")
+URL_CACHE_SIZE = 50000     # URL缓存最大条目数(LRU淘汰) / Maximum URL cache entries (LRU eviction)
+INLINE_CONVERT = False     # 下载后直接在内存中转换格式，不写原始格式文件 / Convert in memory right after downloading, without writing the original format
+CONVERT_FORMAT = "png"     # 下载后转换的目标格式，见OUTPUT_FORMATS / Target format when converting after download, see OUTPUT_FORMATS
+CONVERT_WORKERS = os.cpu_count() or 1  # 转换进程数 / Number of conversion processes
+MARK_PENDING = False       # 在转换清单中标记新下载的图片待转换 / Mark new downloads as pending in the conversion manifest
+CONVERT_MANIFEST_FILE = os.path.join(PICTURE_DIR, "convert_manifest.db")
+BLOCK_PROFILE = "none"     # 浏览器资源拦截配置: none/light/strict / Browser resource blocking profile: none/light/strict
+PAGE_LOAD_STRATEGY = None  # 页面加载策略normal/eager/none，None时使用拦截配置的默认值 / Page load strategy, None uses the profile's default
+NETWORK_CAPTURE = False    # 从浏览器网络事件中捕获图片URL / Capture image URLs from the browser's network events
+REUSE_BROWSER_BODIES = False  # 直接保存浏览器已下载的图片响应体 / Save image bodies the browser already downloaded
+INCREMENTAL = False        # 只访问新增、列表条目变化或缺图的项目 / Only visit new projects, changed listing entries or projects with missing images
+CRAWL_MANIFEST_FILE = os.path.join(PICTURE_DIR, "crawl_manifest.json")
+REVALIDATE = False         # 用ETag/Last-Modified重新验证已下载的图片 / Revalidate downloaded images with ETag/Last-Modified
+CRAWL_MODE = "browser"     # 爬取模式: browser(Selenium) 或 http(直接解析页面) / Crawl mode: browser (Selenium) or http (parse pages directly)
 
 # 记录下载状态的文件 / File to record download status
 DOWNLOAD_STATUS_FILE = os.path.join(PICTURE_DIR, "download_status.json")
+DOWNLOAD_STATUS_DB = os.path.join(PICTURE_DIR, "download_status.db")
+DOWNLOAD_STATUS_JOURNAL = os.path.join(PICTURE_DIR, "download_status.journal.jsonl")
+STATUS_BACKEND = "json"    # 下载状态后端: json、journal 或 sqlite / Download status backend: json, journal or sqlite
+JOURNAL_FSYNC_BATCH = 20   # 日志每N条记录fsync一次 / fsync the status journal after every N records
+JOURNAL_COMPACT_BYTES = 4 * 1024 * 1024  # 日志压缩阈值(字节) / Journal compaction threshold in bytes
 
-# 内存中缓存下载状态 / In-memory download status cache
-_download_status_cache = None
-_status_modified = False
-_processed_count = 0
+# 下载状态后端实例 / Download status backend instance
+_status_store = None
+# 已下载图片文件的内存索引 / In-memory index of downloaded image files
+_file_index = None
+# 内容寻址的去重存储 / Content-addressed deduplication store
+_blob_store = None
+# 图片URL抓取缓存 / Image URL fetch cache
+_url_cache = None
+# 下载后转换使用的CPU进程池 / CPU process pool used for converting after download
+_convert_pool = None
+_convert_encoder = None
+# 转换工具的清单，用于标记待转换的新图片 / The converter's manifest, used to mark new images as pending
+_convert_manifest = None
+# 项目清单(图片数、URL列表哈希、列表条目哈希)，用于增量爬取 / Project manifest (image count, URL list hash, listing hash) for incremental crawls
+_crawl_manifest = None
+# 本次运行从分类页面读取的项目条目 {分类: {项目ID: 条目}} / Project entries read from category pages this run {category: {project_id: entry}}
+_listing_entries = {}
+_incremental_stats = {"visited": 0, "skipped": 0}
+# 按主机的自适应限速器，所有浏览器和下载线程共享 / Per-host adaptive rate limiter shared by every browser and download worker
+_rate_limiter = None
+# 下载线程与浏览器线程共享状态后端，所有读写都需持有此锁
+# Download workers and the browser thread share the status backend; all access must hold this lock
+_status_lock = threading.RLock()
 
-# 记录当前项目的重试记录，用于实现指数退避策略 
-# Record retry attempts for current project, for exponential backoff
-_current_project_retries = {}
+# 页面和图片的重试策略(指数退避、抖动、重试预算) / Retry policies for pages and images (exponential backoff, jitter, retry budget)
+_retry_policies = {}
+# 运行中失败的项目和图片，运行结束时统一重试 / Projects and images that failed during the run, retried at the end
+_retry_queue = RetryQueue()
 
 def get_chromedriver_path():
     """获取ChromeDriver路径，如果不存在则尝试下载 / Get ChromeDriver path, try to download if not exists"""
@@ -145,37 +217,21 @@ def get_chromedriver_path():
     return get_chromedriver_path()
 
 def load_download_status():
-    """加载下载状态 / Load download status"""
-    global _download_status_cache, _status_modified
-    
-    # 如果已缓存，直接返回缓存
-    if _download_status_cache is not None:
-        if isinstance(_download_status_cache, dict) and "downloaded_images" in _download_status_cache:
-            return _download_status_cache
-        else:
-            print("缓存状态无效，将重新初始化 / Cache status invalid, will reinitialize")
-    
-    # 尝试从文件加载
-    if os.path.exists(DOWNLOAD_STATUS_FILE):
-        try:
-            with open(DOWNLOAD_STATUS_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # 验证数据格式是否正确
-                if isinstance(data, dict) and "downloaded_images" in data:
-                    _download_status_cache = data
-                    _status_modified = False
-                    print("已从文件加载下载状态记录 / Download status loaded from file")
-                    return _download_status_cache
-                else:
-                    print("下载状态文件格式无效，将使用新的状态 / Download status file has invalid format, will use new status")
-        except Exception as e:
-            print(f"加载下载状态失败: {str(e)} / Failed to load download status: {str(e)}")
-    
-    # 初始化新状态
-    _download_status_cache = {"downloaded_images": {}}
-    _status_modified = False
-    print("初始化新的下载状态 / Initialized new download status")
-    return _download_status_cache
+    """加载下载状态后端 / Load the download status backend"""
+    global _status_store
+    with _status_lock:
+        if _status_store is None:
+            _status_store = create_status_store(
+                STATUS_BACKEND,
+                DOWNLOAD_STATUS_FILE,
+                DOWNLOAD_STATUS_DB,
+                journal_path=DOWNLOAD_STATUS_JOURNAL,
+                save_interval=STATUS_SAVE_INTERVAL,
+                fsync_batch=JOURNAL_FSYNC_BATCH,
+                compact_bytes=JOURNAL_COMPACT_BYTES
+            )
+            print(f"下载状态后端: {STATUS_BACKEND} / Download status backend: {STATUS_BACKEND}")
+        return _status_store
 
 def save_download_status(force=False):
     """
@@ -184,177 +240,674 @@ def save_download_status(force=False):
     Args:
         force (bool): 是否强制保存 / Whether to force save regardless of modification status
     """
-    global _download_status_cache, _status_modified, _processed_count
-    
-    # 如果状态未修改且不是强制保存，则跳过
-    if not _status_modified and not force:
-        return
-    
-    # 确保目录存在
-    if not os.path.exists(PICTURE_DIR):
-        try:
-            os.makedirs(PICTURE_DIR)
-        except Exception as e:
-            print(f"创建图片目录失败: {str(e)} / Failed to create image directory")
+    with _status_lock:
+        if _crawl_manifest is not None:
+            _crawl_manifest.save()
+        if _status_store is None:
             return
-    
-    # 确保缓存有效
-    if _download_status_cache is None or not isinstance(_download_status_cache, dict):
-        print("下载状态缓存无效，无法保存 / Download status cache invalid, cannot save")
+        _status_store.save(force=force)
+
+def close_download_status():
+    """保存并关闭下载状态后端(日志后端会在此压缩) / Save and close the status backend (the journal backend compacts here)"""
+    global _status_store, _url_cache, _convert_manifest
+    with _status_lock:
+        if _crawl_manifest is not None:
+            _crawl_manifest.save()
+        if _url_cache is not None:
+            _url_cache.close()
+            _url_cache = None
+        if _convert_manifest is not None:
+            _convert_manifest.close()
+            _convert_manifest = None
+        if _status_store is None:
+            return
+        try:
+            _status_store.close()
+        finally:
+            _status_store = None
+
+def get_file_index():
+    """获取图片文件索引 / Get the image file index"""
+    global _file_index
+    with _status_lock:
+        if _file_index is None:
+            # 包含所有--convert-format输出格式，转换后的文件也能被识别为已下载 / Include every --convert-format output so converted files count as downloaded
+            extensions = set(IMAGE_EXTENSIONS) | {spec["suffix"] for spec in OUTPUT_FORMATS.values()}
+            _file_index = ImageFileIndex(PICTURE_DIR, extensions=extensions)
+        return _file_index
+
+def get_blob_store():
+    """获取去重存储 / Get the deduplication store"""
+    global _blob_store
+    with _status_lock:
+        if _blob_store is None:
+            _blob_store = BlobStore(BLOB_DIR)
+        return _blob_store
+
+def get_crawl_manifest():
+    """获取项目清单 / Get the project manifest"""
+    global _crawl_manifest
+    with _status_lock:
+        if _crawl_manifest is None:
+            _crawl_manifest = CrawlManifest(CRAWL_MANIFEST_FILE)
+        return _crawl_manifest
+
+def remember_listing(category, projects):
+    """保存本次从分类页面读取的项目条目 / Remember the project entries read from the category page this run"""
+    with _status_lock:
+        _listing_entries[category] = projects
+
+def record_project_visit(category, project_id, image_count, img_urls):
+    """访问项目后更新清单 / Update the manifest after visiting a project"""
+    entry = _listing_entries.get(category, {}).get(project_id)
+    with _status_lock:
+        get_crawl_manifest().record_visit(category, project_id, image_count, url_list_hash(img_urls), listing_hash(entry))
+
+def listed_project_ids(category, projects):
+    """
+    分类页面列出的项目ID；读取不到列表时回退到 1..DEFAULT_MAX_IDS
+    Project IDs listed on the category page; falls back to 1..DEFAULT_MAX_IDS when the listing cannot be read
+    """
+    if projects:
+        print(f"分类 {category} 共 {len(projects)} 个项目 / {len(projects)} projects in {category}")
+        for project_id in sorted(projects):
+            print(f"  • id={project_id} {projects[project_id].get('title', '')}")
+        return sorted(projects)
+    fallback = DEFAULT_MAX_IDS.get(category, 5)
+    print(f"⚠ 未读取到分类 {category} 的项目列表，回退到 1..{fallback} / No listing for {category}, falling back to 1..{fallback}")
+    return list(range(1, fallback + 1))
+
+def should_visit_project(category, project_id):
+    """
+    增量模式下，只访问新项目、列表条目有变化的项目和缺图的项目；非增量模式总是访问
+    In incremental mode only new projects, changed listing entries and projects with missing images are visited;
+    outside incremental mode every project is visited
+    """
+    if not INCREMENTAL:
+        return True
+    listed = _listing_entries.get(category)
+    entry = listed.get(project_id) if listed else None
+    with _status_lock:
+        manifest = get_crawl_manifest()
+        record = manifest.get(category, project_id)
+        if listed and entry is None:
+            reason, visit = "不在列表页中 / not listed", False
+        elif record is None:
+            reason, visit = "新项目 / new project", True
+        elif entry is not None and listing_hash(entry) != record.get("listing_hash"):
+            reason, visit = "列表条目已变化 / listing entry changed", True
+        elif not record.get("image_count"):
+            reason, visit = "没有记录图片 / no images recorded", True
+        elif not all(is_image_downloaded(category, project_id, idx) for idx in range(record["image_count"])):
+            reason, visit = "有缺失的图片 / images missing", True
+        else:
+            reason, visit = "无变化 / unchanged", False
+            manifest.mark_seen(category, project_id)
+        _incremental_stats["visited" if visit else "skipped"] += 1
+    print(f"  • 增量模式{'访问' if visit else '跳过'}项目 {category}/{project_id}: {reason} / Incremental {'visit' if visit else 'skip'}")
+    return visit
+
+def get_rate_limiter():
+    """获取共享的自适应限速器 / Get the shared adaptive rate limiter"""
+    global _rate_limiter
+    with _status_lock:
+        if _rate_limiter is None:
+            _rate_limiter = AdaptiveRateLimiter(initial_rate=RATE_INITIAL, min_rate=RATE_MIN, max_rate=RATE_MAX)
+        return _rate_limiter
+
+def get_retry_policy(kind):
+    """
+    获取共享的重试策略：page用于页面加载，image用于图片下载
+    Get a shared retry policy: "page" for page loads, "image" for image downloads
+    """
+    with _status_lock:
+        if kind not in _retry_policies:
+            _retry_policies[kind] = RetryPolicy(
+                kind,
+                max_attempts=MAX_PAGE_RETRIES if kind == "page" else MAX_IMG_RETRIES,
+                base_delay=RETRY_BASE_DELAY,
+                max_delay=RETRY_MAX_DELAY
+            )
+        return _retry_policies[kind]
+
+def queue_image_retry(task, status=None, error=None):
+    """
+    可重试的图片下载失败(超时、5xx、429等)加入重试队列，404等直接放弃
+    Queue a retryable image failure (timeouts, 5xx, 429...) for the end-of-run retry; 404 and the like are dropped
+    """
+    error_class = classify(error, status)
+    if not ERROR_DECISIONS.get(error_class, True):
+        print(f"  ✗ {task.category}/id{task.project_id} 第 {task.idx+1} 张图片不可重试 ({error_class}) / Not retryable")
         return
-    
-    # 确保downloaded_images字段存在
-    if "downloaded_images" not in _download_status_cache:
-        _download_status_cache = {"downloaded_images": {}}
-        _status_modified = True
-    
+    if _retry_queue.add(("image", task.category, task.project_id, task.idx), task, MAX_IMG_RETRIES, reason=error_class):
+        print(f"  • {task.category}/id{task.project_id} 第 {task.idx+1} 张图片已加入重试队列 / Queued image for retry")
+
+def queue_crawl_retry(item, error):
+    """
+    爬取任务("category", 分类)或("project", 分类, 项目ID)失败，加入重试队列
+    Queue a failed crawl item, ("category", category) or ("project", category, project_id), for the end-of-run retry
+    """
+    if _retry_queue.add(item, item, MAX_PAGE_RETRIES, reason=str(error)):
+        print(f"  • {'/'.join(map(str, item))} 已加入重试队列 / Queued for retry")
+
+def drain_retry_queue(pipeline, retry_items=None):
+    """
+    运行结束时按指数退避逐轮重试失败的项目和图片，直到队列为空或都超过最大次数
+    At the end of the run, retry failed projects and images in rounds with exponential backoff
+    until the queue is empty or every item has used up its attempts
+
+    Args:
+        pipeline: 下载管道 / Download pipeline
+        retry_items (callable): 重新处理爬取任务列表，返回仍失败的(任务, 错误)列表 / Reprocesses crawl items, returns the (item, error) pairs that still failed
+    """
+    policy = get_retry_policy("image")
+    round_no = 0
+    while len(_retry_queue):
+        round_no += 1
+        items = _retry_queue.drain()
+        wait = policy.delay(round_no)
+        print(f"\n重试队列第 {round_no} 轮: {len(items)} 个任务，{wait:.1f} 秒后开始 / Retry round {round_no}: {len(items)} items after {wait:.1f}s")
+        time.sleep(wait)
+        crawl_items = [item for item in items if not isinstance(item, DownloadTask)]
+        for item in items:
+            if isinstance(item, DownloadTask):
+                pipeline.submit(item)
+        if crawl_items:
+            if retry_items is None:
+                for item in crawl_items:
+                    queue_crawl_retry(item, "no crawler available")
+            else:
+                for item, error in retry_items(crawl_items):
+                    queue_crawl_retry(item, error)
+        # 重试中再次失败的图片会由下载线程重新加入队列 / Images failing again are re-queued by the download workers
+        pipeline.join()
+    if _retry_queue.abandoned:
+        print(f"\n多次重试后仍失败 {len(_retry_queue.abandoned)} 个任务 / {len(_retry_queue.abandoned)} items failed after all retries:")
+        for item, reason in _retry_queue.abandoned:
+            name = f"{item.category}/id{item.project_id} #{item.idx+1}" if isinstance(item, DownloadTask) else "/".join(map(str, item))
+            print(f"  ✗ {name}: {reason}")
+
+def get_url_cache():
+    """获取URL抓取缓存，未启用返回None / Get the URL fetch cache, None when disabled"""
+    global _url_cache
+    if not URL_CACHE_ENABLED:
+        return None
+    with _status_lock:
+        if _url_cache is None:
+            _url_cache = UrlCache(URL_CACHE_FILE, max_entries=URL_CACHE_SIZE)
+        return _url_cache
+
+def submit_conversion(data, img_save_path):
+    """
+    在CPU进程池中将下载到内存的图片编码写盘，返回concurrent.futures.Future
+    Encode and write an image downloaded into memory on the CPU process pool, returning a concurrent.futures.Future
+    """
+    global _convert_pool, _convert_encoder
+    with _status_lock:
+        if _convert_pool is None:
+            _convert_encoder = OutputEncoder(CONVERT_FORMAT)
+            # 下载线程和浏览器线程已在运行，用spawn而不是fork创建进程 / Download and browser threads are already running, so spawn rather than fork
+            _convert_pool = concurrent.futures.ProcessPoolExecutor(max_workers=CONVERT_WORKERS,
+                                                                   mp_context=multiprocessing.get_context("spawn"))
+    return _convert_pool.submit(convert_bytes, data, img_save_path, _convert_encoder)
+
+def close_convert_pool():
+    """等待剩余转换完成并关闭进程池 / Wait for the remaining conversions and shut the process pool down"""
+    global _convert_pool
+    with _status_lock:
+        pool, _convert_pool = _convert_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+def save_converted_image(task, data, img_save_path, validators=None):
+    """
+    将内存中的图片转换写盘后记录下载状态；去重、URL缓存和转换清单都使用转换后内容的哈希，
+    以免与其他格式的文件混用；转换失败不重试
+    Convert and write an in-memory image, then record its download status. Dedup, the URL cache and the
+    conversion manifest all get the hash of the converted bytes, so files of another format are never
+    mixed in; conversion failures are not retried
+
+    Returns:
+        bool: 是否转换并记录成功 / Whether the image was converted and recorded
+    """
     try:
-        with open(DOWNLOAD_STATUS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(_download_status_cache, f, ensure_ascii=False, indent=2)
-        _status_modified = False
-        _processed_count = 0
-        print("✓ 下载状态已保存 / Download status saved")
+        _, sha256 = submit_conversion(data, img_save_path).result()
     except Exception as e:
-        print(f"保存下载状态失败: {str(e)} / Failed to save download status: {str(e)}")
-        
-        # 尝试备份保存，以防文件系统问题
-        try:
-            backup_file = f"{DOWNLOAD_STATUS_FILE}.bak"
-            with open(backup_file, 'w', encoding='utf-8') as f:
-                json.dump(_download_status_cache, f, ensure_ascii=False, indent=2)
-            print(f"✓ 下载状态已保存到备份文件: {backup_file} / Download status saved to backup file")
-        except Exception as be:
-            print(f"保存到备份文件也失败: {str(be)} / Failed to save to backup file as well")
+        print(f"  ✗ {task.category}/id{task.project_id} 第 {task.idx+1} 张图片转换失败: {str(e)} / Image {task.idx+1} conversion failed")
+        return False
+    return record_saved_image(task, img_save_path, validators=validators, sha256=sha256)
+
+def get_convert_manifest():
+    """获取转换清单，未启用--mark-pending时返回None / Get the conversion manifest, None without --mark-pending"""
+    global _convert_manifest
+    if not MARK_PENDING:
+        return None
+    with _status_lock:
+        if _convert_manifest is None:
+            _convert_manifest = ConversionManifest(CONVERT_MANIFEST_FILE)
+        return _convert_manifest
 
 def is_image_downloaded(category, image_id, image_index):
     """检查图片是否已下载 / Check if image is already downloaded"""
-    global _download_status_cache, _status_modified
-    
-    try:
-        # 确保缓存已初始化
-        if _download_status_cache is None:
-            _download_status_cache = load_download_status()
-        
-        # 进行空值检查，增强健壮性
-        if not _download_status_cache or not isinstance(_download_status_cache, dict):
-            print(f"下载状态缓存无效，重新初始化 / Download status cache invalid, reinitializing")
-            _download_status_cache = {"downloaded_images": {}}
-            _status_modified = True
-        
-        # 确保downloaded_images字段存在
-        if "downloaded_images" not in _download_status_cache:
-            _download_status_cache["downloaded_images"] = {}
-            _status_modified = True
-        
-        # 首先检查内存中的状态
-        image_key = f"id{image_id}_{image_index}"
-        if category in _download_status_cache["downloaded_images"] and image_key in _download_status_cache["downloaded_images"][category]:
-            # 再确认文件是否真的存在（防止状态不一致）
-            for ext in ['.jpg', '.png', '.jpeg', '.webp', '.gif']:
-                image_path = os.path.join(PICTURE_DIR, category, f"{image_key}{ext}")
-                if os.path.exists(image_path) and os.path.getsize(image_path) > 10000:
-                    return True
-        
-        # 检查文件是否存在但未记录（可能是之前下载但没记录状态）
-        for ext in ['.jpg', '.png', '.jpeg', '.webp', '.gif']:
-            image_path = os.path.join(PICTURE_DIR, category, f"{image_key}{ext}")
-            if os.path.exists(image_path) and os.path.getsize(image_path) > 10000:
-                # 更新缓存状态
-                if category not in _download_status_cache["downloaded_images"]:
-                    _download_status_cache["downloaded_images"][category] = {}
-                _download_status_cache["downloaded_images"][category][image_key] = True
-                _status_modified = True
-                return True
-        
+    with _status_lock:
+        try:
+            # 先查内存中的文件索引，确认文件真的存在（防止状态不一致）
+            # Check the in-memory file index first to confirm the file really exists (guards against stale state)
+            image_key = f"id{image_id}_{image_index}"
+            entry = get_file_index().lookup(category, image_key)
+            if not entry or entry[1] <= 10000:
+                return False
+
+            # 文件存在但未记录（可能是之前下载但没记录状态）
+            # The file exists but was never recorded (downloaded before without saving status)
+            store = load_download_status()
+            if not store.is_downloaded(category, image_id, image_index):
+                store.mark_downloaded(category, image_id, image_index, size=entry[1])
+            return True
+        except Exception as e:
+            print(f"检查图片下载状态时出错: {str(e)} / Error checking image download status")
+            # 出错时默认返回False，这样图片会被重新下载，比丢失数据要好
+            return False
+
+def mark_image_downloaded(category, image_id, image_index, url=None, size=None, path=None, validators=None,
+                          sha256=None):
+    """标记图片为已下载 / Mark image as downloaded"""
+    with _status_lock:
+        try:
+            if path:
+                get_file_index().update(category, path, size=size)
+            load_download_status().mark_downloaded(category, image_id, image_index, url=url, size=size,
+                                                   validators=validators, sha256=sha256)
+        except Exception as e:
+            print(f"标记图片下载状态时出错: {str(e)} / Error marking image download status")
+            # 尝试强制保存当前状态
+            try:
+                save_download_status(force=True)
+            except:
+                pass
+
+def get_category_url(category):
+    """构建分类页面URL / Build the category page URL"""
+    if category == "salesoffice":
+        return "https://www.sldgroup.com/tc/salesoffice.aspx"
+    url_path = URL_PATH_MAPPING.get(category, category)
+    return f"https://www.sldgroup.com/tc/{url_path}.aspx"
+
+def get_detail_url(category, project_id):
+    """构建项目详情页URL / Build the project detail page URL"""
+    if category == "salesoffice":
+        return f"https://www.sldgroup.com/tc/saleoffice-detail.aspx?id={project_id}"
+    return f"https://www.sldgroup.com/tc/{URL_PATH_MAPPING.get(category, category)}-detail.aspx?id={project_id}"
+
+def print_pipeline_stats(pipeline):
+    """输出下载管道统计 / Print download pipeline statistics"""
+    stats = pipeline.stats
+    print(f"下载线程统计 / Download worker stats: 提交 submitted {stats['submitted']}, 成功 downloaded {stats['downloaded']}, 失败 failed {stats['failed']}")
+    if _rate_limiter is not None:
+        limiter_stats = _rate_limiter.stats
+        rates = ", ".join(f"{host} {rate:.2f}/s" for host, rate in _rate_limiter.rates().items())
+        print(f"限速统计 / Rate limiter stats: 请求 requests {limiter_stats['requests']}, 等待 waited {limiter_stats['waited']:.1f}s, "
+              f"提速 increases {limiter_stats['increases']}, 降速 decreases {limiter_stats['decreases']}; 当前速率 current rates: {rates}")
+    if INCREMENTAL:
+        print(f"增量统计 / Incremental stats: 访问 visited {_incremental_stats['visited']}, 跳过 skipped {_incremental_stats['skipped']}")
+    for kind, policy in _retry_policies.items():
+        retry_stats = policy.stats
+        print(f"重试统计 / Retry stats ({kind}): 请求 requests {retry_stats['requests']}, 重试 retries {retry_stats['retries']}, "
+              f"放弃 gave up {retry_stats['gave_up']}, 预算耗尽 budget exhausted {retry_stats['budget_exhausted']}")
+    if _url_cache is not None:
+        print(f"URL缓存统计 / URL cache stats: 命中 hits {_url_cache.stats['hits']}, 未命中 misses {_url_cache.stats['misses']}")
+    if _blob_store is not None:
+        blob_stats = _blob_store.stats
+        print(f"去重统计 / Dedup stats: 新内容 stored {blob_stats['stored']}, 重复 deduplicated {blob_stats['deduplicated']}")
+
+def submit_project_images(pipeline, category, project_id, img_urls, referer, total_image_count, fetch_local=None):
+    """
+    将项目中尚未下载的图片提交到下载管道
+    Submit the project's not-yet-downloaded images to the download pipeline
+
+    Args:
+        fetch_local (callable): 提交前调用(task)，返回True表示已在本地得到图片 / Called with the task before submitting; True means the image was obtained locally
+
+    Returns:
+        dict: 提交统计 / Submission statistics
+    """
+    image_status = {"total": total_image_count, "queued": 0, "skipped": 0, "reused": 0, "failed": 0, "retried": 0, "details": []}
+
+    for idx in range(total_image_count):
+        try:
+            # 重新验证模式下已下载的图片也提交，由条件请求决定是否重新下载
+            # In revalidate mode downloaded images are submitted too; the conditional request decides whether to refetch
+            if is_image_downloaded(category, project_id, idx) and not REVALIDATE:
+                image_status["skipped"] += 1
+                continue
+            img_src = img_urls[idx] if idx < len(img_urls) else None
+            if not img_src or img_src.strip() == '':
+                print(f"  ✗ 第 {idx+1} 张图片URL为空 / Empty image URL for image {idx+1}")
+                image_status["failed"] += 1
+                image_status["details"].append({"status": "failed", "path": f"id{project_id}_{idx}", "reason": "empty URL"})
+                continue
+            print(f"  • 第 {idx+1} 张图片的源URL: {img_src} / Source URL for image {idx+1}")
+
+            task = DownloadTask(category, project_id, idx, img_src, referer)
+            if fetch_local and fetch_local(task):
+                image_status["reused"] += 1
+                continue
+            # 交给下载管道，当前线程继续处理下一页 / Hand off to the download pipeline, this thread moves on
+            pipeline.submit(task)
+            image_status["queued"] += 1
+        except Exception as e:
+            print(f"  ✗ 处理第 {idx+1} 张图片出错: {str(e)}")
+    return image_status
+
+def print_download_summary(image_status):
+    """输出单个项目的下载总结 / Print the download summary of a single project"""
+    print("\n下载总结 / Download summary:")
+    print(f"• 总图片数: {image_status['total']}")
+    print(f"• 已加入下载队列: {image_status['queued']}")
+    print(f"• 已存在跳过: {image_status['skipped']}")
+    if image_status.get('reused'):
+        print(f"• 复用浏览器响应: {image_status['reused']}")
+    print(f"• 重试次数: {image_status['retried']}")
+    print(f"• 下载失败: {image_status['failed']}")
+
+    if image_status['failed'] > 0:
+        print("\n失败详情 / Failure details:")
+        for img in image_status["details"]:
+            if img["status"] == "failed":
+                print(f"• {img['path']} - 原因: {img['reason']}")
+
+def image_file_ext(img_src):
+    """根据图片URL推断文件扩展名 / Infer the file extension from the image URL"""
+    for ext in ['.png', '.jpeg', '.gif', '.webp']:
+        if img_src.lower().endswith(ext):
+            return ext
+    return ".jpg"
+
+def image_save_path(task):
+    """下载任务对应的保存路径，下载后转换时为转换后的路径 / Save path for a download task, the converted path when converting after download"""
+    file_ext = OUTPUT_FORMATS[CONVERT_FORMAT]["suffix"] if INLINE_CONVERT else image_file_ext(task.img_src)
+    return os.path.join(PICTURE_DIR, task.category, f"id{task.project_id}_{task.idx}{file_ext}")
+
+def task_validators(task):
+    """
+    重新验证模式下返回任务图片已保存的校验信息 / Stored validators of the task's image in revalidate mode
+    """
+    if not REVALIDATE:
+        return None
+    with _status_lock:
+        return load_download_status().get_validators(task.category, task.project_id, task.idx)
+
+def record_saved_image(task, img_save_path, validators=None, sha256=None):
+    """
+    校验已写入的图片并记录下载状态
+    Validate a written image and record its download status
+
+    Returns:
+        bool: 图片是否有效并已记录 / Whether the image is valid and was recorded
+    """
+    size = os.path.getsize(img_save_path) if os.path.exists(img_save_path) else 0
+    if size > 10000:
+        if DEDUP_IMAGES and sha256:
+            with _status_lock:
+                if get_blob_store().ingest(sha256, img_save_path):
+                    print(f"  • {task.category}/id{task.project_id} 第 {task.idx+1} 张图片与已有图片相同，已硬链接 / Duplicate image, hardlinked")
+        mark_image_downloaded(task.category, task.project_id, task.idx,
+                              url=task.img_src, size=size, path=img_save_path, validators=validators, sha256=sha256)
+        url_cache = get_url_cache()
+        if url_cache:
+            url_cache.put(task.img_src, img_save_path, size, sha256=sha256, validators=validators)
+        convert_manifest = get_convert_manifest()
+        if convert_manifest:
+            # 转换工具据此只处理新图片，相同内容直接复用已转换的输出 / The converter then only processes new images and reuses outputs of identical content
+            convert_manifest.mark_pending(img_save_path, sha256)
+        print(f"  ✓ 成功保存 {task.category}/id{task.project_id} 第 {task.idx+1} 张图片 / Image {task.idx+1} saved successfully")
+        return True
+    print(f"  ✗ {task.category}/id{task.project_id} 第 {task.idx+1} 张图片保存失败或文件太小 / Image {task.idx+1} save failed or file too small")
+    return False
+
+def save_browser_body(driver, responses, task):
+    """
+    浏览器渲染页面时已下载了该图片时，通过getResponseBody直接写盘，避免再下载一次
+    When the browser already downloaded the image while rendering, write it via getResponseBody instead of fetching it again
+
+    Returns:
+        bool: 是否已保存并记录 / Whether the image was saved and recorded
+    """
+    response = responses.get(task.img_src)
+    if not response or not response["finished"] or response["status"] != 200:
         return False
-    except Exception as e:
-        print(f"检查图片下载状态时出错: {str(e)} / Error checking image download status")
-        # 出错时默认返回False，这样图片会被重新下载，比丢失数据要好
+    body = get_response_body(driver, response["request_id"])
+    if not body:
         return False
+    img_save_path = image_save_path(task)
+    headers = response["headers"]
+    validators = {"etag": headers.get("etag"), "last_modified": headers.get("last-modified"), "content_length": len(body)}
+    print(f"  • {task.category}/id{task.project_id} 第 {task.idx+1} 张图片复用浏览器响应 / Reused the browser's response for image {task.idx+1}")
+    if INLINE_CONVERT:
+        return save_converted_image(task, body, img_save_path, validators=validators)
+    part_path = img_save_path + PART_SUFFIX
+    with open(part_path, 'wb') as f:
+        f.write(body)
+    os.replace(part_path, img_save_path)
+    return record_saved_image(task, img_save_path, validators=validators, sha256=hashlib.sha256(body).hexdigest())
 
-def mark_image_downloaded(category, image_id, image_index):
-    """标记图片为已下载 / Mark image as downloaded"""
-    global _download_status_cache, _status_modified, _processed_count
-    
+def supplement_network_urls(img_urls, responses, total_image_count):
+    """
+    DOM中的URL少于图片总数时，补充网络事件中与已知图片同目录的图片(懒加载、背景图)
+    When the DOM yields fewer URLs than the image count, add captured images from the same directories
+    as the known ones (lazy-loaded and background images)
+    """
+    if not any(img_urls) or len(img_urls) >= total_image_count:
+        return img_urls
+    # 没有图片的幻灯片为None，保留其位置 / Slides without an image are None and keep their position
+    directories = {os.path.dirname(urlsplit(url).path) for url in img_urls if url}
+    extra = [url for url in responses
+             if url not in img_urls and os.path.dirname(urlsplit(url).path) in directories]
+    if extra:
+        print(f"  • 从网络事件补充 {len(extra)} 个图片URL / Added {len(extra)} image URLs from network events")
+    return img_urls + extra[:total_image_count - len(img_urls)]
+
+def fetch_from_url_cache(task, img_save_path):
+    """
+    同一URL之前已下载过(其他项目、分类或之前的运行)时，从本地链接/复制而不重新下载
+    When the URL was already fetched (another project, category or earlier run), link or copy it locally instead of downloading
+
+    Returns:
+        bool: 是否已从缓存得到图片并记录 / Whether the image was obtained from the cache and recorded
+    """
+    url_cache = get_url_cache()
+    if url_cache is None or REVALIDATE:
+        return False
+    cached = url_cache.get(task.img_src)
+    if cached is None:
+        return False
+    if os.path.splitext(cached["path"])[1].lower() != os.path.splitext(img_save_path)[1].lower():
+        # 缓存来自其他格式(未转换或其他--convert-format)的运行，不能复用 / The entry comes from a run with another format (unconverted or another --convert-format) and cannot be reused
+        return False
     try:
-        # 确保缓存已初始化
-        if _download_status_cache is None:
-            _download_status_cache = load_download_status()
-        
-        # 进行空值检查，增强健壮性
-        if not _download_status_cache or not isinstance(_download_status_cache, dict):
-            print(f"下载状态缓存无效，重新初始化 / Download status cache invalid, reinitializing")
-            _download_status_cache = {"downloaded_images": {}}
-            _status_modified = True
-        
-        # 确保downloaded_images字段存在
-        if "downloaded_images" not in _download_status_cache:
-            _download_status_cache["downloaded_images"] = {}
-            _status_modified = True
-        
-        # 确保分类存在
-        if category not in _download_status_cache["downloaded_images"]:
-            _download_status_cache["downloaded_images"][category] = {}
-        
-        # 标记图片为已下载
-        image_key = f"id{image_id}_{image_index}"
-        _download_status_cache["downloaded_images"][category][image_key] = True
-        _status_modified = True
-        _processed_count += 1
-        
-        # 每处理一定数量的图片就保存一次状态
-        if _processed_count >= STATUS_SAVE_INTERVAL:
-            save_download_status()
-    except Exception as e:
-        print(f"标记图片下载状态时出错: {str(e)} / Error marking image download status")
-        # 尝试强制保存当前状态
-        try:
-            save_download_status(force=True)
-        except:
-            pass
+        if os.path.abspath(cached["path"]) == os.path.abspath(img_save_path):
+            source_ok = os.path.exists(img_save_path) and os.path.getsize(img_save_path) == cached["size"]
+        elif DEDUP_IMAGES and cached["sha256"] and get_blob_store().materialize(cached["sha256"], img_save_path):
+            source_ok = True
+        elif os.path.exists(cached["path"]) and os.path.getsize(cached["path"]) == cached["size"]:
+            copy_or_link(cached["path"], img_save_path)
+            source_ok = True
+        else:
+            source_ok = False
+    except OSError as e:
+        print(f"  ⚠ 从URL缓存复制失败: {str(e)} / Failed to copy from URL cache")
+        source_ok = False
+    if not source_ok:
+        # 缓存的文件已被移动或删除 / The cached file was moved or deleted
+        url_cache.invalidate(task.img_src)
+        return False
+    print(f"  • {task.category}/id{task.project_id} 第 {task.idx+1} 张图片命中URL缓存 / URL cache hit for image {task.idx+1}")
+    return record_saved_image(task, img_save_path, validators=cached["validators"], sha256=cached["sha256"])
+
+def download_image_task(downloader, task):
+    """
+    下载单个图片任务（在下载线程中运行）
+    Download a single image task (runs on a download worker thread)
+
+    Returns:
+        bool: 是否下载并记录成功 / Whether the image was downloaded and recorded
+    """
+    img_save_path = image_save_path(task)
+    if fetch_from_url_cache(task, img_save_path):
+        return True
+
+    print(f"  • 正在下载 {task.category}/id{task.project_id} 第 {task.idx+1} 张图片 / Downloading image {task.idx+1}")
+    data = None
+    if INLINE_CONVERT:
+        # 下载到内存后直接转换，不写原始格式的中间文件 / Download into memory and convert directly, without an intermediate file in the original format
+        result, data = downloader.fetch_bytes(task.img_src, referer=task.referer, validators=task_validators(task))
+    else:
+        result = downloader.download(task.img_src, img_save_path, referer=task.referer, validators=task_validators(task))
+    if not result.ok:
+        print(f"  ✗ {task.category}/id{task.project_id} 第 {task.idx+1} 张图片下载失败，HTTP状态码: {result.status_code}")
+        queue_image_retry(task, status=result.status_code)
+        return False
+    if result.status_code == 304:
+        print(f"  ✓ {task.category}/id{task.project_id} 第 {task.idx+1} 张图片未修改 / Image {task.idx+1} not modified")
+        return True
+    if data is not None:
+        return save_converted_image(task, data, img_save_path, validators=result.validators)
+    return record_saved_image(task, img_save_path, validators=result.validators, sha256=result.sha256)
+
+def create_download_pipeline(downloader):
+    """
+    按DOWNLOAD_ENGINE创建下载管道，两种引擎都提供submit/join/close/stats
+    Create the download pipeline for DOWNLOAD_ENGINE; both engines expose submit/join/close/stats
+    """
+    if DOWNLOAD_ENGINE == "async":
+        if async_downloader.is_available():
+            print(f"使用异步下载引擎 / Using async download engine (concurrency={ASYNC_CONCURRENCY}, per_host={ASYNC_PER_HOST})")
+            return async_downloader.AsyncDownloadEngine(
+                image_save_path,
+                record_saved_image,
+                validators_for=task_validators,
+                local_fetch=fetch_from_url_cache,
+                rate_limiter=get_rate_limiter(),
+                on_failed=queue_image_retry,
+                convert=submit_conversion if INLINE_CONVERT else None,
+                concurrency=ASYNC_CONCURRENCY,
+                per_host=ASYNC_PER_HOST,
+                timeout=REQUEST_TIMEOUT
+            )
+        print("⚠ 未安装aiohttp，改用线程下载引擎 / aiohttp not installed, falling back to the thread engine")
+    return DownloadPipeline(
+        functools.partial(download_image_task, downloader),
+        workers=DOWNLOAD_WORKERS,
+        queue_depth=DOWNLOAD_QUEUE_DEPTH
+    )
 
 class SLDSpider:
-    def __init__(self, chromedriver_path=None):
+    def __init__(self, chromedriver_path=None, downloader=None, pipeline=None):
         """初始化爬虫 / Initialize the crawler"""
         self.save_dirs = DEFAULT_SAVE_DIRS
         # 直接创建保存图片的目录 / Create directories for saving images
-        if not os.path.exists(PICTURE_DIR):
-            os.makedirs(PICTURE_DIR)
+        os.makedirs(PICTURE_DIR, exist_ok=True)
         for d in self.save_dirs:
             dir_path = os.path.join(PICTURE_DIR, d)
-            if not os.path.exists(dir_path):
-                os.makedirs(dir_path)
+            os.makedirs(dir_path, exist_ok=True)
 
         self.driver = None
         self.chromedriver_path = chromedriver_path
+        self.page_load_strategy = PAGE_LOAD_STRATEGY or BLOCK_PROFILES.get(BLOCK_PROFILE, BLOCK_PROFILES["none"])["page_load_strategy"]
+
+        # 共享的图片下载器，跨项目和分类复用连接 / Shared image downloader, reuses connections across projects and categories
+        self._owns_downloader = downloader is None
+        self.downloader = downloader or ImageDownloader(pool_size=HTTP_POOL_SIZE, timeout=REQUEST_TIMEOUT, resume_attempts=MAX_IMG_RETRIES,
+                                     rate_limiter=get_rate_limiter(), retry_policy=get_retry_policy("image"))
+
+        # 下载管道，浏览器线程只负责收集图片URL / Download pipeline, the browser thread only collects image URLs
+        self._owns_pipeline = pipeline is None
+        self.pipeline = pipeline or create_download_pipeline(self.downloader)
+
+        # 页面就绪实际等待时间统计 / Statistics of the time actually spent waiting for pages
+        self.ready_wait = {"pages": 0, "seconds": 0.0}
 
         # 初始化浏览器 / Initialize browser
-        driver_tuple = init_browser(self.chromedriver_path)
+        driver_tuple = init_browser(self.chromedriver_path, capture_network=NETWORK_CAPTURE or REUSE_BROWSER_BODIES,
+                                    block_profile=BLOCK_PROFILE, page_load_strategy=PAGE_LOAD_STRATEGY)
         if driver_tuple and driver_tuple[0]:
             self.driver, self.wait = driver_tuple
         else:
             print("浏览器初始化失败 / Browser initialization failed")
 
+    def _load_page(self, url):
+        """
+        按页面重试策略加载页面 / Load a page with the page retry policy
+        """
+        get_retry_policy("page").call(self._get_page, url, description=f"页面加载 / Page load {url}")
+
+    def _get_page(self, url):
+        """
+        按主机限速加载页面，并把加载耗时反馈给限速器
+        Load a page paced by the per-host rate limiter and report the load time back to it
+        """
+        limiter = get_rate_limiter()
+        limiter.acquire(url)
+        previous = self.driver.current_url if self.page_load_strategy == "none" else None
+        start = time.monotonic()
+        try:
+            self.driver.get(url)
+        except Exception:
+            limiter.record(url, error=True)
+            raise
+        if self.page_load_strategy == "none":
+            # driver.get已立即返回，等待导航提交以免读到上一页的DOM / driver.get returned at once; wait for the navigation to commit so the previous DOM is not read
+            wait_until_ready(self.driver, url_committed(url, previous), timeout=PAGE_READY_TIMEOUT)
+        # 整页加载耗时有自己的基线，不与同主机图片请求的延迟比较 / Page loads have their own baseline, separate from image requests to the same host
+        limiter.record(url, latency=time.monotonic() - start, kind=KIND_PAGE)
+
+    def _wait_ready(self, condition):
+        """
+        等待页面就绪并记录实际等待时间
+        Wait for the page to become ready and record the time actually waited
+        """
+        result, waited = wait_until_ready(self.driver, condition, timeout=PAGE_READY_TIMEOUT)
+        self.ready_wait["pages"] += 1
+        self.ready_wait["seconds"] += waited
+        print(f"  • 页面就绪等待 {waited:.2f} 秒 / Waited {waited:.2f}s for page readiness")
+        return result
+
+    def _load_until_ready(self, url, condition, expect=None):
+        """
+        加载页面并等待就绪，未就绪时按重试策略退避后重新加载
+        Load a page and wait for readiness, reloading after a backoff when it does not become ready
+
+        Args:
+            expect (str): 当前URL应包含的文本，不包含时重新加载一次 / Text the current URL must contain, reloaded once otherwise
+
+        Raises:
+            TimeoutError: 多次加载后仍未就绪 / Still not ready after every load
+        """
+        def load_and_wait():
+            self._load_page(url)
+            if expect and expect not in self.driver.current_url:
+                print(f"当前页面URL不包含 {expect}，重新加载 / Current URL lacks {expect}, reloading: {url}")
+                self._load_page(url)
+            result = self._wait_ready(condition)
+            if result is None:
+                raise TimeoutError(f"页面未在 {PAGE_READY_TIMEOUT} 秒内就绪 / Page not ready within {PAGE_READY_TIMEOUT}s")
+            return result
+
+        return get_retry_policy("page").call(load_and_wait, description=f"页面就绪 / Page readiness {url}",
+                                             max_attempts=PAGE_READY_ATTEMPTS)
+
     def _download_images(self, save_dir, project_detail_url, project_id):
         """下载项目页面中的所有图片 / Download all images in the project page"""
-        global _current_project_retries, _download_status_cache, _status_modified
-        _current_project_retries = {}
-        
-        # 强制加载当前项目详情页，确保页面正确
+        # 强制加载当前项目详情页，确保页面正确；通过aria-label获取图片总数
+        # Load the project detail page and read the total image count from its aria-label
         print(f"加载项目详情页: {project_detail_url} / Loading project detail page: {project_detail_url}")
-        self.driver.get(project_detail_url)
-        time.sleep(3)
-                
-        # 通过aria-label获取图片总数
-        current_url = self.driver.current_url
-        if f"id={project_id}" not in current_url:
-            print(f"当前页面URL不包含期望的项目id({project_id}), 重新加载详情页: {project_detail_url}")
-            self.driver.get(project_detail_url)
-            time.sleep(3)
+        capture = NETWORK_CAPTURE or REUSE_BROWSER_BODIES
+        if capture:
+            # 丢弃之前页面的事件 / Discard events from earlier pages
+            drain_performance_log(self.driver)
         try:
+            aria_label = self._load_until_ready(project_detail_url, swiper_ready, expect=f"id={project_id}")
             print(f"已进入子页面, 当前URL: {self.driver.current_url} / Entered subpage, current URL")
-            element = self.wait.until(EC.presence_of_element_located((By.XPATH, "//*[@id='mSwiperDiv']/div[1]")))
-            aria_label = element.get_attribute("aria-label")
             print(f"获取到 aria-label: {aria_label}")
             match = re.search(r"\s*(\d+)\s*/\s*(\d+)", aria_label)
             if match:
@@ -362,11 +915,12 @@ class SLDSpider:
                 print(f"解析图片总数: {total_image_count} / Parsed total images: {total_image_count}")
             else:
                 total_image_count = 0
-        except Exception as e:
+        except TimeoutError as e:
+            # 页面能加载但轮播图未就绪，按无图片数量继续 / The page loads but the swiper never became ready
             print(f"无法获取图片数量: {str(e)}")
             total_image_count = 0
 
-        if total_image_count > 0:
+        if total_image_count > 0 and not REVALIDATE:
             print(f"  • 初步检测到 {total_image_count} 张图片 / Preliminary detected {total_image_count} images")
             all_downloaded = True
             for idx in range(total_image_count):
@@ -376,137 +930,98 @@ class SLDSpider:
                     break
             if all_downloaded:
                 print(f"  ✓ 所有 {total_image_count} 张图片已下载，跳过 / All {total_image_count} images downloaded, skipping")
+                record_project_visit(save_dir, project_id, total_image_count, collect_swiper_image_urls(self.driver))
                 return
         else:
             print("  • 图片不完整，继续下载 / Images incomplete, continuing download")
 
-        image_status = {"total": total_image_count, "downloaded": 0, "skipped": 0, "failed": 0, "retried": 0, "details": []}
+        # 一次往返获取所有幻灯片的图片URL / Get every slide's image URL in one round-trip
+        img_urls = collect_swiper_image_urls(self.driver)
+        print(f"  • 获取到 {len(img_urls)} 个图片URL / Collected {len(img_urls)} image URLs")
+        fetch_local = None
+        if capture:
+            responses = captured_image_responses(drain_performance_log(self.driver))
+            print(f"  • 网络事件中捕获 {len(responses)} 个图片响应 / Captured {len(responses)} image responses")
+            img_urls = supplement_network_urls(img_urls, responses, total_image_count)
+            if REUSE_BROWSER_BODIES:
+                fetch_local = functools.partial(save_browser_body, self.driver, responses)
+        if total_image_count == 0:
+            total_image_count = len(img_urls)
+        elif len(img_urls) != total_image_count:
+            print(f"  ⚠ 图片URL数量与aria-label不一致 ({len(img_urls)}/{total_image_count}) / Image URL count differs from aria-label")
 
-        for idx in range(total_image_count):
-            try:
-                img_element = self.driver.find_element(By.XPATH, "//*[@id='mSwiperDiv']//img")
-                img_src = img_element.get_attribute('src')
-                if not img_src or img_src.strip() == '':
-                    print(f"  ✗ 第 {idx+1} 张图片URL为空 / Empty image URL for image {idx+1}")
-                    continue
-                print(f"  • 第 {idx+1} 张图片的源URL: {img_src} / Source URL for image {idx+1}")
-
-                file_ext = ".jpg"
-                for ext in ['.png', '.jpeg', '.gif', '.webp']:
-                    if img_src.lower().endswith(ext):
-                        file_ext = ext
-                        break
-                        
-                img_save_path = os.path.join(PICTURE_DIR, save_dir, f"id{project_id}_{idx}{file_ext}")
-                
-                print(f"  • 正在下载第 {idx+1} 张图片 ({file_ext}) / Downloading image {idx+1}")
-                headers = {
-                    'User-Agent': random_ua()["User-Agent"],
-                    'Referer': project_detail_url,
-                    'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'Connection': 'keep-alive'
-                }
-                response = requests.get(img_src, headers=headers, stream=True, timeout=REQUEST_TIMEOUT, verify=False)
-                if response.status_code == 200:
-                    with open(img_save_path, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
-                else:
-                    print(f"  ✗ 第 {idx+1} 张图片下载失败，HTTP状态码: {response.status_code}")
-                    continue
-                
-                if os.path.exists(img_save_path) and os.path.getsize(img_save_path) > 10000:
-                    mark_image_downloaded(save_dir, project_id, idx)
-                    print(f"  ✓ 成功保存第 {idx+1} 张图片 / Image {idx+1} saved successfully")
-                else:
-                    print(f"  ✗ 第 {idx+1} 张图片保存失败或文件太小 / Image {idx+1} save failed or file too small")
-            except Exception as e:
-                print(f"  ✗ 处理第 {idx+1} 张图片出错: {str(e)}")
-
-        print("\n下载总结 / Download summary:")
-        print(f"• 总图片数: {image_status['total']}")
-        print(f"• 成功下载: {image_status['downloaded']}")
-        print(f"• 已存在跳过: {image_status['skipped']}")
-        print(f"• 重试次数: {image_status['retried']}")
-        print(f"• 下载失败: {image_status['failed']}")
-            
-        if image_status['failed'] > 0:
-            print("\n失败详情 / Failure details:")
-            for img in image_status["details"]:
-                if img["status"] == "failed":
-                    print(f"• {img['path']} - 原因: {img['reason']}")
-            
+        image_status = submit_project_images(self.pipeline, save_dir, project_id, img_urls,
+                                             project_detail_url, total_image_count, fetch_local=fetch_local)
+        print_download_summary(image_status)
+        record_project_visit(save_dir, project_id, total_image_count, img_urls)
         save_download_status(force=True)
 
+    def discover_projects(self, category):
+        """
+        访问分类页面，一次读取所有项目条目(链接、标题、缩略图)并记录下来
+        Visit the category page, read every project entry (link, title, thumbnail) in one call and remember them
+
+        Returns:
+            dict: 项目ID -> {href, title, thumbnail}，失败时为空 / project ID -> {href, title, thumbnail}, empty on failure
+        """
+        category_url = get_category_url(category)
+        print(f"访问分类页面 / Visiting category page: {category_url}")
+        try:
+            self._load_until_ready(category_url, listing_ready)
+            projects = projects_from_entries(collect_all_listing_entries(self.driver, load_page=self._load_page))
+            print(f"找到 {len(projects)} 个项目 / Found {len(projects)} projects")
+        except Exception as e:
+            print(f"访问分类 {category} 时出错: {str(e)} / Error visiting category {category}: {str(e)}")
+            projects = {}
+        remember_listing(category, projects)
+        return projects
+
+    def discover_project_ids(self, category):
+        """
+        返回分类中实际存在的项目ID，读取不到列表时回退到DEFAULT_MAX_IDS
+        Return the project IDs that actually exist in the category, falling back to DEFAULT_MAX_IDS without a listing
+        """
+        return listed_project_ids(category, self.discover_projects(category))
+
+    def crawl_project(self, category, project_id):
+        """
+        处理单个项目，请求节奏由共享的限速器控制
+        Process a single project; request pacing comes from the shared rate limiter
+        """
+        detail_url = get_detail_url(category, project_id)
+        print(f"使用URL: {detail_url} / Using URL: {detail_url}")
+        self._download_images(category, detail_url, project_id)
+        print(f"当前页面请求速率 / Current page request rate: {get_rate_limiter().current_rate(detail_url):.2f}/s")
+
     def crawl_and_download(self):
         """
         爬取并下载所有分类的图片
         Crawl and download images for all categories
         """
         try:
-            global _download_status_cache
-            if _download_status_cache is None:
-                _download_status_cache = load_download_status()
-                
+            load_download_status()
+
             for category in self.save_dirs:
                 print(f"\n开始处理分类 / Starting category: {category}")
-                
-                # 构建分类页面URL
-                if category == "salesoffice":
-                    category_url = "https://www.sldgroup.com/tc/salesoffice.aspx"
-                else:
-                    url_path = URL_PATH_MAPPING.get(category, category)
-                    category_url = f"https://www.sldgroup.com/tc/{url_path}.aspx"
+                project_ids = self.discover_project_ids(category)
 
-                print(f"访问分类页面 / Visiting category page: {category_url}")
-                try:
-                    self.driver.get(category_url)
-                    time.sleep(3)
-                    self.wait.until(EC.presence_of_element_located((By.ID, "mWorkDiv")))
-                    project_links = self.driver.find_elements(By.XPATH, '//*[@id="mWorkDiv"]/li/a')
-                    max_id = 0
-                    print("开始寻找项目ID / Starting to find project IDs")
-                    for link in project_links:
-                        href = link.get_attribute('href')
-                        print(f"找到链接 / Found link: {href}")
-                        m = re.search(r"id=(\d+)", href)
-                        if m:
-                            id_value = int(m.group(1))
-                            if id_value > max_id:
-                                max_id = id_value
-                    if max_id == 0:
-                        max_id = DEFAULT_MAX_IDS.get(category, 5)
-                    print(f"分类 {category} 的最大ID为 / Maximum ID for {category} is: {max_id}")
-                except Exception as e:
-                    print(f"访问分类 {category} 时出错: {str(e)} / Error visiting category {category}: {str(e)}")
-                    max_id = DEFAULT_MAX_IDS.get(category, 5)
-
-                # 遍历所有项目
-                for project_id in range(1, max_id + 1):
+                # 遍历列表中的项目 / Iterate over the listed projects
+                for n, project_id in enumerate(project_ids, 1):
+                    if not should_visit_project(category, project_id):
+                        continue
                     try:
-                        print(f"处理项目 / Processing project: {project_id}/{max_id}")
-                        if category == "salesoffice":
-                            detail_url = f"https://www.sldgroup.com/tc/saleoffice-detail.aspx?id={project_id}"
-                        else:
-                            detail_url = f"https://www.sldgroup.com/tc/{URL_PATH_MAPPING.get(category, category)}-detail.aspx?id={project_id}"
-                        print(f"使用URL: {detail_url} / Using URL: {detail_url}")
-                        self._download_images(category, detail_url, project_id)
-                        wait_time = random.uniform(MIN_WAIT_TIME, MAX_WAIT_TIME)
-                        print(f"等待 {wait_time:.1f} 秒后继续... / Waiting {wait_time:.1f}s before continuing...")
-                        time.sleep(wait_time)
+                        print(f"处理项目 / Processing project: id={project_id} ({n}/{len(project_ids)})")
+                        self.crawl_project(category, project_id)
                     except Exception as project_e:
                         print(f"处理项目 {project_id} 时出错: {str(project_e)} / Error processing project")
+                        queue_crawl_retry(("project", category, project_id), project_e)
                         save_download_status(force=True)
                         continue
-                
-                # 分类之间添加额外延迟
-                pause_time = random.uniform(5, 10)
-                print(f"\n在处理下一个分类前暂停 {pause_time:.1f} 秒... / Pausing for {pause_time:.1f}s before next category...")
-                time.sleep(pause_time)
             
-            print("\n所有分类爬取完成 / All categories crawled")
+            print("\n所有分类爬取完成，等待剩余下载完成... / All categories crawled, waiting for pending downloads...")
+            self.pipeline.join()
+            drain_retry_queue(self.pipeline, self.retry_items)
+            print_pipeline_stats(self.pipeline)
             save_download_status(force=True)
         except Exception as e:
             print(f"爬取过程中出错 / Error during crawl: {str(e)}")
@@ -520,12 +1035,186 @@ class SLDSpider:
         finally:
             self.cleanup()
     
+    def retry_items(self, items):
+        """
+        重新处理重试队列中的爬取任务，返回仍失败的(任务, 错误)列表
+        Reprocess crawl items from the retry queue, returning the (item, error) pairs that still failed
+        """
+        failed = []
+        pending = list(items)
+        while pending:
+            item = pending.pop(0)
+            try:
+                print(f"重试 / Retrying: {'/'.join(map(str, item))}")
+                _crawl_pool_item(self, item, pending.append)
+            except Exception as e:
+                print(f"重试 {item} 时出错: {str(e)} / Error retrying item")
+                failed.append((item, e))
+        return failed
+
     def cleanup(self):
         """
         清理资源，关闭浏览器
         Clean up resources and close the browser
         """
+        if self.ready_wait["pages"]:
+            pages, seconds = self.ready_wait["pages"], self.ready_wait["seconds"]
+            print(f"页面就绪等待: {pages} 页共 {seconds:.1f} 秒，平均 {seconds/pages:.2f} 秒 / Readiness wait: {pages} pages, {seconds:.1f}s total, {seconds/pages:.2f}s average")
+            self.ready_wait = {"pages": 0, "seconds": 0.0}
         cleanup_browser(self.driver)
+        self.driver = None
+        if self._owns_pipeline and self.pipeline:
+            self.pipeline.close()
+        if self._owns_downloader and self.downloader:
+            self.downloader.close()
+
+def _crawl_pool_item(spider, item, submit):
+    """
+    浏览器池任务处理：分类任务负责发现项目ID，项目任务负责下载
+    Browser pool item handler: category items discover project IDs, project items download them
+    """
+    if item[0] == "category":
+        category = item[1]
+        print(f"\n开始处理分类 / Starting category: {category}")
+        for project_id in spider.discover_project_ids(category):
+            if should_visit_project(category, project_id):
+                submit(("project", category, project_id))
+    else:
+        _, category, project_id = item
+        print(f"处理项目 / Processing project: {category} {project_id}")
+        spider.crawl_project(category, project_id)
+
+def crawl_with_browser_pool(size, chromedriver_path=None):
+    """
+    使用多个浏览器并行爬取，所有浏览器共享一个下载器和下载管道
+    Crawl with several browsers in parallel, all sharing one downloader and download pipeline
+    """
+    load_download_status()
+    downloader = ImageDownloader(pool_size=HTTP_POOL_SIZE, timeout=REQUEST_TIMEOUT, resume_attempts=MAX_IMG_RETRIES,
+                                     rate_limiter=get_rate_limiter(), retry_policy=get_retry_policy("image"))
+    pipeline = create_download_pipeline(downloader)
+
+    def spider_factory():
+        spider = SLDSpider(chromedriver_path=chromedriver_path, downloader=downloader, pipeline=pipeline)
+        if not spider.driver:
+            spider.cleanup()
+            return None
+        return spider
+
+    def retry_with_pool(items):
+        """用新的浏览器池重试失败的任务 / Retry failed items with a fresh browser pool"""
+        retry_pool = BrowserPool(spider_factory, size=min(size, len(items)), max_item_attempts=1)
+        return [(item, "browser pool retry failed") for item in retry_pool.run(items, _crawl_pool_item)]
+
+    try:
+        print(f"启动 {size} 个浏览器并行爬取 / Starting {size} browsers in parallel")
+        pool = BrowserPool(spider_factory, size=size)
+        failed_items = pool.run([("category", c) for c in DEFAULT_SAVE_DIRS], _crawl_pool_item)
+        for item in failed_items:
+            queue_crawl_retry(item, "browser pool attempts exhausted")
+
+        print("\n所有分类爬取完成，等待剩余下载完成... / All categories crawled, waiting for pending downloads...")
+        pipeline.join()
+        drain_retry_queue(pipeline, retry_with_pool)
+        print_pipeline_stats(pipeline)
+    finally:
+        pipeline.close()
+        downloader.close()
+        save_download_status(force=True)
+
+def crawl_over_http(chromedriver_path=None):
+    """
+    纯HTTP模式：直接解析ASPX页面，仅在静态解析找不到内容的页面上启动Selenium
+    HTTP-only mode: parse the ASPX pages directly and only start Selenium for pages the static parse finds nothing on
+    """
+    load_download_status()
+    downloader = ImageDownloader(pool_size=HTTP_POOL_SIZE, timeout=REQUEST_TIMEOUT, resume_attempts=MAX_IMG_RETRIES,
+                                     rate_limiter=get_rate_limiter(), retry_policy=get_retry_policy("image"))
+    pipeline = create_download_pipeline(downloader)
+    crawler = HttpCrawler(downloader, retry_policy=get_retry_policy("page"))
+    browser = {"spider": None, "failed": False}
+    fallback_pages = 0
+
+    def get_browser_spider():
+        """按需创建回退用的浏览器 / Create the fallback browser on demand"""
+        if browser["spider"] is None and not browser["failed"]:
+            print("静态解析无结果，启动浏览器回退 / Static parse found nothing, starting browser fallback")
+            spider = SLDSpider(chromedriver_path=chromedriver_path, downloader=downloader, pipeline=pipeline)
+            if spider.driver:
+                browser["spider"] = spider
+            else:
+                browser["failed"] = True
+        return browser["spider"]
+
+    def crawl_http_project(category, project_id):
+        nonlocal fallback_pages
+        detail_url = get_detail_url(category, project_id)
+        img_urls = crawler.collect_image_urls(detail_url, referer=get_category_url(category))
+        if any(img_urls):
+            image_status = submit_project_images(pipeline, category, project_id, img_urls,
+                                                 detail_url, len(img_urls))
+            print_download_summary(image_status)
+            record_project_visit(category, project_id, len(img_urls), img_urls)
+            return
+        spider = get_browser_spider()
+        fallback_pages += 1
+        if not spider:
+            raise RuntimeError("无可用浏览器 / No browser available")
+        spider.crawl_project(category, project_id)
+
+    def retry_http_items(items):
+        """重试失败的项目 / Retry failed projects"""
+        failed = []
+        for item in items:
+            try:
+                print(f"重试项目 / Retrying project: {item[1]} {item[2]}")
+                crawl_http_project(item[1], item[2])
+            except Exception as e:
+                print(f"重试项目 {item[2]} 时出错: {str(e)} / Error retrying project")
+                failed.append((item, e))
+        return failed
+
+    try:
+        for category in DEFAULT_SAVE_DIRS:
+            print(f"\n开始处理分类 / Starting category: {category}")
+            category_url = get_category_url(category)
+            projects = crawler.discover_projects(category_url)
+            if projects and not crawler.postback_pagination:
+                remember_listing(category, projects)
+            else:
+                # 静态页面没有列表，或后续分页需要回发：由浏览器点击分页读取完整列表
+                # No listing in the static page, or later pages need a postback: let the browser click through the full listing
+                spider = get_browser_spider()
+                fallback_pages += 1
+                browser_projects = spider.discover_projects(category) if spider else {}
+                if browser_projects:
+                    projects = browser_projects
+                elif projects:
+                    print(f"  ⚠ 浏览器不可用，分类 {category} 只包含静态解析到的 {len(projects)} 个项目 / No browser, {category} only has the {len(projects)} statically parsed projects")
+                    remember_listing(category, projects)
+            project_ids = listed_project_ids(category, projects)
+
+            for n, project_id in enumerate(project_ids, 1):
+                if not should_visit_project(category, project_id):
+                    continue
+                try:
+                    print(f"处理项目 / Processing project: id={project_id} ({n}/{len(project_ids)})")
+                    crawl_http_project(category, project_id)
+                except Exception as project_e:
+                    print(f"处理项目 {project_id} 时出错: {str(project_e)} / Error processing project")
+                    queue_crawl_retry(("project", category, project_id), project_e)
+                    save_download_status(force=True)
+
+        print(f"\n所有分类爬取完成，浏览器回退页面数: {fallback_pages} / All categories crawled, browser fallback pages: {fallback_pages}")
+        pipeline.join()
+        drain_retry_queue(pipeline, retry_http_items)
+        print_pipeline_stats(pipeline)
+    finally:
+        if browser["spider"]:
+            browser["spider"].cleanup()
+        pipeline.close()
+        downloader.close()
+        save_download_status(force=True)
 
 def main():
     """
@@ -533,7 +1222,11 @@ def main():
     Main function that processes command-line arguments and starts the crawler
     """
     try:
-        global SKIP_DOWNLOAD, CHROMEDRIVER_PATH
+        global SKIP_DOWNLOAD, CHROMEDRIVER_PATH, HTTP_POOL_SIZE, DOWNLOAD_WORKERS, DOWNLOAD_QUEUE_DEPTH
+        global DOWNLOAD_ENGINE, ASYNC_CONCURRENCY, ASYNC_PER_HOST, BROWSER_POOL_SIZE, PAGE_READY_TIMEOUT, CRAWL_MODE
+        global STATUS_BACKEND, JOURNAL_FSYNC_BATCH, REVALIDATE, DEDUP_IMAGES, URL_CACHE_ENABLED, URL_CACHE_SIZE
+        global RATE_INITIAL, RATE_MIN, RATE_MAX, INCREMENTAL, NETWORK_CAPTURE, REUSE_BROWSER_BODIES
+        global BLOCK_PROFILE, PAGE_LOAD_STRATEGY, MARK_PENDING, INLINE_CONVERT, CONVERT_WORKERS, CONVERT_FORMAT
         
         # 解析命令行参数 / Parse command line arguments
         for i, arg in enumerate(sys.argv):
@@ -543,6 +1236,90 @@ def main():
             elif arg == "--skip-download":
                 SKIP_DOWNLOAD = True
                 print("已启用跳过下载选项 / Skip download option enabled")
+            elif arg == "--pool-size" and i+1 < len(sys.argv):
+                HTTP_POOL_SIZE = int(sys.argv[i+1])
+                print(f"每个主机的连接池大小: {HTTP_POOL_SIZE} / Connection pool size per host: {HTTP_POOL_SIZE}")
+            elif arg == "--workers" and i+1 < len(sys.argv):
+                DOWNLOAD_WORKERS = int(sys.argv[i+1])
+                print(f"下载线程数: {DOWNLOAD_WORKERS} / Download workers: {DOWNLOAD_WORKERS}")
+            elif arg == "--engine" and i+1 < len(sys.argv):
+                DOWNLOAD_ENGINE = sys.argv[i+1]
+                print(f"下载引擎: {DOWNLOAD_ENGINE} / Download engine: {DOWNLOAD_ENGINE}")
+            elif arg == "--concurrency" and i+1 < len(sys.argv):
+                ASYNC_CONCURRENCY = int(sys.argv[i+1])
+                print(f"异步并发数: {ASYNC_CONCURRENCY} / Async concurrency: {ASYNC_CONCURRENCY}")
+            elif arg == "--per-host" and i+1 < len(sys.argv):
+                ASYNC_PER_HOST = int(sys.argv[i+1])
+                print(f"每个主机的异步并发数: {ASYNC_PER_HOST} / Async concurrency per host: {ASYNC_PER_HOST}")
+            elif arg == "--browsers" and i+1 < len(sys.argv):
+                BROWSER_POOL_SIZE = int(sys.argv[i+1])
+                print(f"并行浏览器数量: {BROWSER_POOL_SIZE} / Parallel browsers: {BROWSER_POOL_SIZE}")
+            elif arg == "--ready-timeout" and i+1 < len(sys.argv):
+                PAGE_READY_TIMEOUT = float(sys.argv[i+1])
+                print(f"页面就绪超时: {PAGE_READY_TIMEOUT} 秒 / Page readiness timeout: {PAGE_READY_TIMEOUT}s")
+            elif arg == "--mode" and i+1 < len(sys.argv):
+                CRAWL_MODE = sys.argv[i+1]
+                print(f"爬取模式: {CRAWL_MODE} / Crawl mode: {CRAWL_MODE}")
+            elif arg == "--status-backend" and i+1 < len(sys.argv):
+                STATUS_BACKEND = sys.argv[i+1]
+                print(f"下载状态后端: {STATUS_BACKEND} / Download status backend: {STATUS_BACKEND}")
+            elif arg == "--journal-fsync" and i+1 < len(sys.argv):
+                JOURNAL_FSYNC_BATCH = int(sys.argv[i+1])
+                print(f"日志fsync批次: {JOURNAL_FSYNC_BATCH} / Journal fsync batch: {JOURNAL_FSYNC_BATCH}")
+            elif arg == "--dedup":
+                DEDUP_IMAGES = True
+                print("已启用内容去重 / Content deduplication enabled")
+            elif arg == "--url-cache":
+                URL_CACHE_ENABLED = True
+                print("已启用URL抓取缓存 / URL fetch cache enabled")
+            elif arg == "--url-cache-size" and i+1 < len(sys.argv):
+                URL_CACHE_SIZE = int(sys.argv[i+1])
+                print(f"URL缓存最大条目数: {URL_CACHE_SIZE} / URL cache max entries: {URL_CACHE_SIZE}")
+            elif arg == "--convert-inline":
+                INLINE_CONVERT = True
+                print("下载后直接转换格式 / Converting right after download")
+            elif arg == "--convert-format" and i+1 < len(sys.argv):
+                if sys.argv[i+1].lower() in OUTPUT_FORMATS:
+                    CONVERT_FORMAT = sys.argv[i+1].lower()
+                    print(f"下载后转换为: {CONVERT_FORMAT} / Converting to: {CONVERT_FORMAT}")
+                else:
+                    print(f"未知的转换格式 {sys.argv[i+1]}，使用 {CONVERT_FORMAT} / Unknown conversion format {sys.argv[i+1]}, using {CONVERT_FORMAT}")
+            elif arg == "--convert-workers" and i+1 < len(sys.argv):
+                CONVERT_WORKERS = int(sys.argv[i+1])
+                print(f"转换进程数: {CONVERT_WORKERS} / Conversion processes: {CONVERT_WORKERS}")
+            elif arg == "--mark-pending":
+                MARK_PENDING = True
+                print("新下载的图片将在转换清单中标记为待转换 / New downloads will be marked pending in the conversion manifest")
+            elif arg == "--rate" and i+1 < len(sys.argv):
+                RATE_INITIAL = float(sys.argv[i+1])
+                print(f"每个主机的初始请求速率: {RATE_INITIAL}/秒 / Initial request rate per host: {RATE_INITIAL}/s")
+            elif arg == "--min-rate" and i+1 < len(sys.argv):
+                RATE_MIN = float(sys.argv[i+1])
+                print(f"最低请求速率: {RATE_MIN}/秒 / Minimum request rate: {RATE_MIN}/s")
+            elif arg == "--max-rate" and i+1 < len(sys.argv):
+                RATE_MAX = float(sys.argv[i+1])
+                print(f"最高请求速率: {RATE_MAX}/秒 / Maximum request rate: {RATE_MAX}/s")
+            elif arg == "--block" and i+1 < len(sys.argv):
+                BLOCK_PROFILE = sys.argv[i+1]
+                print(f"资源拦截配置: {BLOCK_PROFILE} / Resource blocking profile: {BLOCK_PROFILE}")
+            elif arg == "--page-load" and i+1 < len(sys.argv):
+                PAGE_LOAD_STRATEGY = sys.argv[i+1]
+                print(f"页面加载策略: {PAGE_LOAD_STRATEGY} / Page load strategy: {PAGE_LOAD_STRATEGY}")
+            elif arg == "--capture-network":
+                NETWORK_CAPTURE = True
+                print("已启用网络事件图片捕获 / Network image capture enabled")
+            elif arg == "--reuse-bodies":
+                REUSE_BROWSER_BODIES = True
+                print("已启用复用浏览器图片响应 / Reusing browser image responses")
+            elif arg == "--incremental":
+                INCREMENTAL = True
+                print("已启用增量爬取 / Incremental crawl enabled")
+            elif arg == "--revalidate":
+                REVALIDATE = True
+                print("已启用条件请求重新验证 / Conditional revalidation enabled")
+            elif arg == "--queue-depth" and i+1 < len(sys.argv):
+                DOWNLOAD_QUEUE_DEPTH = int(sys.argv[i+1])
+                print(f"下载队列长度: {DOWNLOAD_QUEUE_DEPTH} / Download queue depth: {DOWNLOAD_QUEUE_DEPTH}")
         
         print("SLD集团网站图片爬虫 / SLD Group Website Image Crawler")
         print("支持自动下载ChromeDriver和断点续传功能 / Auto-downloads ChromeDriver and supports resume download")
@@ -554,15 +1331,59 @@ def main():
             print("\n选项 / Options:")
             print("  --driver PATH       指定ChromeDriver路径 / Specify ChromeDriver path")
             print("  --skip-download     跳过下载，仅尝试本地ChromeDriver / Skip download, only try local ChromeDriver")
+            print("  --pool-size N       每个图片主机的连接池大小 / Connection pool size per image host")
+            print("  --workers N         图片下载线程数 / Number of image download workers")
+            print("  --queue-depth N     待下载图片队列长度 / Pending image download queue depth")
+            print("  --engine NAME       下载引擎: thread 或 async / Download engine: thread or async")
+            print("  --concurrency N     异步引擎全局并发数 / Async engine global concurrency")
+            print("  --per-host N        异步引擎每个主机的并发数 / Async engine concurrency per host")
+            print("  --browsers N        并行浏览器数量 / Number of parallel browsers")
+            print("  --ready-timeout S   页面就绪最长等待秒数 / Maximum seconds to wait for page readiness")
+            print("  --mode MODE         爬取模式: browser 或 http / Crawl mode: browser or http")
+            print("  --status-backend B  下载状态后端: json、journal 或 sqlite / Download status backend: json, journal or sqlite")
+            print("  --journal-fsync N   日志后端每N条记录fsync一次 / Journal backend fsync batch size")
+            print("  --rate R            每个主机的初始请求速率(请求/秒) / Initial request rate per host (requests/s)")
+            print("  --min-rate R        拥塞时的最低请求速率 / Lowest request rate under congestion")
+            print("  --max-rate R        健康时的最高请求速率 / Highest request rate while healthy")
+            print("  --block PROFILE     浏览器资源拦截: none、light 或 strict / Browser resource blocking: none, light or strict")
+            print("  --page-load S       页面加载策略: normal、eager 或 none / Page load strategy: normal, eager or none")
+            print("  --capture-network   从浏览器网络事件中捕获图片URL / Capture image URLs from browser network events")
+            print("  --reuse-bodies      直接保存浏览器已下载的图片 / Save images the browser already downloaded")
+            print("  --incremental       只访问新增、列表有变化或缺图的项目 / Only visit new, changed or incomplete projects")
+            print("  --revalidate        用ETag/Last-Modified重新验证已下载的图片 / Revalidate downloaded images with ETag/Last-Modified")
+            print("  --dedup             相同内容的图片只保留一份(硬链接) / Keep one copy of identical images (hardlinks)")
+            print("  --url-cache         复用之前已下载过的相同图片URL / Reuse images whose URL was already fetched")
+            print("  --url-cache-size N  URL缓存最大条目数 / Maximum URL cache entries")
+            print("  --mark-pending      在转换清单中标记新下载的图片 / Mark new downloads in the conversion manifest")
+            print("  --convert-inline    下载后直接在CPU进程池中转换为PNG / Convert to PNG on a CPU process pool right after download")
+            print("  --convert-format F  下载后转换的格式: png、webp、jpeg 或 avif / Format for --convert-inline: png, webp, jpeg or avif")
+            print("  --convert-workers N 转换进程数 / Number of conversion processes")
             print("  --help, -h          显示此帮助信息 / Show this help message")
             return
         
+        if INLINE_CONVERT and not is_format_available(CONVERT_FORMAT):
+            print(f"⚠ 当前Pillow不支持写出 {CONVERT_FORMAT}，改为png / The installed Pillow cannot write {CONVERT_FORMAT}, using png")
+            CONVERT_FORMAT = "png"
+
+        if REUSE_BROWSER_BODIES and not BLOCK_PROFILES.get(BLOCK_PROFILE, BLOCK_PROFILES["none"])["images"]:
+            print(f"⚠ 资源拦截配置 {BLOCK_PROFILE} 禁用了图片，--reuse-bodies 无响应体可复用 / Profile {BLOCK_PROFILE} disables images, so --reuse-bodies has nothing to reuse")
+
         # 确保目录存在 / Ensure directory exists
         if not os.path.exists(PICTURE_DIR):
             os.makedirs(PICTURE_DIR)
         
         # 导入traceback模块，用于详细错误报告
         import traceback
+
+        # 纯HTTP模式，或多个浏览器并行爬取 / HTTP-only mode, or crawl with several browsers in parallel
+        if CRAWL_MODE == "http" or BROWSER_POOL_SIZE > 1:
+            if CRAWL_MODE == "http":
+                crawl_over_http(CHROMEDRIVER_PATH)
+            else:
+                crawl_with_browser_pool(BROWSER_POOL_SIZE, CHROMEDRIVER_PATH)
+            print("\n爬取完成 / Crawling completed")
+            print(f"图片保存在 / Images saved in: {os.path.abspath(PICTURE_DIR)}")
+            return
         
         # 增加更强健的错误处理
         max_init_retries = 3
@@ -643,9 +1464,9 @@ def main():
         print("   python sldgroup-spider.py --driver /path/to/chromedriver")
         print("4. 如果您已经有ChromeDriver但自动检测失败，请使用命令行选项手动指定路径 / If you already have ChromeDriver but auto-detection fails, manually specify the path")
     finally:
-        # 确保保存下载状态
+        # 确保保存并关闭下载状态
         try:
-            save_download_status(force=True)
+            close_download_status()
         except:
             pass
         
@@ -655,6 +1476,9 @@ def main():
                 spider.cleanup()
             except:
                 pass
+        
+        # 等待剩余转换完成 / Wait for the remaining conversions
+        close_convert_pool()
 
 if __name__ == "__main__":
     main() 
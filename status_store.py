@@ -0,0 +1,402 @@
+"""
+下载状态存储 - 可插拔的断点续传状态后端(JSON / 日志 / SQLite)
+Download Status Store - pluggable resume-state backends (JSON / journal / SQLite)
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+from abc import ABC, abstractmethod
+
+DEFAULT_SAVE_INTERVAL = 5      # 每记录N张图片保存/提交一次 / Save or commit after every N recorded images
+DEFAULT_FSYNC_BATCH = 20       # 日志每N条记录fsync一次 / fsync the journal after every N records
+DEFAULT_COMPACT_BYTES = 4 * 1024 * 1024  # 日志超过此大小时压缩为快照 / Compact into the snapshot once the journal exceeds this size
+
+
+def image_key(project_id, idx):
+    """状态中图片的键 / Key of an image in the status data"""
+    return f"id{project_id}_{idx}"
+
+
+def parse_image_key(key):
+    """解析 id{N}_{idx} 形式的键，无效返回None / Parse a key of the form id{N}_{idx}, None if invalid"""
+    m = re.fullmatch(r"id(\d+)_(\d+)", key)
+    if not m:
+        return None
+    return int(m.group(1)), int(m.group(2))
+
+
+def entry_value(validators, sha256):
+    """
+    JSON状态中的记录值：有校验信息或哈希时为字典，否则沿用true
+    Record value in the JSON status: a dict when validators or a hash exist, otherwise the legacy true
+    """
+    if not validators and not sha256:
+        return True
+    value = dict(validators or {})
+    if sha256:
+        value["sha256"] = sha256
+    return value
+
+
+class StatusStore(ABC):
+    """
+    状态后端接口；调用方负责加锁，后端本身不保证线程安全
+    Status backend interface; callers hold the lock, backends are not thread-safe on their own
+    """
+
+    @abstractmethod
+    def is_downloaded(self, category, project_id, idx):
+        """图片是否已记录为下载完成 / Whether the image is recorded as downloaded"""
+
+    @abstractmethod
+    def mark_downloaded(self, category, project_id, idx, url=None, size=None, validators=None, sha256=None):
+        """
+        记录图片下载完成 / Record an image as downloaded
+
+        Args:
+            validators (dict): etag / last_modified / content_length，用于之后的条件请求 / for later conditional requests
+            sha256 (str): 图片内容哈希 / Content hash of the image
+        """
+
+    @abstractmethod
+    def get_validators(self, category, project_id, idx):
+        """返回已保存的校验信息，没有则返回None / Return the stored validators, or None"""
+
+    @abstractmethod
+    def save(self, force=False):
+        """将未保存的记录写入磁盘 / Persist pending records"""
+
+    def close(self):
+        """保存并释放资源 / Save and release resources"""
+        self.save(force=True)
+
+
+class JsonStatusStore(StatusStore):
+    """
+    原有的JSON文件格式：{"downloaded_images": {分类: {id{N}_{idx}: true}}}，每次保存重写整个文件
+    The original JSON file format: {"downloaded_images": {category: {id{N}_{idx}: true}}}, rewritten in full on every save
+    """
+
+    def __init__(self, path, save_interval=DEFAULT_SAVE_INTERVAL):
+        self.path = path
+        self.save_interval = save_interval
+        self._modified = False
+        self._processed_count = 0
+        self.data = self._load()
+
+    def _load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                # 验证数据格式是否正确
+                if isinstance(data, dict) and isinstance(data.get("downloaded_images"), dict):
+                    print("已从文件加载下载状态记录 / Download status loaded from file")
+                    return data
+                print("下载状态文件格式无效，将使用新的状态 / Download status file has invalid format, will use new status")
+            except Exception as e:
+                print(f"加载下载状态失败: {str(e)} / Failed to load download status: {str(e)}")
+        print("初始化新的下载状态 / Initialized new download status")
+        return {"downloaded_images": {}}
+
+    def is_downloaded(self, category, project_id, idx):
+        return image_key(project_id, idx) in self.data["downloaded_images"].get(category, {})
+
+    def get_validators(self, category, project_id, idx):
+        value = self.data["downloaded_images"].get(category, {}).get(image_key(project_id, idx))
+        return value if isinstance(value, dict) else None
+
+    def mark_downloaded(self, category, project_id, idx, url=None, size=None, validators=None, sha256=None):
+        self.data["downloaded_images"].setdefault(category, {})[image_key(project_id, idx)] = entry_value(validators, sha256)
+        self._modified = True
+        self._processed_count += 1
+        # 每处理一定数量的图片就保存一次状态
+        if self._processed_count >= self.save_interval:
+            self.save()
+
+    def save(self, force=False):
+        # 如果状态未修改且不是强制保存，则跳过
+        if not self._modified and not force:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, ensure_ascii=False, indent=2)
+            self._modified = False
+            self._processed_count = 0
+            print("✓ 下载状态已保存 / Download status saved")
+        except Exception as e:
+            print(f"保存下载状态失败: {str(e)} / Failed to save download status: {str(e)}")
+
+            # 尝试备份保存，以防文件系统问题
+            try:
+                backup_file = f"{self.path}.bak"
+                with open(backup_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.data, f, ensure_ascii=False, indent=2)
+                print(f"✓ 下载状态已保存到备份文件: {backup_file} / Download status saved to backup file")
+            except Exception as be:
+                print(f"保存到备份文件也失败: {str(be)} / Failed to save to backup file as well")
+
+
+class JournalStatusStore(JsonStatusStore):
+    """
+    追加写日志：每次记录只追加一行JSONL并按批fsync，关闭或日志过大时合并进JSON快照；
+    启动时加载快照并重放日志。崩溃最多丢失一个未fsync的批次
+    Append-only journal: each record appends one JSONL line, fsynced in batches, and is folded
+    into the JSON snapshot on close or once the journal grows too large. Startup loads the
+    snapshot and replays the journal, so a crash loses at most one unsynced batch.
+    """
+
+    def __init__(self, path, journal_path, fsync_batch=DEFAULT_FSYNC_BATCH, compact_bytes=DEFAULT_COMPACT_BYTES):
+        """
+        Args:
+            path (str): JSON快照路径，与JsonStatusStore格式相同 / JSON snapshot path, same format as JsonStatusStore
+            journal_path (str): JSONL日志路径 / JSONL journal path
+            fsync_batch (int): 每N条记录fsync一次 / fsync after every N records
+            compact_bytes (int): 日志压缩阈值(字节) / Journal compaction threshold in bytes
+        """
+        self.journal_path = journal_path
+        self.fsync_batch = max(1, fsync_batch)
+        self.compact_bytes = compact_bytes
+        self._unsynced = 0
+        super().__init__(path)
+        self._replay_journal()
+        directory = os.path.dirname(journal_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._journal = open(journal_path, 'a', encoding='utf-8')
+
+    def _replay_journal(self):
+        if not os.path.exists(self.journal_path):
+            return
+        replayed = 0
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    category, key = entry["category"], entry["key"]
+                except (ValueError, TypeError, KeyError):
+                    # 崩溃时写了一半的最后一行或损坏的记录 / Half-written last line from a crash or a malformed record
+                    continue
+                if not isinstance(category, str) or not isinstance(key, str):
+                    continue
+                self.data["downloaded_images"].setdefault(category, {})[key] = \
+                    entry_value(entry.get("validators"), entry.get("sha256"))
+                replayed += 1
+        if replayed:
+            self._modified = True
+            print(f"已重放 {replayed} 条下载状态日志 / Replayed {replayed} download status journal entries")
+
+    def mark_downloaded(self, category, project_id, idx, url=None, size=None, validators=None, sha256=None):
+        key = image_key(project_id, idx)
+        self.data["downloaded_images"].setdefault(category, {})[key] = entry_value(validators, sha256)
+        self._modified = True
+        entry = {"category": category, "key": key, "url": url, "size": size, "validators": validators,
+                 "sha256": sha256, "ts": time.time()}
+        self._journal.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_batch:
+            self._sync()
+            if self._journal.tell() >= self.compact_bytes:
+                self.compact()
+
+    def _sync(self):
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._unsynced = 0
+
+    def save(self, force=False):
+        """只fsync日志，整份快照仅在压缩时重写 / Only fsync the journal; the snapshot is rewritten on compaction only"""
+        if self._unsynced or force:
+            try:
+                self._sync()
+            except Exception as e:
+                print(f"同步下载状态日志失败: {str(e)} / Failed to sync download status journal: {str(e)}")
+
+    def compact(self):
+        """
+        将当前状态原子写入快照并清空日志
+        Atomically write the current state to the snapshot and truncate the journal
+        """
+        self._sync()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._journal.seek(0)
+        self._journal.truncate()
+        self._modified = False
+        print("✓ 下载状态日志已压缩为快照 / Download status journal compacted into snapshot")
+
+    def close(self):
+        if self._journal.closed:
+            return
+        try:
+            if self._modified:
+                self.compact()
+        finally:
+            self._journal.close()
+
+
+class SqliteStatusStore(StatusStore):
+    """
+    SQLite状态库：每张图片一行，主键索引查询，WAL模式，批量提交
+    SQLite status store: one row per image, primary-key lookups, WAL mode and batched commits
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS images (
+            category   TEXT    NOT NULL,
+            project_id INTEGER NOT NULL,
+            idx        INTEGER NOT NULL,
+            url        TEXT,
+            size       INTEGER,
+            hash       TEXT,
+            updated_at REAL,
+            state      TEXT    NOT NULL DEFAULT 'done',
+            PRIMARY KEY (category, project_id, idx)
+        );
+        CREATE INDEX IF NOT EXISTS idx_images_category_project ON images (category, project_id);
+    """
+
+    # 之后版本新增的列，打开旧库时自动补齐 / Columns added later, filled in when an older database is opened
+    EXTRA_COLUMNS = {
+        "etag": "TEXT",
+        "last_modified": "TEXT",
+        "content_length": "INTEGER",
+    }
+
+    def __init__(self, path, save_interval=DEFAULT_SAVE_INTERVAL, migrate_from=None):
+        """
+        Args:
+            path (str): 数据库路径 / Database path
+            save_interval (int): 每N条记录提交一次 / Commit after every N records
+            migrate_from (str): 首次使用时导入的旧JSON状态文件 / Legacy JSON status file imported on first use
+        """
+        self.path = path
+        self.save_interval = save_interval
+        self._pending = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 由调用方的锁保证串行访问 / Serialized by the caller's lock
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        existing = {row[1] for row in self.conn.execute("PRAGMA table_info(images)")}
+        for column, column_type in self.EXTRA_COLUMNS.items():
+            if column not in existing:
+                self.conn.execute(f"ALTER TABLE images ADD COLUMN {column} {column_type}")
+        self.conn.commit()
+        if migrate_from:
+            self.migrate_json(migrate_from)
+
+    def migrate_json(self, json_path):
+        """
+        一次性导入旧的JSON状态文件，导入后重命名为 .migrated
+        One-shot import of the legacy JSON status file, renamed to .migrated afterwards
+        """
+        if not os.path.exists(json_path):
+            return 0
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            rows = []
+            for category, images in data.get("downloaded_images", {}).items():
+                for key, done in images.items():
+                    parsed = parse_image_key(key)
+                    if not parsed or not done:
+                        continue
+                    # 字典值带有哈希和条件请求校验信息，旧的true值只有键 / Dict values carry the hash and validators, the legacy true only the key
+                    value = done if isinstance(done, dict) else {}
+                    rows.append((category, parsed[0], parsed[1], value.get("url"),
+                                 value.get("size", value.get("content_length")), value.get("sha256"), time.time(),
+                                 value.get("etag"), value.get("last_modified"), value.get("content_length")))
+            with self.conn:
+                self.conn.executemany(
+                    """INSERT OR IGNORE INTO images (category, project_id, idx, url, size, hash, updated_at,
+                                                     etag, last_modified, content_length)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    rows
+                )
+            os.replace(json_path, f"{json_path}.migrated")
+            print(f"✓ 已从JSON迁移 {len(rows)} 条下载状态 / Migrated {len(rows)} status records from JSON")
+            return len(rows)
+        except Exception as e:
+            print(f"迁移JSON下载状态失败: {str(e)} / Failed to migrate JSON download status")
+            return 0
+
+    def is_downloaded(self, category, project_id, idx):
+        row = self.conn.execute(
+            "SELECT 1 FROM images WHERE category = ? AND project_id = ? AND idx = ? AND state = 'done'",
+            (category, project_id, idx)
+        ).fetchone()
+        return row is not None
+
+    def get_validators(self, category, project_id, idx):
+        row = self.conn.execute(
+            "SELECT etag, last_modified, content_length FROM images WHERE category = ? AND project_id = ? AND idx = ?",
+            (category, project_id, idx)
+        ).fetchone()
+        if row is None or (row[0] is None and row[1] is None):
+            return None
+        return {"etag": row[0], "last_modified": row[1], "content_length": row[2]}
+
+    def mark_downloaded(self, category, project_id, idx, url=None, size=None, validators=None, sha256=None):
+        validators = validators or {}
+        self.conn.execute(
+            """INSERT INTO images (category, project_id, idx, url, size, hash, updated_at, state,
+                                   etag, last_modified, content_length)
+               VALUES (?, ?, ?, ?, ?, ?, ?, 'done', ?, ?, ?)
+               ON CONFLICT (category, project_id, idx) DO UPDATE SET
+                   url = COALESCE(excluded.url, url),
+                   size = COALESCE(excluded.size, size),
+                   hash = COALESCE(excluded.hash, hash),
+                   updated_at = excluded.updated_at,
+                   state = 'done',
+                   etag = COALESCE(excluded.etag, etag),
+                   last_modified = COALESCE(excluded.last_modified, last_modified),
+                   content_length = COALESCE(excluded.content_length, content_length)""",
+            (category, project_id, idx, url, size, sha256, time.time(),
+             validators.get("etag"), validators.get("last_modified"), validators.get("content_length"))
+        )
+        self._pending += 1
+        if self._pending >= self.save_interval:
+            self.save()
+
+    def save(self, force=False):
+        if not self._pending and not force:
+            return
+        try:
+            self.conn.commit()
+            self._pending = 0
+        except Exception as e:
+            print(f"提交下载状态失败: {str(e)} / Failed to commit download status: {str(e)}")
+
+    def close(self):
+        self.save(force=True)
+        self.conn.close()
+
+
+def create_status_store(backend, json_path, sqlite_path, journal_path=None, save_interval=DEFAULT_SAVE_INTERVAL,
+                        fsync_batch=DEFAULT_FSYNC_BATCH, compact_bytes=DEFAULT_COMPACT_BYTES):
+    """
+    按名称创建状态后端 / Create a status backend by name
+
+    Args:
+        backend (str): json、journal 或 sqlite / json, journal or sqlite
+    """
+    if backend == "sqlite":
+        return SqliteStatusStore(sqlite_path, save_interval=save_interval, migrate_from=json_path)
+    if backend == "journal":
+        return JournalStatusStore(json_path, journal_path or f"{json_path}.journal",
+                                  fsync_batch=fsync_batch, compact_bytes=compact_bytes)
+    return JsonStatusStore(json_path, save_interval=save_interval)
@@ -0,0 +1,105 @@
+import os
+import hashlib
+import tempfile
+import concurrent.futures
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import async_downloader
+from downloader import DownloadTask, PART_SUFFIX, write_part_validator, read_part_validator
+
+BODY = b"fresh image bytes" * 64
+
+
+class _RangeRejectingHandler(BaseHTTPRequestHandler):
+    """对任何Range请求返回416，否则返回完整的200 / Answer any Range request with 416, otherwise a full 200"""
+
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(self.headers.get('Range'))
+        if self.headers.get('Range'):
+            self.send_response(416)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(BODY)))
+        self.send_header('ETag', '"v2"')
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+@unittest.skipUnless(async_downloader.is_available(), "aiohttp is not installed")
+class AsyncResumeTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        _RangeRejectingHandler.requests = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _RangeRejectingHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self._tmp.cleanup()
+
+    def test_stale_part_rejected_with_416_restarts_from_zero(self):
+        save_path = os.path.join(self._tmp.name, "id1_0.jpg")
+        part_path = save_path + PART_SUFFIX
+        with open(part_path, 'wb') as f:
+            f.write(b"stale partial content")
+        write_part_validator(part_path, '"v1"')
+
+        saved, failed = [], []
+        engine = async_downloader.AsyncDownloadEngine(
+            lambda task: save_path,
+            lambda task, path, validators, sha256: saved.append(sha256) or True,
+            on_failed=lambda task, **kwargs: failed.append(kwargs),
+        )
+        url = f"http://127.0.0.1:{self.server.server_address[1]}/id1_0.jpg"
+        engine.submit(DownloadTask("cat", 1, 0, url, None))
+        engine.close()
+
+        self.assertEqual(failed, [])
+        self.assertEqual(_RangeRejectingHandler.requests, ["bytes=21-", None])
+        self.assertEqual(engine.stats, {"submitted": 1, "downloaded": 1, "failed": 0})
+        self.assertEqual(saved, [hashlib.sha256(BODY).hexdigest()])
+        with open(save_path, 'rb') as f:
+            self.assertEqual(f.read(), BODY)
+        self.assertFalse(os.path.exists(part_path))
+        self.assertIsNone(read_part_validator(part_path))
+
+
+    def test_convert_hook_runs_off_the_event_loop(self):
+        save_path = os.path.join(self._tmp.name, "id1_0.png")
+        hook_threads, saved = [], []
+
+        def convert(data, target_path):
+            hook_threads.append(threading.current_thread().name)
+            with open(target_path, 'wb') as f:
+                f.write(data)
+            future = concurrent.futures.Future()
+            future.set_result((len(data), hashlib.sha256(data).hexdigest()))
+            return future
+
+        engine = async_downloader.AsyncDownloadEngine(
+            lambda task: save_path,
+            lambda task, path, validators, sha256: saved.append(sha256) or True,
+            convert=convert,
+        )
+        url = f"http://127.0.0.1:{self.server.server_address[1]}/id1_0.jpg"
+        engine.submit(DownloadTask("cat", 1, 0, url, None))
+        engine.close()
+
+        self.assertEqual(saved, [hashlib.sha256(BODY).hexdigest()])
+        self.assertEqual(len(hook_threads), 1)
+        self.assertNotEqual(hook_threads[0], "async-download-loop")
+
+
+if __name__ == '__main__':
+    unittest.main()
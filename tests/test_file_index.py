@@ -0,0 +1,36 @@
+import os
+import tempfile
+import unittest
+
+from file_index import ImageFileIndex
+
+
+class ImageFileIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        os.makedirs(os.path.join(self.root, "cat"))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, name, size):
+        with open(os.path.join(self.root, "cat", name), 'wb') as f:
+            f.write(b"x" * size)
+
+    def test_avif_output_is_indexed(self):
+        self._write("id1_0.avif", 5)
+        self.assertEqual(ImageFileIndex(self.root).lookup("cat", "id1_0"), (".avif", 5))
+
+    def test_largest_file_wins_and_other_files_are_ignored(self):
+        self._write("id1_0.jpg", 3)
+        self._write("id1_0.png", 7)
+        self._write("id1_1.txt", 9)
+        index = ImageFileIndex(self.root)
+        self.assertEqual(index.lookup("cat", "id1_0"), (".png", 7))
+        self.assertIsNone(index.lookup("cat", "id1_1"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+
+from http_crawler import find_next_control
+
+LISTING = """<html><body>
+<nav><a href="/news?page=9" rel="next">next</a></nav>
+<div class="wrap"><div class="list"><ul id="mWorkDiv">
+<li><a href="/p?id=1">next</a></li>
+<li><a class="more" href="/p?id=2"><img src="a.jpg"></a></li>
+</ul></div>
+<div class="pager">{pager}</div></div>
+<footer><a href="/f" rel="next">f</a></footer>
+</body></html>"""
+
+
+class FindNextControlTest(unittest.TestCase):
+
+    def test_follows_pagination_next_to_the_listing(self):
+        html = LISTING.format(pager='<a href="/c?page=1">1</a><a href="/c?page=2">下一页</a>')
+        self.assertEqual(find_next_control(html, "http://s/c"), (True, "http://s/c?page=2"))
+
+    def test_ignores_navigation_outside_the_listing(self):
+        html = LISTING.format(pager='<span>1</span>')
+        self.assertEqual(find_next_control(html, "http://s/c"), (False, None))
+
+    def test_postback_pagination_is_found_without_url(self):
+        html = LISTING.format(pager='<a href="javascript:__doPostBack(&#39;ctl00$pager&#39;,&#39;&#39;)">下一页</a>')
+        self.assertEqual(find_next_control(html, "http://s/c"), (True, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
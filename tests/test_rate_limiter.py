@@ -0,0 +1,28 @@
+import unittest
+
+from rate_limiter import AdaptiveRateLimiter, KIND_PAGE
+
+URL = "http://images.example.com/a.jpg"
+PAGE = "http://images.example.com/detail.aspx?id=1"
+
+
+class AdaptiveRateLimiterTest(unittest.TestCase):
+
+    def test_slow_page_loads_do_not_count_as_image_congestion(self):
+        limiter = AdaptiveRateLimiter(initial_rate=4.0, increase=0.0)
+        for _ in range(5):
+            limiter.record(URL, 200, 0.02)
+        limiter.record(PAGE, latency=3.0, kind=KIND_PAGE)
+        limiter.record(PAGE, latency=3.2, kind=KIND_PAGE)
+        self.assertEqual(limiter.current_rate(URL), 4.0)
+        self.assertEqual(limiter.stats["decreases"], 0)
+
+    def test_rising_request_latency_halves_the_rate(self):
+        limiter = AdaptiveRateLimiter(initial_rate=4.0, increase=0.0)
+        limiter.record(URL, 200, 0.02)
+        limiter.record(URL, 200, 1.0)
+        self.assertEqual(limiter.current_rate(URL), 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
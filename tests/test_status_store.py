@@ -0,0 +1,52 @@
+import os
+import json
+import tempfile
+import unittest
+
+from status_store import JournalStatusStore, SqliteStatusStore, StatusStore, entry_value
+
+
+class StatusStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_base_class_is_abstract(self):
+        with self.assertRaises(TypeError):
+            StatusStore()
+
+    def test_journal_replay_skips_malformed_and_torn_lines(self):
+        journal = os.path.join(self.dir, "status.json.journal")
+        with open(journal, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({"category": "cat", "key": "id1_0", "sha256": "abc"}) + "\n")
+            f.write(json.dumps({"key": "id1_1"}) + "\n")
+            f.write("42\n")
+            f.write('{"category": "cat", "key": "id1_')
+        store = JournalStatusStore(os.path.join(self.dir, "status.json"), journal)
+        try:
+            self.assertTrue(store.is_downloaded("cat", 1, 0))
+            self.assertFalse(store.is_downloaded("cat", 1, 1))
+        finally:
+            store.close()
+
+    def test_sqlite_migration_keeps_hash_and_validators(self):
+        json_path = os.path.join(self.dir, "status.json")
+        validators = {"etag": '"v1"', "last_modified": "Mon, 01 Jan 2024 00:00:00 GMT", "content_length": 5}
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({"downloaded_images": {"cat": {"id1_0": True, "id1_1": entry_value(validators, "abc")}}}, f)
+        store = SqliteStatusStore(os.path.join(self.dir, "status.db"), migrate_from=json_path)
+        try:
+            self.assertTrue(store.is_downloaded("cat", 1, 0))
+            self.assertEqual(store.get_validators("cat", 1, 1), validators)
+            row = store.conn.execute("SELECT size, hash FROM images WHERE project_id = 1 AND idx = 1").fetchone()
+            self.assertEqual(row, (5, "abc"))
+        finally:
+            store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+URL抓取缓存 - 记录每个图片URL已下载到的位置，跨项目、分类和多次运行复用
+URL Fetch Cache - remembers where each image URL was downloaded to, reused across projects, categories and runs
+"""
+
+import os
+import time
+import shutil
+import sqlite3
+import threading
+
+DEFAULT_MAX_ENTRIES = 50000    # 超过后按最近使用时间淘汰 / Least recently used entries are evicted beyond this
+EVICT_CHECK_INTERVAL = 100     # 每写入N条检查一次是否需要淘汰 / Check for eviction after every N writes
+
+
+class UrlCache:
+    """
+    持久化的 URL -> (sha256, 路径, 大小, 响应头) 缓存，按LRU淘汰；自带锁，可在下载线程中直接使用
+    Persistent URL -> (sha256, path, size, headers) cache with LRU eviction; has its own lock
+    so download workers can use it directly
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS urls (
+            url            TEXT PRIMARY KEY,
+            sha256         TEXT,
+            path           TEXT NOT NULL,
+            size           INTEGER,
+            etag           TEXT,
+            last_modified  TEXT,
+            content_length INTEGER,
+            last_used      REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_urls_last_used ON urls (last_used);
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.stats = {"hits": 0, "misses": 0}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self.conn.commit()
+
+    def get(self, url):
+        """查找URL，命中时更新最近使用时间 / Look up a URL, refreshing its last-used time on a hit"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT sha256, path, size, etag, last_modified, content_length FROM urls WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            self.conn.execute("UPDATE urls SET last_used = ? WHERE url = ?", (time.time(), url))
+            self.conn.commit()
+            self.stats["hits"] += 1
+            return {
+                "sha256": row[0], "path": row[1], "size": row[2],
+                "validators": {"etag": row[3], "last_modified": row[4], "content_length": row[5]}
+            }
+
+    def put(self, url, path, size, sha256=None, validators=None):
+        """记录URL的下载结果并淘汰多余的旧条目 / Record a URL's download and evict old entries beyond the limit"""
+        validators = validators or {}
+        with self._lock:
+            self.conn.execute(
+                """INSERT OR REPLACE INTO urls (url, sha256, path, size, etag, last_modified, content_length, last_used)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (url, sha256, path, size, validators.get("etag"), validators.get("last_modified"),
+                 validators.get("content_length"), time.time())
+            )
+            self._puts += 1
+            if self._puts % EVICT_CHECK_INTERVAL == 0:
+                self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        count = self.conn.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+        if count > self.max_entries:
+            self.conn.execute(
+                "DELETE FROM urls WHERE url IN (SELECT url FROM urls ORDER BY last_used LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def invalidate(self, url):
+        """删除失效的条目 / Drop a stale entry"""
+        with self._lock:
+            self.conn.execute("DELETE FROM urls WHERE url = ?", (url,))
+            self.conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._evict()
+            self.conn.commit()
+            self.conn.close()
+
+
+def copy_or_link(source, target):
+    """
+    优先硬链接，失败时复制；先写临时文件再原子替换
+    Hardlink when possible, otherwise copy; writes a temporary file and replaces atomically
+    """
+    tmp_path = f"{target}.link"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        os.link(source, tmp_path)
+    except OSError:
+        shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, target)
@@ -2,13 +2,41 @@ from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
 import platform
 import os
+import time
+import json
+import base64
+from urllib.parse import urlsplit
 from random_user_agent import random_ua
 
 # 以下辅助函数已移入此文件
 CHROMEDRIVER_VERSION = "134.0.6998.88"
 CHROMEDRIVER_DIR = "chromedriver"
+PAGE_READY_TIMEOUT = 20        # 页面就绪最长等待时间(秒) / Maximum page readiness wait in seconds
+PAGE_READY_POLL = 0.2          # 就绪条件轮询间隔(秒) / Readiness condition poll interval in seconds
+LISTING_MAX_PAGES = 20         # 分类列表最多翻页/加载更多的次数 / Maximum listing pages or "load more" clicks per category
+LISTING_MORE_TIMEOUT = 5       # 翻页后等待新项目出现的时间(秒) / Seconds to wait for new projects after paging
+# 不影响读取图片URL的资源：字体、音视频、统计脚本 / Resources not needed to read image URLs: fonts, media, analytics
+_LIGHT_BLOCKED_URLS = [
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.ogg",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*hm.baidu.com*", "*cnzz.com*",
+]
+
+# 资源拦截配置：blocked_urls用于Network.setBlockedURLs，images为False时通过Chrome偏好禁用图片
+# Resource blocking profiles: blocked_urls go to Network.setBlockedURLs; images=False disables images through Chrome prefs
+BLOCK_PROFILES = {
+    "none": {"blocked_urls": [], "images": True, "reduced_motion": False, "page_load_strategy": "normal"},
+    "light": {"blocked_urls": _LIGHT_BLOCKED_URLS, "images": True, "reduced_motion": True, "page_load_strategy": "eager"},
+    "strict": {"blocked_urls": _LIGHT_BLOCKED_URLS, "images": False, "reduced_motion": True, "page_load_strategy": "eager"},
+}
+
+NETWORK_BUFFER_BYTES = 200 * 1024 * 1024   # 浏览器为getResponseBody保留的响应体总大小 / Total response body bytes Chrome keeps for getResponseBody
+NETWORK_RESOURCE_BYTES = 30 * 1024 * 1024  # 单个响应体保留上限 / Per-response body limit
 
 import subprocess
 import zipfile
@@ -312,7 +340,57 @@ def try_local_drivers(chrome_options):
     return None, None
 
 
-def init_browser(chromedriver_path=None):
+def enable_network_capture(driver):
+    """
+    在ChromeDriver的CDP会话中启用Network域并扩大响应体缓存，使getResponseBody可用
+    Enable the Network domain on ChromeDriver's CDP session with larger body buffers so getResponseBody works
+    """
+    try:
+        driver.execute_cdp_cmd('Network.enable', {
+            'maxTotalBufferSize': NETWORK_BUFFER_BYTES,
+            'maxResourceBufferSize': NETWORK_RESOURCE_BYTES
+        })
+        print("已启用网络事件捕获 / Network event capture enabled")
+    except Exception as e:
+        print(f"启用网络事件捕获失败: {str(e)} / Failed to enable network capture")
+
+
+def apply_resource_blocking(driver, profile, network_enabled=False):
+    """
+    通过CDP拦截不需要的资源，并用prefers-reduced-motion关闭CSS动画
+    Block unneeded resources through CDP and turn off CSS animations with prefers-reduced-motion
+
+    Args:
+        network_enabled (bool): enable_network_capture已启用Network域，不再重复启用以免重置其缓存大小
+                                enable_network_capture already enabled the Network domain; it is not re-enabled so its buffer sizes stay
+    """
+    try:
+        if profile["blocked_urls"]:
+            if not network_enabled:
+                driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': profile["blocked_urls"]})
+        if profile["reduced_motion"]:
+            driver.execute_cdp_cmd('Emulation.setEmulatedMedia', {
+                'features': [{'name': 'prefers-reduced-motion', 'value': 'reduce'}]
+            })
+    except Exception as e:
+        print(f"应用资源拦截失败: {str(e)} / Failed to apply resource blocking")
+
+
+def init_browser(chromedriver_path=None, capture_network=False, block_profile="none", page_load_strategy=None):
+    """
+    初始化无头Chrome
+    Initialize headless Chrome
+
+    Args:
+        capture_network (bool): 开启性能日志中的Network事件，用于捕获图片响应 / Log Network events to the performance log to capture image responses
+        block_profile (str): 资源拦截配置，见BLOCK_PROFILES / Resource blocking profile, see BLOCK_PROFILES
+        page_load_strategy (str): normal/eager/none，默认使用拦截配置中的策略 / normal/eager/none, defaults to the profile's strategy
+    """
+    profile = BLOCK_PROFILES.get(block_profile)
+    if profile is None:
+        print(f"未知的资源拦截配置 {block_profile}，不拦截 / Unknown blocking profile {block_profile}, blocking nothing")
+        profile = BLOCK_PROFILES["none"]
     chrome_options = Options()
     chrome_options.add_argument("--headless")
     chrome_options.add_argument("--disable-gpu")
@@ -332,21 +410,294 @@ def init_browser(chromedriver_path=None):
     user_agent = random_ua()["User-Agent"]
     chrome_options.add_argument(f"--user-agent={user_agent}")
 
+    # eager在DOMContentLoaded后返回，none立即返回，由就绪条件决定何时继续
+    # eager returns after DOMContentLoaded, none returns immediately and the readiness conditions decide when to continue
+    chrome_options.page_load_strategy = page_load_strategy or profile["page_load_strategy"]
+    if not profile["images"]:
+        # 图片URL仍在DOM中，只是浏览器不下载 / Image URLs stay in the DOM, the browser just does not download them
+        chrome_options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+
+    if capture_network:
+        # 性能日志中包含Network.*事件 / The performance log carries the Network.* events
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        chrome_options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+
     try:
         print("尝试让系统自动查找ChromeDriver... / Trying to let system find ChromeDriver automatically...")
         driver = webdriver.Chrome(options=chrome_options)
         wait = WebDriverWait(driver, 20)
         apply_stealth_techniques(driver)
         print("✓ 自动查找成功! / Automatic detection successful!")
-        return driver, wait
     except Exception as e:
         print(f"自动查找失败: {str(e)} / Automatic detection failed")
-    if chromedriver_path:
-        return try_init_with_driver(chromedriver_path, chrome_options)
-    else:
-        return try_local_drivers(chrome_options)
+        if chromedriver_path:
+            driver, wait = try_init_with_driver(chromedriver_path, chrome_options)
+        else:
+            driver, wait = try_local_drivers(chrome_options)
+    if driver is not None and capture_network:
+        enable_network_capture(driver)
+    if driver is not None and block_profile != "none":
+        apply_resource_blocking(driver, profile, network_enabled=capture_network)
+        print(f"资源拦截配置: {block_profile}，页面加载策略: {chrome_options.page_load_strategy} / Blocking profile: {block_profile}, page load strategy: {chrome_options.page_load_strategy}")
+    return driver, wait
 
 
 def cleanup_browser(driver):
     if driver:
-        driver.quit() 
+        driver.quit()
+
+
+def swiper_ready(driver):
+    """
+    就绪条件：轮播图aria-label已填充为"N / M"且第一张img[src]已出现，返回aria-label
+    Readiness condition: the swiper aria-label reads "N / M" and the first img[src] is present; returns the aria-label
+    """
+    try:
+        slide = driver.find_element(By.XPATH, "//*[@id='mSwiperDiv']/div[1]")
+        aria_label = slide.get_attribute("aria-label") or ""
+        if not re.search(r"\s*(\d+)\s*/\s*(\d+)", aria_label):
+            return False
+        if not driver.find_elements(By.CSS_SELECTOR, "#mSwiperDiv img[src]:not([src=''])"):
+            return False
+        return aria_label
+    except StaleElementReferenceException:
+        return False
+
+
+def listing_ready(driver):
+    """
+    就绪条件：分类页面的项目链接已出现，返回链接元素列表
+    Readiness condition: the category page project links are present; returns the link elements
+    """
+    links = driver.find_elements(By.XPATH, '//*[@id="mWorkDiv"]/li/a[@href]')
+    return links or False
+
+
+def _url_location(url):
+    """URL的主机和路径，忽略协议、查询参数、片段和末尾斜杠 / Host and path of a URL, ignoring scheme, query, fragment and trailing slash"""
+    parts = urlsplit(url)
+    return parts.netloc.lower(), parts.path.rstrip('/')
+
+
+def url_committed(url, previous=None):
+    """
+    就绪条件：浏览器已导航到url(pageLoadStrategy=none时driver.get立即返回，旧页面的DOM可能还在)；
+    只比较主机和路径，服务器改写查询参数或跳转到https也算；提供previous时，离开previous和about:blank的任何导航也算
+    Readiness condition: the browser has navigated to url (with pageLoadStrategy=none driver.get returns at once
+    and the previous page's DOM may still be present); only host and path are compared, so a rewritten query or an
+    https redirect counts; with previous, any navigation away from previous and about:blank counts as well
+    """
+    target = _url_location(url)
+
+    def condition(driver):
+        current = driver.current_url
+        if _url_location(current) == target:
+            return True
+        return previous is not None and current != previous and current.startswith('http')
+    return condition
+
+
+def wait_until_ready(driver, condition, timeout=PAGE_READY_TIMEOUT, poll_frequency=PAGE_READY_POLL):
+    """
+    等待就绪条件成立，代替固定的time.sleep
+    Wait for a readiness condition instead of a fixed time.sleep
+
+    Returns:
+        tuple: (条件结果，超时为None / condition result, None on timeout, 实际等待秒数 / seconds actually waited)
+    """
+    start = time.monotonic()
+    try:
+        result = WebDriverWait(driver, timeout, poll_frequency=poll_frequency).until(condition)
+    except TimeoutException:
+        result = None
+    return result, time.monotonic() - start
+
+
+# 一次性读取轮播图所有幻灯片的图片URL(含懒加载的data-src)，跳过loop模式复制出的幻灯片；
+# 每个幻灯片恰好一项(没有图片时为null)，列表下标与图片序号一致
+# Read every swiper slide's image URL in one call (including lazy data-src), skipping loop-mode duplicate slides;
+# exactly one entry per slide (null without an image) so list positions match image indexes
+_SWIPER_URLS_SCRIPT = """
+const root = document.getElementById('mSwiperDiv');
+if (!root) { return []; }
+const imageUrl = (img) => {
+    const src = img.getAttribute('data-src') || img.getAttribute('src') || '';
+    if (!src || src.startsWith('data:')) { return null; }
+    return new URL(src, document.baseURI).href;
+};
+const slides = Array.from(root.querySelectorAll('.swiper-slide:not(.swiper-slide-duplicate)'));
+if (slides.length === 0) {
+    return Array.from(root.querySelectorAll('img')).map(imageUrl).filter((src) => src);
+}
+return slides.map((slide) => {
+    for (const img of slide.querySelectorAll('img')) {
+        const src = imageUrl(img);
+        if (src) { return src; }
+    }
+    return null;
+});
+"""
+
+
+def collect_swiper_image_urls(driver):
+    """
+    通过一次execute_script获取轮播图中所有图片的URL，按幻灯片顺序返回；没有图片的幻灯片对应None
+    Get the URLs of all swiper images in one execute_script round-trip, in slide order; slides without an image give None
+    """
+    try:
+        return driver.execute_script(_SWIPER_URLS_SCRIPT) or []
+    except Exception as e:
+        print(f"读取轮播图图片URL失败: {str(e)} / Failed to read swiper image URLs")
+        return []
+
+
+# 一次性读取分类页面每个项目条目的链接、标题和缩略图 / Read every project entry's link, title and thumbnail in one call
+_LISTING_ENTRIES_SCRIPT = """
+const entries = [];
+for (const a of document.querySelectorAll('#mWorkDiv li a[href]')) {
+    const img = a.querySelector('img');
+    let thumbnail = img ? (img.getAttribute('data-src') || img.getAttribute('src') || '') : '';
+    if (thumbnail && !thumbnail.startsWith('data:')) { thumbnail = new URL(thumbnail, document.baseURI).href; }
+    entries.push({
+        href: a.href,
+        title: (a.getAttribute('title') || a.textContent || '').replace(/\\s+/g, ' ').trim(),
+        thumbnail: thumbnail
+    });
+}
+return entries;
+"""
+
+
+def collect_listing_entries(driver):
+    """
+    通过一次execute_script获取分类页面的项目条目 [{href, title, thumbnail}]
+    Get the category page project entries [{href, title, thumbnail}] in one execute_script round-trip
+    """
+    try:
+        return driver.execute_script(_LISTING_ENTRIES_SCRIPT) or []
+    except Exception as e:
+        print(f"读取项目列表失败: {str(e)} / Failed to read project listing")
+        return []
+
+
+# 查找分类列表的"下一页/加载更多"控件，跳过项目链接和隐藏或禁用的元素；只在#mWorkDiv的兄弟元素和
+# 最多3层祖先内由近到远查找(与http_crawler.PAGINATION_SCOPE_LEVELS一致)，页头页脚的导航链接不算
+# Find the listing's "next page" / "load more" control, skipping project links and hidden or disabled elements;
+# only #mWorkDiv's siblings and up to 3 ancestors are searched, nearest first (matching
+# http_crawler.PAGINATION_SCOPE_LEVELS), so header and footer navigation links never match
+_NEXT_PAGE_SCRIPT = """
+const texts = ['下一頁', '下一页', '更多', '加載更多', '加载更多', 'next', 'more', 'load more', '»'];
+const list = document.getElementById('mWorkDiv');
+if (!list) { return null; }
+let scope = list.parentElement;
+for (let level = 0; level < 3 && scope && scope !== document.body && scope !== document.documentElement; level++) {
+    for (const el of scope.querySelectorAll('a, button')) {
+        if (list.contains(el) || el.offsetParent === null) { continue; }
+        const cls = (el.getAttribute('class') || '').toLowerCase();
+        if (cls.includes('disabled') || el.disabled) { continue; }
+        const text = (el.textContent || '').replace(/\\s+/g, ' ').trim().toLowerCase();
+        const rel = (el.getAttribute('rel') || '').toLowerCase();
+        if (rel === 'next' || texts.includes(text) || /(^|[-_\\s])(next|more)([-_\\s]|$)/.test(cls)) { return el; }
+    }
+    scope = scope.parentElement;
+}
+return null;
+"""
+
+
+def collect_all_listing_entries(driver, load_page=None, max_pages=LISTING_MAX_PAGES, timeout=LISTING_MORE_TIMEOUT):
+    """
+    读取分类页面的全部项目条目：有分页链接时加载下一页，有"加载更多"按钮时点击，直到不再出现新项目
+    Read every project entry of a category page: follow pagination links or click "load more"
+    until no new projects appear
+
+    Args:
+        load_page (callable): 加载分页URL的函数(默认driver.get) / Loads a pagination URL (driver.get by default)
+    """
+    load_page = load_page or driver.get
+    entries = collect_listing_entries(driver)
+    seen = {entry["href"] for entry in entries}
+    visited = {driver.current_url}
+    for _ in range(max(1, max_pages) - 1):
+        try:
+            control = driver.execute_script(_NEXT_PAGE_SCRIPT)
+        except Exception:
+            control = None
+        if control is None:
+            break
+        href = control.get_attribute("href") or ""
+        if href.startswith("http") and href.split("#")[0] != driver.current_url.split("#")[0]:
+            if href in visited:
+                break
+            visited.add(href)
+            print(f"  • 跟随分页 / Following listing page: {href}")
+            load_page(href)
+        else:
+            print("  • 点击加载更多 / Clicking load more")
+            driver.execute_script("arguments[0].click();", control)
+
+        def new_entries(d):
+            fresh = [entry for entry in collect_listing_entries(d) if entry["href"] not in seen]
+            return fresh or False
+
+        fresh, _ = wait_until_ready(driver, new_entries, timeout=timeout)
+        if not fresh:
+            break
+        entries.extend(fresh)
+        seen.update(entry["href"] for entry in fresh)
+    return entries
+
+
+def drain_performance_log(driver):
+    """
+    读取并清空性能日志，返回其中的Network事件 [(method, params)]
+    Read and clear the performance log, returning its Network events [(method, params)]
+    """
+    events = []
+    try:
+        for entry in driver.get_log('performance'):
+            message = json.loads(entry['message']).get('message', {})
+            if message.get('method', '').startswith('Network.'):
+                events.append((message['method'], message.get('params', {})))
+    except Exception as e:
+        print(f"读取性能日志失败: {str(e)} / Failed to read the performance log")
+    return events
+
+
+def captured_image_responses(events):
+    """
+    从Network事件中找出图片响应，按加载顺序返回 {url: {request_id, status, headers, finished}}
+    Find the image responses in the Network events, in load order: {url: {request_id, status, headers, finished}}
+    """
+    finished = {params.get('requestId') for method, params in events if method == 'Network.loadingFinished'}
+    responses = {}
+    for method, params in events:
+        if method != 'Network.responseReceived':
+            continue
+        response = params.get('response', {})
+        url = response.get('url', '')
+        if not url or url.startswith('data:'):
+            continue
+        if params.get('type') != 'Image' and not response.get('mimeType', '').startswith('image/'):
+            continue
+        responses[url] = {
+            "request_id": params.get('requestId'),
+            "status": response.get('status'),
+            "headers": {k.lower(): v for k, v in (response.get('headers') or {}).items()},
+            "finished": params.get('requestId') in finished
+        }
+    return responses
+
+
+def get_response_body(driver, request_id):
+    """
+    通过Network.getResponseBody取回浏览器已下载的响应体，不可用时返回None
+    Fetch a response body Chrome already downloaded through Network.getResponseBody, None when unavailable
+    """
+    try:
+        result = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+    except Exception as e:
+        print(f"读取响应体失败: {str(e)} / Failed to read response body")
+        return None
+    body = result.get('body', '')
+    return base64.b64decode(body) if result.get('base64Encoded') else body.encode('utf-8')